@@ -0,0 +1,93 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark 'next' answered by the daemon against running it cold.
+
+Serves a synthetic account with benchmarks/standin.py, starts the daemon on a
+temporary socket with a session talking to the stand-in, and reports the
+median time of:
+- cold: next_shift in-process with a fresh session, as every CLI invocation
+  did before the daemon
+- daemon: one request to the daemon over the socket
+- thin CLI: 'python -m myshift next' in a fresh interpreter, handing the
+  command to the daemon (includes interpreter startup)
+
+Usage:
+    python benchmarks/bench_daemon.py [--users 100] [--latency 0.05] [--repeat 10]
+"""
+
+import argparse
+import io
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from typing import Callable, List
+
+from standin import StandIn, SyntheticAccount
+
+from myshift.daemon import request_daemon, serve
+from myshift.next import next_shift
+
+SCHEDULE_ID = "PS00000"
+USER = "user1@example.com"
+
+
+def timed(run: Callable[[], None], repeat: int) -> float:
+    """Median seconds of running a function, with stdout discarded."""
+    times: List[float] = []
+    for _ in range(repeat):
+        with redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the myshift daemon")
+    parser.add_argument("--users", type=int, default=100, help="Users in the synthetic account")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every stand-in response")
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per measurement (median is reported)")
+    args = parser.parse_args()
+
+    socket_path = os.path.join(tempfile.mkdtemp(), "myshift.sock")
+    with StandIn(SyntheticAccount(users=args.users), latency=args.latency) as standin:
+        config = {"schedule_id": SCHEDULE_ID, "my_user": USER}
+        threading.Thread(target=serve, args=(config, socket_path, 0, 0, standin.client()), daemon=True).start()
+        while not os.path.exists(socket_path):
+            time.sleep(0.01)
+
+        request = {"command": "next", "user": USER}
+        request_daemon(request, socket_path)  # first request loads the timeline
+
+        cold = timed(lambda: next_shift(standin.client(), SCHEDULE_ID, USER), args.repeat)
+        daemon = timed(lambda: request_daemon(request, socket_path), args.repeat)
+
+        env = dict(os.environ, MYSHIFT_SOCKET=str(socket_path))
+        argv = [sys.executable, "-m", "myshift", "next", "--user", USER]
+        thin = timed(lambda: subprocess.run(argv, env=env, stdout=subprocess.DEVNULL, check=True), args.repeat)
+        bare = timed(lambda: subprocess.run([sys.executable, "-c", "pass"], check=True), args.repeat)
+
+    print(f"{'cold (in-process)':<22} {cold * 1000:>8.1f} ms")
+    print(f"{'daemon (in-process)':<22} {daemon * 1000:>8.1f} ms")
+    print(f"{'thin CLI':<22} {thin * 1000:>8.1f} ms  (bare interpreter: {bare * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark decoding of /oncalls timestamps.
+
+Compares the per-record cost of the original strptime/replace/astimezone
+loop with myshift.timestamps.TimestampDecoder on synthetic /oncalls payloads.
+
+Usage:
+    python benchmarks/bench_decode.py [--sizes 10000,30000,100000] [--levels 3] [--repeat 3]
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+from dateutil import tz
+
+from myshift.timestamps import TimestampDecoder
+
+ISO_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def make_payload(records: int, levels: int, users: int = 10, shift_hours: int = 12) -> List[Dict[str, Any]]:
+    """Build synthetic /oncalls records: one shift per escalation level for each time slot."""
+    start = datetime(2025, 1, 6, 9, tzinfo=timezone.utc)
+    payload = []
+    for i in range(records):
+        slot, level = divmod(i, levels)
+        shift_start = start + timedelta(hours=shift_hours * slot)
+        payload.append(
+            {
+                "escalation_level": level + 1,
+                "start": shift_start.strftime(ISO_FORMAT),
+                "end": (shift_start + timedelta(hours=shift_hours)).strftime(ISO_FORMAT),
+                "user": {"id": f"PUSER{(slot + level) % users:02d}"},
+            }
+        )
+    return payload
+
+
+def decode_strptime(payload: List[Dict[str, Any]], target_tz: Any) -> Set[Tuple[datetime, datetime, str]]:
+    """The original decoding loop of get_all_unique_shifts."""
+    unique_shifts = set()
+    utc = tz.tzutc()
+    for shift in payload:
+        start_utc = datetime.strptime(shift["start"], ISO_FORMAT)
+        end_utc = datetime.strptime(shift["end"], ISO_FORMAT)
+        start_local = start_utc.replace(tzinfo=utc).astimezone(target_tz)
+        end_local = end_utc.replace(tzinfo=utc).astimezone(target_tz)
+        unique_shifts.add((start_local, end_local, shift["user"]["id"]))
+    return unique_shifts
+
+
+def decode_fast(payload: List[Dict[str, Any]], target_tz: Any) -> Set[Tuple[datetime, datetime, str]]:
+    """The decoding loop using TimestampDecoder."""
+    unique_shifts = set()
+    decode = TimestampDecoder(target_tz)
+    for shift in payload:
+        unique_shifts.add((decode(shift["start"]), decode(shift["end"]), shift["user"]["id"]))
+    return unique_shifts
+
+
+def best_time(func: Callable[[], Any], repeat: int) -> float:
+    """Run a function several times and return the fastest wall time."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark /oncalls timestamp decoding")
+    parser.add_argument("--sizes", default="10000,30000,100000", help="Comma-separated record counts")
+    parser.add_argument("--levels", type=int, default=3, help="Escalation levels per time slot")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (fastest is reported)")
+    args = parser.parse_args()
+
+    target_tz = tz.tzlocal()
+    print(f"{'records':>8} {'strptime us/rec':>16} {'decoder us/rec':>15} {'speedup':>8}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        payload = make_payload(size, args.levels)
+        if decode_strptime(payload, target_tz) != decode_fast(payload, target_tz):
+            raise SystemExit(f"Decoders disagree for {size} records")
+
+        before = best_time(lambda: decode_strptime(payload, target_tz), args.repeat)
+        after = best_time(lambda: decode_fast(payload, target_tz), args.repeat)
+        print(f"{size:>8} {before / size * 1e6:>16.2f} {after / size * 1e6:>15.2f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
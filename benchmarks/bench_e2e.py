@@ -0,0 +1,150 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""End-to-end benchmarks of myshift commands against the local stand-in.
+
+Each scenario runs a command function against a synthetic account served by
+benchmarks/standin.py in a child process, at increasing scales, and reports:
+- Wall time (median of --repeat runs)
+- API calls made by the client, including retries after 429s
+- Peak Python memory allocated by the client (tracemalloc, separate run)
+
+The client runs without the shift cache or user directory, so every run
+measures the cold path.
+
+Usage:
+    python benchmarks/bench_e2e.py [--scenarios next,plan,override] [--scales small,medium,large]
+                                   [--repeat 3] [--latency 0.0] [--rate-limit-every 0] [--async]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Tuple
+
+from dateutil import tz
+from standin import StandInProcess
+
+from myshift.next import next_shift
+from myshift.override import create_override
+from myshift.plan import plan_shifts
+
+SCHEDULE_ID = "PS00000"
+
+# Synthetic account and look-ahead of each scale
+SCALES: Dict[str, Dict[str, Any]] = {
+    "small": {"users": 10, "shift_hours": 24, "levels": 2, "days": 28},
+    "medium": {"users": 100, "shift_hours": 12, "levels": 2, "days": 90},
+    "large": {"users": 1000, "shift_hours": 4, "levels": 3, "days": 365},
+}
+
+
+def run_next(session: Any, scale: Dict[str, Any]) -> None:
+    next_shift(session, SCHEDULE_ID, "user1@example.com", days=scale["days"])
+
+
+def run_plan(session: Any, scale: Dict[str, Any]) -> None:
+    plan_shifts(session, SCHEDULE_ID, scale["days"])
+
+
+def run_override(session: Any, scale: Dict[str, Any]) -> None:
+    today = datetime.now(tz.tzlocal()).date()
+    create_override(
+        session,
+        SCHEDULE_ID,
+        user_email="user0@example.com",
+        target_user_email="user1@example.com",
+        start_str=today.isoformat(),
+        end_str=(today + timedelta(days=scale["days"] - 1)).isoformat(),
+    )
+
+
+SCENARIOS: Dict[str, Callable[[Any, Dict[str, Any]], None]] = {
+    "next": run_next,
+    "plan": run_plan,
+    "override": run_override,
+}
+
+
+def measure(
+    standin: StandInProcess, scenario: Callable[[Any, Dict[str, Any]], None], scale: Dict[str, Any], **kwargs: Any
+) -> Tuple[float, int, str]:
+    """Run a scenario once with a fresh session.
+
+    Returns:
+        Tuple of (wall seconds, API calls, error message or empty string)
+    """
+    session = standin.client()
+    for name, value in kwargs.items():
+        setattr(session, name, value)
+
+    error = ""
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        started = time.perf_counter()
+        try:
+            scenario(session, scale)
+        except SystemExit:
+            error = "exited"
+        wall = time.perf_counter() - started
+    return wall, sum(session.api_call_counts.values()), error
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark myshift commands against the local stand-in")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated scenarios")
+    parser.add_argument("--scales", default=",".join(SCALES), help="Comma-separated scales")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per measurement (median is reported)")
+    parser.add_argument("--page-limit", type=int, default=100, help="Maximum page size served (default: 100)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Answer every Nth request with a 429")
+    parser.add_argument("--async", dest="async_fetch", action="store_true", help="Fetch pages concurrently")
+    args = parser.parse_args()
+
+    session_settings = {"page_concurrency": 8} if args.async_fetch else {}
+    server_settings = {
+        "page_limit": args.page_limit,
+        "latency": args.latency,
+        "rate_limit_every": args.rate_limit_every,
+    }
+
+    print(f"{'scenario':<10} {'scale':<8} {'wall ms':>9} {'API calls':>10} {'peak KiB':>10}")
+    for scale_name in args.scales.split(","):
+        scale = SCALES[scale_name]
+        account = {key: scale[key] for key in ("users", "shift_hours", "levels")}
+        with StandInProcess(account, server_settings) as standin:
+            for scenario_name in args.scenarios.split(","):
+                scenario = SCENARIOS[scenario_name]
+                runs = [measure(standin, scenario, scale, **session_settings) for _ in range(args.repeat)]
+
+                tracemalloc.start()
+                measure(standin, scenario, scale, **session_settings)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                wall = statistics.median(run[0] for run in runs)
+                error = next((run[2] for run in runs if run[2]), "")
+                print(
+                    f"{scenario_name:<10} {scale_name:<8} {wall * 1000:>9.1f} {runs[0][1]:>10} {peak / 1024:>10.0f}"
+                    + (f"  ({error})" if error else ""),
+                    file=sys.stdout,
+                )
+
+
+if __name__ == "__main__":
+    main()
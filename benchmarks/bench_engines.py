@@ -0,0 +1,96 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark the /oncalls and rendered schedule fetch engines against the stand-in.
+
+Serves a synthetic account with benchmarks/standin.py, where every schedule is
+used by several escalation policies (so /oncalls repeats each shift once per
+policy, as PagerDuty does), and fetches every shift of a schedule over
+increasing horizons with each engine. For every horizon and engine it reports:
+- Pages (responses) received and bytes received for them (compressed)
+- Median latency of a single response
+- Wall time of the fetch, decode and dedupe (median of --repeat runs)
+
+It also checks that both engines give the same distinct shifts.
+
+Usage:
+    python benchmarks/bench_engines.py [--days 28,90,365] [--users 100] [--shift-hours 12]
+                                       [--policies 3] [--latency 0.05] [--repeat 5]
+"""
+
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
+
+from standin import StandIn, SyntheticAccount
+
+from myshift.profiling import Profiler
+from myshift.util import get_shift_array
+
+SCHEDULE_ID = "PS00000"
+ENGINES = ("oncalls", "rendered")
+
+
+def run(standin: StandIn, engine: str, days: int, since: datetime) -> Tuple[float, Dict[str, Any], List[Any]]:
+    """Fetch a schedule's shifts once with a fresh session.
+
+    Returns:
+        Tuple of (seconds, profiler summary, distinct shifts)
+    """
+    session = standin.client()
+    session.fetch_engine = engine
+    session.profiler = Profiler()
+    started = time.perf_counter()
+    shifts = get_shift_array(session, SCHEDULE_ID, since + timedelta(days=days), since=since, quiet=True)
+    return time.perf_counter() - started, session.profiler.summary(), list(shifts.iter_epochs())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the myshift fetch engines")
+    parser.add_argument("--days", default="28,90,365", help="Comma-separated horizons in days")
+    parser.add_argument("--users", type=int, default=100, help="Users in the synthetic account")
+    parser.add_argument("--shift-hours", type=float, default=12, help="Shift length in hours")
+    parser.add_argument("--policies", type=int, default=3, help="Escalation policies using the schedule")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every stand-in response")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (median is reported)")
+    args = parser.parse_args()
+
+    # One escalation level: the stand-in gives extra levels their own rotation, which the final schedule doesn't show
+    account = SyntheticAccount(args.users, shift_hours=args.shift_hours, levels=1, policies=args.policies)
+    since = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    print(f"{'days':>5} {'engine':<9} {'shifts':>7} {'pages':>6} {'KiB':>9} {'median ms':>10} {'p50 api ms':>11}")
+    with StandIn(account, latency=args.latency) as standin:
+        for days in (int(value) for value in args.days.split(",")):
+            answers = {}
+            for engine in ENGINES:
+                times: List[float] = []
+                for _ in range(args.repeat):
+                    elapsed, summary, shifts = run(standin, engine, days, since)
+                    times.append(elapsed)
+                answers[engine] = shifts
+                attempts = sum(stats["attempts"] for stats in summary["endpoints"].values())
+                received = sum(stats["bytes_received"] for stats in summary["endpoints"].values())
+                latency = statistics.median(stats["latency_ms"]["p50"] for stats in summary["endpoints"].values())
+                print(
+                    f"{days:>5} {engine:<9} {len(shifts):>7} {attempts:>6} {received / 1024:>9.1f} "
+                    f"{statistics.median(times) * 1000:>10.1f} {latency:>11.1f}"
+                )
+            if answers["oncalls"] != answers["rendered"]:
+                raise SystemExit(f"Engines disagree over {days} days")
+
+
+if __name__ == "__main__":
+    main()
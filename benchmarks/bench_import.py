@@ -0,0 +1,100 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark CLI startup cost.
+
+Runs light commands in fresh interpreters with -X importtime and reports the
+total import time, the wall time and whether the PagerDuty client stack was
+loaded. The "eager" row imports every subcommand module up front, which is
+what starting the CLI cost before subcommands were loaded lazily.
+
+Usage:
+    python benchmarks/bench_import.py [--repeat 5]
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+EAGER_IMPORTS = (
+    "import myshift.config, myshift.util, myshift.lookup, myshift.next, "
+    "myshift.override, myshift.plan, myshift.repl, myshift.__main__"
+)
+
+SCENARIOS = [
+    ("eager (all subcommands)", ["-c", EAGER_IMPORTS]),
+    ("myshift --help", ["-m", "myshift", "--help"]),
+    ("myshift --version", ["-m", "myshift", "--version"]),
+    ("myshift config --print", ["-m", "myshift", "config", "--print"]),
+]
+
+HEAVY_MODULES = ("pagerduty", "httpx2", "yaml", "sqlite3", "asyncio")
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def run(argv: List[str]) -> Tuple[float, float, List[str]]:
+    """Run python with -X importtime in a fresh process.
+
+    Returns:
+        Tuple of (wall seconds, total import seconds, names of imported modules)
+    """
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *argv],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=False,
+    )
+    wall = time.perf_counter() - started
+
+    total_us = 0
+    modules = []
+    for line in proc.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if not match:
+            continue
+        modules.append(match.group(4))
+        # Top-level imports carry the cumulative time of everything they pulled in
+        if len(match.group(3)) == 1:
+            total_us += int(match.group(2))
+    return wall, total_us / 1e6, modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark myshift CLI startup")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per scenario (median is reported)")
+    args = parser.parse_args()
+
+    # Warm the bytecode caches so every scenario is measured the same way
+    for _, argv in SCENARIOS:
+        run(argv)
+
+    print(f"{'scenario':<26} {'imports ms':>10} {'wall ms':>8}  heavy modules loaded")
+    for name, argv in SCENARIOS:
+        runs = [run(argv) for _ in range(args.repeat)]
+        wall = statistics.median(r[0] for r in runs)
+        imports = statistics.median(r[1] for r in runs)
+        heavy = sorted({module for module in runs[0][2] if module.split(".")[0] in HEAVY_MODULES})
+        loaded = ", ".join(sorted({module.split(".")[0] for module in heavy})) or "none"
+        print(f"{name:<26} {imports * 1000:>10.1f} {wall * 1000:>8.1f}  {loaded}")
+
+
+if __name__ == "__main__":
+    main()
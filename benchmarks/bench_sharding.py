@@ -0,0 +1,59 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Time a year-long fetch with single queries and with 'fetch_mode: sharded'.
+
+Serves a synthetic account with benchmarks/standin.py, with latency added to
+every response, and reports wall time and requests for each. That sharded
+fetches give the same answer as single queries is checked by
+tests/test_sharding.py.
+
+Usage:
+    python benchmarks/bench_sharding.py [--latency 0.05] [--days 365]
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from standin import StandIn, SyntheticAccount
+
+from myshift.util import get_shift_array
+
+SCHEDULE_ID = "PS00000"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time sharded fetches")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every stand-in response")
+    parser.add_argument("--days", type=int, default=365, help="Length of the timed range")
+    args = parser.parse_args()
+
+    since = datetime.now(timezone.utc)
+    until = since + timedelta(days=args.days)
+    with StandIn(SyntheticAccount(users=100, shift_hours=12, levels=2), latency=args.latency) as standin:
+        for label, shard_days in (("single query", 0), ("sharded, 7 days", 7)):
+            session = standin.client()
+            session.fetch_engine = "oncalls"
+            session.shard_days = shard_days
+            standin.reset_counts()
+            started = time.perf_counter()
+            get_shift_array(session, SCHEDULE_ID, until, since=since, quiet=True)
+            elapsed = time.perf_counter() - started
+            requests = sum(standin.counts.values())
+            print(f"{args.days} days, {label:<16} {elapsed * 1000:>8.1f} ms  {requests:>4} requests")
+
+
+if __name__ == "__main__":
+    main()
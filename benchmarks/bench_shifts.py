@@ -0,0 +1,148 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark the representation of deduplicated shifts.
+
+Builds sorted unique shifts from synthetic /oncalls records, and compares:
+- tuples: a set of (datetime, datetime, user_id) tuples, sorted (the previous
+  approach of get_all_unique_shifts)
+- array: ShiftArray deduplicating packed Python integers
+- numpy: ShiftArray deduplicating with NumPy (skipped if not installed)
+
+and reports the build time, the peak memory allocated while building, and the
+memory retained by the result. Times are only turned into datetimes at display
+time with ShiftArray, so the "+display" rows add materializing every shift.
+
+Usage:
+    python benchmarks/bench_shifts.py [--records 1000000] [--users 500] [--repeat 3]
+"""
+
+import argparse
+import gc
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+from dateutil import tz
+
+import myshift.shiftarray as shiftarray
+from myshift.shiftarray import ShiftArray
+from myshift.timestamps import TimestampDecoder
+
+
+def make_records(count: int, users: int) -> List[Dict[str, Any]]:
+    """Generate /oncalls records, each shift reported by two escalation levels."""
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    stamps: Dict[int, str] = {}
+
+    def stamp(hours: int) -> str:
+        if hours not in stamps:
+            stamps[hours] = (start + timedelta(hours=hours)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        return stamps[hours]
+
+    user_refs = [{"id": f"PU{i:05d}", "type": "user_reference"} for i in range(users)]
+    records = []
+    for i in range(count):
+        shift = i // 2
+        hours = shift // 7
+        records.append(
+            {
+                "start": stamp(hours),
+                "end": stamp(hours + 4),
+                "user": user_refs[(shift * 7919) % users],
+                "escalation_level": i % 2 + 1,
+            }
+        )
+    return records
+
+
+def build_tuples(records: List[Dict[str, Any]]) -> Any:
+    decode = TimestampDecoder(tz.tzlocal())
+    unique = set()
+    for record in records:
+        unique.add((decode(record["start"]), decode(record["end"]), record["user"]["id"]))
+    return sorted(unique)
+
+
+def build_array(records: List[Dict[str, Any]]) -> Any:
+    return ShiftArray.from_records(records).unique()
+
+
+def display(result: Any) -> Any:
+    return result.to_shifts(tz.tzlocal()) if isinstance(result, ShiftArray) else result
+
+
+def measure(build: Callable[[List[Dict[str, Any]]], Any], records: List[Dict[str, Any]]) -> Tuple[float, int, int, int]:
+    """Build once, timed, then again under tracemalloc.
+
+    Returns:
+        Tuple of (seconds, peak bytes, retained bytes, unique shifts)
+    """
+    gc.collect()
+    started = time.perf_counter()
+    result = build(records)
+    elapsed = time.perf_counter() - started
+    count = len(result)
+    del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = build(records)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, peak, retained, count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark compact shift storage")
+    parser.add_argument("--records", type=int, default=1_000_000, help="Number of /oncalls records")
+    parser.add_argument("--users", type=int, default=500, help="Number of distinct users")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per variant (median is reported)")
+    args = parser.parse_args()
+
+    records = make_records(args.records, args.users)
+    numpy = shiftarray.get_numpy()
+
+    variants: List[Tuple[str, Callable[[List[Dict[str, Any]]], Any], Any]] = [
+        ("tuples", build_tuples, None),
+        ("array", build_array, False),
+        ("array+display", lambda r: display(build_array(r)), False),
+    ]
+    if numpy is not None:
+        variants += [
+            ("numpy", build_array, numpy),
+            ("numpy+display", lambda r: display(build_array(r)), numpy),
+        ]
+    else:
+        print("NumPy is not installed; skipping the numpy variants")
+
+    print(f"{len(records)} records")
+    print(f"{'variant':<14} {'unique':>9} {'build ms':>9} {'peak MiB':>9} {'kept MiB':>9} {'B/shift':>8}")
+    for name, build, module in variants:
+        if module is not None:
+            shiftarray._numpy = module
+        runs = [measure(build, records) for _ in range(args.repeat)]
+        elapsed = statistics.median(run[0] for run in runs)
+        _, peak, retained, count = runs[-1]
+        print(
+            f"{name:<14} {count:>9} {elapsed * 1000:>9.0f} {peak / 2**20:>9.1f} {retained / 2**20:>9.1f}"
+            f" {retained / max(1, count):>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
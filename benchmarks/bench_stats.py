@@ -0,0 +1,96 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark the on-call load statistics of 'myshift stats'.
+
+Builds a year of synthetic shifts (already fetched) for many schedules, each a
+rotation of some of the users over several escalation levels, and reports the
+median time of compute_load:
+- numpy: vectorized over all shifts (skipped if NumPy is not installed)
+- python: the same formulas applied shift by shift
+
+Both variants must agree on every user's load.
+
+Usage:
+    python benchmarks/bench_stats.py [--users 200] [--schedules 30] [--shift-hours 12] [--levels 2] [--repeat 5]
+"""
+
+import argparse
+import statistics
+import time
+from typing import Callable, List
+
+from dateutil import tz
+
+from myshift.shiftarray import ShiftArray, get_numpy
+from myshift.stats import compute_load, parse_quarter
+
+
+def make_schedules(users: int, schedules: int, shift_hours: int, levels: int, start: int, end: int) -> ShiftArray:
+    """Generate the unique shifts of every schedule, concatenated."""
+    arrays = []
+    step = shift_hours * 3600
+    for schedule in range(schedules):
+        shifts = ShiftArray()
+        # Each schedule rotates through its own slice of users, overlapping its neighbours'
+        members = [f"PU{(schedule * 7 + i) % users:05d}" for i in range(max(levels + 1, users // 10))]
+        for level in range(levels):
+            for slot, when in enumerate(range(start, end, step)):
+                shifts.append(when, when + step, members[(slot + level * 3) % len(members)])
+        arrays.append(shifts.unique())
+    return ShiftArray.concat(arrays)
+
+
+def timed(run: Callable[[], object], repeat: int) -> float:
+    """Median seconds of running a function."""
+    times: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark on-call load statistics")
+    parser.add_argument("--users", type=int, default=200, help="Number of distinct users")
+    parser.add_argument("--schedules", type=int, default=30, help="Number of schedules")
+    parser.add_argument("--shift-hours", type=int, default=12, help="Length of every shift")
+    parser.add_argument("--levels", type=int, default=2, help="Escalation levels per schedule")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per variant (median is reported)")
+    args = parser.parse_args()
+
+    local_tz = tz.tzlocal()
+    since, _ = parse_quarter("2025Q1", local_tz)
+    _, until = parse_quarter("2025Q4", local_tz)
+    shifts = make_schedules(
+        args.users, args.schedules, args.shift_hours, args.levels, int(since.timestamp()), int(until.timestamp())
+    )
+    print(f"{len(shifts)} shifts of {len(shifts.user_ids)} users across {args.schedules} schedules over a year")
+
+    python = compute_load(shifts, since, until, local_tz, use_numpy=False)
+    variants = [("python", False)]
+    if get_numpy() is not None:
+        assert compute_load(shifts, since, until, local_tz, use_numpy=True) == python, "numpy and python disagree"
+        variants.insert(0, ("numpy", True))
+    else:
+        print("NumPy is not installed; skipping the numpy variant")
+
+    for name, use_numpy in variants:
+        elapsed = timed(lambda: compute_load(shifts, since, until, local_tz, use_numpy=use_numpy), args.repeat)
+        print(f"{name:<8} {elapsed * 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
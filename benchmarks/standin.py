@@ -0,0 +1,572 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local stand-in for the parts of the PagerDuty REST API that myshift uses.
+
+The stand-in serves synthetic data over HTTP, so performance work can be
+measured offline:
+- GET /oncalls, with schedule_ids[], user_ids[], since/until and classic pagination
+- GET /users and GET /users/{id}
+- GET /schedules, GET /schedules/{id} (with rendered schedule entries)
+- GET and POST /schedules/{id}/overrides
+
+Every schedule is a rotation of users with fixed-length shifts, repeated on
+each escalation level with a different offset. /oncalls reports every shift
+once per escalation policy using the schedule, while the rendered schedule
+entries only hold the first level's rotation. Overrides created through the
+stand-in replace the rotation's users in both, as they do in PagerDuty. The page size is capped, and
+latency and 429 responses can be injected.
+
+The PagerDuty client only accepts https:// base URLs, so clients are pointed
+at the stand-in through a transport that rewrites request URLs (see
+StandIn.client).
+
+Usage:
+    python benchmarks/standin.py [--port 8080] [--users 50] [--shift-hours 12] [--levels 2] ...
+"""
+
+import argparse
+import json
+import multiprocessing
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import httpx2
+from dateutil import parser as date_parser
+
+ISO_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# Every rotation starts on this Monday
+ROTATION_EPOCH = datetime(2020, 1, 6, tzinfo=timezone.utc)
+
+
+def parse_time(value: str) -> datetime:
+    """Parse a query timestamp, assuming UTC when no timezone is given."""
+    parsed = date_parser.isoparse(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+class SyntheticAccount:
+    """Deterministic users, schedules, on-call rotations and overrides."""
+
+    def __init__(
+        self,
+        users: int = 50,
+        schedules: int = 1,
+        shift_hours: float = 12,
+        levels: int = 2,
+        team_id: str = "PTEAM01",
+        policies: int = 1,
+    ):
+        """Generate the account.
+
+        Args:
+            users: Number of users, all in every rotation
+            schedules: Number of schedules
+            shift_hours: Length of each shift
+            levels: Number of escalation levels, each with its own rotation offset
+            team_id: ID of the team every schedule belongs to
+            policies: Number of escalation policies using every schedule, each
+                repeating its /oncalls records
+        """
+        self.users = [
+            {"id": f"PU{i:05d}", "type": "user", "name": f"User {i}", "email": f"user{i}@example.com"}
+            for i in range(users)
+        ]
+        self.users_by_id = {user["id"]: user for user in self.users}
+        self.schedules = [
+            {"id": f"PS{i:05d}", "type": "schedule", "name": f"Schedule {i}", "teams": [{"id": team_id}]}
+            for i in range(schedules)
+        ]
+        self.schedule_ids = [schedule["id"] for schedule in self.schedules]
+        self.shift = timedelta(hours=shift_hours)
+        self.levels = levels
+        self.policies = max(1, policies)
+        self.overrides: Dict[str, List[Dict[str, Any]]] = {}
+        self._oncalls: Dict[Tuple, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def rotation(self, schedule_id: str, level: int, since: datetime, until: datetime) -> List[Tuple]:
+        """Get the (start, end, user) shifts of one level of a schedule overlapping a range."""
+        offset = self.schedule_ids.index(schedule_id) * 7 + level * max(1, len(self.users) // max(1, self.levels))
+        first = int((since - ROTATION_EPOCH) / self.shift)
+        shifts = []
+        slot = first
+        while True:
+            start = ROTATION_EPOCH + slot * self.shift
+            if start >= until:
+                break
+            end = start + self.shift
+            if end > since:
+                shifts.append((start, end, self.users[(slot + offset) % len(self.users)]))
+            slot += 1
+        return shifts
+
+    def on_call(self, schedule_id: str, level: int, since: datetime, until: datetime) -> List[Tuple]:
+        """Get the (start, end, user) shifts of one level of a schedule overlapping a range, with overrides applied."""
+        with self._lock:
+            overrides = sorted(
+                (parse_time(o["start"]), parse_time(o["end"]), self.users_by_id[o["user"]["id"]])
+                for o in self.overrides.get(schedule_id, [])
+            )
+        if not overrides:
+            return self.rotation(schedule_id, level, since, until)
+
+        shifts = []
+        for start, end, user in self.rotation(schedule_id, level, since, until):
+            pieces = []
+            cursor = start
+            for o_start, o_end, o_user in overrides:
+                o_start, o_end = max(o_start, cursor), min(o_end, end)
+                if o_start >= o_end:
+                    continue
+                if o_start > cursor:
+                    pieces.append((cursor, o_start, user))
+                pieces.append((o_start, o_end, o_user))
+                cursor = o_end
+            if cursor < end:
+                pieces.append((cursor, end, user))
+            shifts.extend(piece for piece in pieces if piece[1] > since and piece[0] < until)
+        return shifts
+
+    def oncalls(
+        self, schedule_ids: List[str], user_ids: List[str], since: datetime, until: datetime
+    ) -> List[Dict[str, Any]]:
+        """Get /oncalls records, ordered by schedule, level and start time.
+
+        Results are memoized, so paging through a large result doesn't
+        regenerate it for every page.
+        """
+        key = (tuple(schedule_ids), tuple(user_ids), since, until)
+        with self._lock:
+            if key in self._oncalls:
+                return self._oncalls[key]
+
+        records = self._generate_oncalls(schedule_ids, user_ids, since, until)
+        with self._lock:
+            if len(self._oncalls) >= 64:
+                self._oncalls.pop(next(iter(self._oncalls)))
+            self._oncalls[key] = records
+        return records
+
+    def _generate_oncalls(
+        self, schedule_ids: List[str], user_ids: List[str], since: datetime, until: datetime
+    ) -> List[Dict[str, Any]]:
+        records = []
+        for schedule_id in schedule_ids or self.schedule_ids:
+            if schedule_id not in self.schedule_ids:
+                continue
+            for level in range(self.levels):
+                for start, end, user in self.on_call(schedule_id, level, since, until):
+                    if user_ids and user["id"] not in user_ids:
+                        continue
+                    records.extend(
+                        {
+                            "escalation_level": level + 1,
+                            "start": start.strftime(ISO_FORMAT),
+                            "end": end.strftime(ISO_FORMAT),
+                            "user": {"id": user["id"], "type": "user_reference", "summary": user["name"]},
+                            "schedule": {"id": schedule_id, "type": "schedule_reference"},
+                            "escalation_policy": {"id": f"PEP{policy + 1:04d}", "type": "escalation_policy_reference"},
+                        }
+                        for policy in range(self.policies)
+                    )
+        return records
+
+    def rendered_entries(self, schedule_id: str, since: datetime, until: datetime) -> List[Dict[str, Any]]:
+        """Get the final (first level) schedule entries overlapping a range."""
+        return [
+            {
+                "start": start.strftime(ISO_FORMAT),
+                "end": end.strftime(ISO_FORMAT),
+                "user": {"id": user["id"], "type": "user_reference", "summary": user["name"]},
+            }
+            for start, end, user in self.on_call(schedule_id, 0, since, until)
+        ]
+
+    def add_overrides(self, schedule_id: str, requested: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create overrides, returning one result per requested override."""
+        results = []
+        with self._lock:
+            existing = self.overrides.setdefault(schedule_id, [])
+            for override in requested:
+                user_id = override.get("user", {}).get("id")
+                if user_id not in self.users_by_id:
+                    results.append({"status": 400, "errors": [f"User {user_id} not found"]})
+                    continue
+                created = {
+                    "id": f"PO{sum(len(v) for v in self.overrides.values()):06d}",
+                    "start": override["start"],
+                    "end": override["end"],
+                    "user": {"id": user_id, "type": "user_reference", "summary": self.users_by_id[user_id]["name"]},
+                }
+                existing.append(created)
+                results.append({"status": 201, "override": created})
+            self._oncalls.clear()
+        return results
+
+    def list_overrides(self, schedule_id: str, since: datetime, until: datetime) -> List[Dict[str, Any]]:
+        """Get the overrides of a schedule overlapping a range."""
+        with self._lock:
+            return [
+                override
+                for override in self.overrides.get(schedule_id, [])
+                if parse_time(override["end"]) > since and parse_time(override["start"]) < until
+            ]
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Request handler serving a StandInServer's synthetic account."""
+
+    server: "StandInServer"
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _page(self, wrapper: str, records: List[Dict[str, Any]], query: Dict[str, List[str]]) -> None:
+        limit = min(int(query.get("limit", ["25"])[0]), self.server.page_limit)
+        offset = int(query.get("offset", ["0"])[0])
+        body: Dict[str, Any] = {
+            wrapper: records[offset : offset + limit],
+            "limit": limit,
+            "offset": offset,
+            "more": offset + limit < len(records),
+            "total": len(records) if query.get("total", ["false"])[0] == "true" else None,
+        }
+        self._send(200, body)
+
+    def _throttle(self, method: str, parts: List[str]) -> bool:
+        """Count the request and apply injected latency and rate limiting; True if a 429 was sent."""
+        server = self.server
+        endpoint = "/".join(part if i % 2 == 0 else "{id}" for i, part in enumerate(parts))
+        if server.latency:
+            time.sleep(server.latency)
+        with server.lock:
+            server.counts[f"{method} /{endpoint}"] += 1
+            server.requests += 1
+            limited = server.rate_limit_every and server.requests % server.rate_limit_every == 0
+            if limited:
+                server.throttled += 1
+        if limited:
+            self._send(429, {"error": {"message": "Rate Limit Exceeded", "code": 2020}}, {"Retry-After": "0"})
+        return bool(limited)
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        parts = url.path.strip("/").split("/")
+        if self._throttle("GET", parts):
+            return
+
+        account = self.server.account
+        if parts == ["oncalls"]:
+            records = account.oncalls(
+                query.get("schedule_ids[]", []),
+                query.get("user_ids[]", []),
+                parse_time(query["since"][0]),
+                parse_time(query["until"][0]),
+            )
+            self._page("oncalls", records, query)
+        elif parts == ["users"]:
+            ids = query.get("ids[]", [])
+            text = query.get("query", [""])[0].lower()
+            users = [
+                user
+                for user in account.users
+                if (not ids or user["id"] in ids)
+                and (not text or text in user["email"] or text in user["name"].lower())
+            ]
+            self._page("users", users, query)
+        elif len(parts) == 2 and parts[0] == "users":
+            user = account.users_by_id.get(parts[1])
+            if user is None:
+                self._send(404, {"error": {"message": "Not Found", "code": 2100}})
+            else:
+                self._send(200, {"user": user})
+        elif parts == ["abilities"]:
+            self._send(200, {"abilities": ["teams"]})
+        elif parts == ["schedules"]:
+            self._page("schedules", account.schedules, query)
+        elif len(parts) == 2 and parts[0] == "schedules" and parts[1] in account.schedule_ids:
+            schedule = dict(account.schedules[account.schedule_ids.index(parts[1])])
+            if "since" in query and "until" in query:
+                since, until = parse_time(query["since"][0]), parse_time(query["until"][0])
+                schedule["final_schedule"] = {
+                    "name": "Final Schedule",
+                    "rendered_schedule_entries": account.rendered_entries(parts[1], since, until),
+                }
+            self._send(200, {"schedule": schedule})
+        elif len(parts) == 3 and parts[0] == "schedules" and parts[2] == "overrides":
+            since, until = parse_time(query["since"][0]), parse_time(query["until"][0])
+            self._page("overrides", account.list_overrides(parts[1], since, until), query)
+        else:
+            self._send(404, {"error": {"message": "Not Found", "code": 2100}})
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        parts = url.path.strip("/").split("/")
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if self._throttle("POST", parts):
+            return
+
+        if len(parts) == 3 and parts[0] == "schedules" and parts[2] == "overrides":
+            if parts[1] not in self.server.account.schedule_ids:
+                self._send(404, {"error": {"message": "Not Found", "code": 2100}})
+                return
+            requested = body.get("overrides") or ([body["override"]] if "override" in body else [])
+            self._send(201, self.server.account.add_overrides(parts[1], requested))
+        else:
+            self._send(404, {"error": {"message": "Not Found", "code": 2100}})
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Threaded HTTP server with request counters and fault injection settings."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        account: SyntheticAccount,
+        page_limit: int = 100,
+        latency: float = 0.0,
+        rate_limit_every: int = 0,
+        verbose: bool = False,
+    ):
+        super().__init__(address, StandInHandler)
+        self.account = account
+        self.page_limit = page_limit
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.verbose = verbose
+        self.lock = threading.Lock()
+        self.counts: Counter = Counter()
+        self.requests = 0
+        self.throttled = 0
+
+
+class RedirectTransport(httpx2.HTTPTransport):
+    """Transport sending every request to a local server, whatever its URL."""
+
+    def __init__(self, host: str, port: int, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.host = host
+        self.port = port
+
+    def handle_request(self, request: httpx2.Request) -> httpx2.Response:
+        # The response keeps pointing at the original request, so the client
+        # still sees (and profiles) PagerDuty URLs
+        local = httpx2.Request(
+            request.method,
+            request.url.copy_with(scheme="http", host=self.host, port=self.port),
+            headers=request.headers,
+            stream=request.stream,
+        )
+        return super().handle_request(local)
+
+
+class StandIn:
+    """A stand-in server running in a background thread.
+
+    Example:
+        with StandIn(SyntheticAccount(users=100)) as standin:
+            session = standin.client()
+            ...
+    """
+
+    def __init__(
+        self,
+        account: Optional[SyntheticAccount] = None,
+        page_limit: int = 100,
+        latency: float = 0.0,
+        rate_limit_every: int = 0,
+        port: int = 0,
+        verbose: bool = False,
+    ):
+        """Create the server (it starts serving on start() or when entering the context).
+
+        Args:
+            account: Synthetic account to serve (a default one if not given)
+            page_limit: Maximum page size, whatever limit clients ask for
+            latency: Seconds added to every response
+            rate_limit_every: Answer every Nth request with a 429 (0 disables)
+            port: Port to listen on (0 picks a free one)
+            verbose: Log every request to stderr
+        """
+        self.account = account or SyntheticAccount()
+        self.server = StandInServer(
+            ("127.0.0.1", port), self.account, page_limit, latency, rate_limit_every, verbose=verbose
+        )
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self) -> "StandIn":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "StandIn":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def reset_counts(self) -> None:
+        """Reset the request counters."""
+        with self.server.lock:
+            self.server.counts.clear()
+            self.server.requests = 0
+            self.server.throttled = 0
+
+    @property
+    def counts(self) -> Counter:
+        """Requests received per endpoint, including throttled ones."""
+        with self.server.lock:
+            return Counter(self.server.counts)
+
+    def client(self, cls: Any = None, **kwargs: Any) -> Any:
+        """Create a PagerDuty API session talking to this stand-in (see make_client)."""
+        return make_client(self.port, cls, **kwargs)
+
+
+def _serve(conn: Any, account_kwargs: Dict[str, Any], server_kwargs: Dict[str, Any]) -> None:
+    """Child process entry point: serve a stand-in and report its port."""
+    standin = StandIn(SyntheticAccount(**account_kwargs), **server_kwargs)
+    conn.send(standin.port)
+    standin.server.serve_forever()
+
+
+class StandInProcess:
+    """A stand-in server running in a child process.
+
+    Unlike StandIn, the server's allocations and CPU time don't show up in the
+    measurements of the process running the client.
+
+    Example:
+        with StandInProcess({"users": 100}, {"latency": 0.01}) as standin:
+            session = standin.client()
+            ...
+    """
+
+    def __init__(self, account_kwargs: Optional[Dict[str, Any]] = None, server_kwargs: Optional[Dict[str, Any]] = None):
+        """Prepare the child process.
+
+        Args:
+            account_kwargs: Keyword arguments for SyntheticAccount
+            server_kwargs: Keyword arguments for StandIn (page_limit, latency, rate_limit_every, ...)
+        """
+        self.account_kwargs = account_kwargs or {}
+        self.server_kwargs = server_kwargs or {}
+        self.port = 0
+        self._process: Optional[multiprocessing.Process] = None
+
+    def __enter__(self) -> "StandInProcess":
+        parent, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_serve, args=(child, self.account_kwargs, self.server_kwargs), daemon=True
+        )
+        self._process.start()
+        self.port = parent.recv()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+
+    def client(self, cls: Any = None, **kwargs: Any) -> Any:
+        """Create a PagerDuty API session talking to this stand-in (see make_client)."""
+        return make_client(self.port, cls, **kwargs)
+
+
+def make_client(port: int, cls: Any = None, **kwargs: Any) -> Any:
+    """Create a PagerDuty API session talking to a stand-in on a local port.
+
+    Args:
+        port: Port the stand-in listens on
+        cls: Session class (defaults to myshift.util.MyShiftClient)
+        **kwargs: Extra keyword arguments for the session class
+
+    Returns:
+        Session instance, with a short retry back-off
+    """
+    if cls is None:
+        from myshift.util import MyShiftClient
+
+        cls = MyShiftClient
+
+    session = cls("standin-token", transport=RedirectTransport("127.0.0.1", port), **kwargs)
+    # Keep injected 429s from dominating wall times
+    session.sleep_timer = 0.01
+    return session
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a synthetic PagerDuty account locally")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on (default: 8080)")
+    parser.add_argument("--users", type=int, default=50, help="Number of users (default: 50)")
+    parser.add_argument("--schedules", type=int, default=1, help="Number of schedules (default: 1)")
+    parser.add_argument("--shift-hours", type=float, default=12, help="Shift length in hours (default: 12)")
+    parser.add_argument("--levels", type=int, default=2, help="Escalation levels (default: 2)")
+    parser.add_argument("--policies", type=int, default=1, help="Escalation policies using every schedule (default: 1)")
+    parser.add_argument("--page-limit", type=int, default=100, help="Maximum page size (default: 100)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Answer every Nth request with a 429")
+    args = parser.parse_args()
+
+    account = SyntheticAccount(args.users, args.schedules, args.shift_hours, args.levels, policies=args.policies)
+    standin = StandIn(account, args.page_limit, args.latency, args.rate_limit_every, args.port, verbose=True)
+    print(f"Serving {args.users} users and schedules {', '.join(account.schedule_ids)} on {standin.url}")
+    try:
+        standin.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
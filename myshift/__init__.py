@@ -5,19 +5,40 @@ Features:
 - Plan future schedules
 - Override shifts
 - Interactive REPL mode
+
+The helpers re-exported here are imported on first access, so that importing
+the package (and starting the CLI) doesn't load the PagerDuty client stack.
 """
 
-from typing import Final
+from importlib import import_module
+from typing import Any, Final
 
 __version__: Final = "0.1.0"
 
-from myshift.config import load_config
-from myshift.util import (
-    build_user_map,
-    get_all_unique_shifts,
-    get_pd_session,
-    get_unique_shifts,
-    get_user_id_by_email,
-    get_user_name_by_id,
-    resolve_schedule_id,
-)
+_LAZY_ATTRIBUTES = {
+    "load_config": "myshift.config",
+    "build_user_map": "myshift.util",
+    "build_user_map_for_ids": "myshift.util",
+    "get_all_unique_shifts": "myshift.util",
+    "get_pd_session": "myshift.util",
+    "get_unique_shifts": "myshift.util",
+    "get_user_id_by_email": "myshift.util",
+    "get_user_name_by_id": "myshift.util",
+    "resolve_schedule_id": "myshift.util",
+}
+
+__all__ = ["__version__", *_LAZY_ATTRIBUTES]
+
+
+def __getattr__(name: str) -> Any:
+    """Import re-exported helpers on first access (PEP 562)."""
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -12,24 +12,27 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-"""Command-line interface for MyShift."""
+"""Command-line interface for MyShift.
+
+Subcommand modules, and with them the PagerDuty client stack, are imported only
+once the command line has been parsed, so that --help, --version and
+'config --print' start quickly.
+"""
 
 import argparse
+import os
 import sys
-from datetime import datetime, timedelta
-
-import dateutil.parser as date_parser
-import dateutil.tz
 
 from myshift import __version__
-from myshift.config import load_config
-from myshift.next import next_shift
-from myshift.override import create_override
-from myshift.plan import plan_schedule
-from myshift.repl import start_repl
-from myshift.util import (
-    get_pd_session,
-    resolve_schedule_id,
+from myshift.defaults import (
+    DEFAULT_NIGHT_END,
+    DEFAULT_NIGHT_START,
+    DEFAULT_OVERRIDE_CHUNK_SIZE,
+    DEFAULT_OVERRIDE_WORKERS,
+    DEFAULT_SCHEDULE_WORKERS,
+    DEFAULT_WATCH_DAYS,
+    DEFAULT_WATCH_INTERVAL,
+    FETCH_ENGINES,
 )
 
 
@@ -37,26 +40,294 @@ def parse_args() -> argparse.Namespace:
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(description="Command-line interface for managing PagerDuty on-call schedules")
     parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    fetch_mode = parser.add_mutually_exclusive_group()
+    fetch_mode.add_argument(
+        "--async",
+        dest="async_fetch",
+        action="store_true",
+        help="Fetch pages of shifts concurrently (same as 'fetch_mode: async' in the config)",
+    )
+    fetch_mode.add_argument(
+        "--sharded",
+        action="store_true",
+        help="Split long ranges into time windows fetched in parallel (same as 'fetch_mode: sharded' in the config)",
+    )
+    parser.add_argument(
+        "--fetch-engine",
+        choices=FETCH_ENGINES,
+        help="Read shifts from /oncalls, the rendered final schedule, or either (default: 'fetch_engine' config, auto)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print a summary of API requests, retries, latencies and CPU time to stderr at exit",
+    )
+    parser.add_argument(
+        "--profile-format",
+        choices=("text", "json"),
+        default="text",
+        help="Format of the --profile summary (default: text)",
+    )
+
+    parser.add_argument(
+        "--config-profile",
+        metavar="NAME",
+        default=os.environ.get("MYSHIFT_PROFILE"),
+        help="Use the named profile of the configuration file (default: $MYSHIFT_PROFILE, or the top-level settings)",
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Run the command in this process even if a myshift daemon is running",
+    )
 
     subparsers = parser.add_subparsers(dest="command", help="Command to run")
 
     # Next shift command
     next_parser = subparsers.add_parser("next", help="Show next shift")
-    next_parser.add_argument("--user", help="Show next shift for specific user (email)")
+    next_users = next_parser.add_mutually_exclusive_group()
+    next_users.add_argument("--user", help="Show next shift for specific user (email)")
+    next_users.add_argument(
+        "--users",
+        action="append",
+        help="Show next shifts for several users, one line each (emails, comma-separated or repeatable)",
+    )
+    next_parser.add_argument("--schedule-id", help="Schedule ID (defaults to schedule_id in the config)")
+
+    # Upcoming shifts command
+    upcoming_parser = subparsers.add_parser("upcoming", help="Show upcoming shifts of a user")
+    upcoming_parser.add_argument("--user", help="Show upcoming shifts for specific user (email)")
+    upcoming_parser.add_argument("--days", type=int, default=28, help="Number of days to show (default: 28)")
+    upcoming_parser.add_argument("--schedule-id", help="Schedule ID (defaults to schedule_id in the config)")
 
     # Plan command
     plan_parser = subparsers.add_parser("plan", help="Plan future schedule")
-    plan_parser.add_argument("--start", help="Start date (YYYY-MM-DD)", required=True)
-    plan_parser.add_argument("--end", help="End date (YYYY-MM-DD)", required=True)
+    plan_parser.add_argument("--days", type=int, default=28, help="Number of days to show (default: 28)")
+    plan_parser.add_argument(
+        "--schedule-id",
+        dest="schedule_ids",
+        action="append",
+        help="Schedule ID to include (repeatable, or comma-separated)",
+    )
+    plan_parser.add_argument("--team", help="Include every schedule on this team (team ID)")
+    plan_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print shifts as pages arrive instead of after fetching the whole range",
+    )
+    plan_parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_SCHEDULE_WORKERS,
+        help=f"Maximum number of schedules fetched in parallel (default: {DEFAULT_SCHEDULE_WORKERS})",
+    )
+
+    # On-call load statistics command
+    stats_parser = subparsers.add_parser("stats", help="Show on-call hours, night and weekend hours per user")
+    stats_parser.add_argument("--quarter", help="Calendar quarter, e.g. 2025Q3 (default: the current quarter)")
+    stats_parser.add_argument("--since", help="Start of the period (YYYY-MM-DD [HH:MM]), overriding the quarter's")
+    stats_parser.add_argument("--until", help="End of the period (YYYY-MM-DD [HH:MM]), overriding the quarter's")
+    stats_parser.add_argument(
+        "--schedule-id",
+        dest="schedule_ids",
+        action="append",
+        help="Schedule ID to include (repeatable, or comma-separated)",
+    )
+    stats_parser.add_argument("--team", help="Include every schedule on this team (team ID)")
+    stats_parser.add_argument(
+        "--night-start",
+        type=int,
+        default=DEFAULT_NIGHT_START,
+        help=f"Local hour at which night time starts (default: {DEFAULT_NIGHT_START})",
+    )
+    stats_parser.add_argument(
+        "--night-end",
+        type=int,
+        default=DEFAULT_NIGHT_END,
+        help=f"Local hour at which night time ends (default: {DEFAULT_NIGHT_END})",
+    )
+    stats_parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_SCHEDULE_WORKERS,
+        help=f"Maximum number of schedules fetched in parallel (default: {DEFAULT_SCHEDULE_WORKERS})",
+    )
+
+    # Coverage check command
+    gaps_parser = subparsers.add_parser("gaps", help="Show windows where nobody, or more than one user, is on call")
+    gaps_parser.add_argument("--days", type=int, default=28, help="Number of days to check (default: 28)")
+    gaps_parser.add_argument("--since", help="Start of the period (YYYY-MM-DD [HH:MM], default: now)")
+    gaps_parser.add_argument(
+        "--schedule-id",
+        dest="schedule_ids",
+        action="append",
+        help="Schedule ID to include (repeatable, or comma-separated)",
+    )
+    gaps_parser.add_argument("--team", help="Include every schedule on this team (team ID)")
+    gaps_parser.add_argument(
+        "--expected",
+        type=int,
+        default=1,
+        help="Number of users expected to be on call at any time (default: 1)",
+    )
+    gaps_parser.add_argument(
+        "--combined",
+        action="store_true",
+        help="Check the schedules together, as one rotation, instead of each on its own",
+    )
+    gaps_parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_SCHEDULE_WORKERS,
+        help=f"Maximum number of schedules fetched in parallel (default: {DEFAULT_SCHEDULE_WORKERS})",
+    )
+
+    # Calendar export command
+    export_parser = subparsers.add_parser("export", help="Export shifts as an iCalendar feed")
+    export_parser.add_argument(
+        "--ics",
+        dest="format",
+        action="store_const",
+        const="ics",
+        default="ics",
+        help="Write iCalendar (.ics) events (the default, and currently the only format)",
+    )
+    export_parser.add_argument(
+        "--output",
+        "-o",
+        help="File to write (default: stdout); re-exports only rewrite it when events changed",
+    )
+    export_parser.add_argument("--user", help="Only export the shifts of this user (email)")
+    export_parser.add_argument("--days", type=int, default=90, help="Number of days to export (default: 90)")
+    export_parser.add_argument("--since", help="Start of the exported period (YYYY-MM-DD [HH:MM], default: now)")
+    export_parser.add_argument(
+        "--schedule-id",
+        dest="schedule_ids",
+        action="append",
+        help="Schedule ID to include (repeatable, or comma-separated)",
+    )
+    export_parser.add_argument("--team", help="Include every schedule on this team (team ID)")
+    export_parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_SCHEDULE_WORKERS,
+        help=f"Maximum number of schedules fetched in parallel (default: {DEFAULT_SCHEDULE_WORKERS})",
+    )
+
+    # Change detection command
+    watch_parser = subparsers.add_parser("watch", help="Print shifts added, removed or reassigned as schedules change")
+    watch_parser.add_argument(
+        "--schedule-id",
+        dest="schedule_ids",
+        action="append",
+        help="Schedule ID to watch (repeatable, or comma-separated)",
+    )
+    watch_parser.add_argument("--team", help="Watch every schedule on this team (team ID)")
+    watch_parser.add_argument(
+        "--user",
+        dest="users",
+        action="append",
+        help="Only report changes involving this user (email, repeatable)",
+    )
+    watch_parser.add_argument(
+        "--days",
+        type=int,
+        default=DEFAULT_WATCH_DAYS,
+        help=f"Number of days of shifts watched from now (default: {DEFAULT_WATCH_DAYS})",
+    )
+    watch_parser.add_argument(
+        "--interval",
+        type=int,
+        default=DEFAULT_WATCH_INTERVAL,
+        help=f"Seconds between polls (default: {DEFAULT_WATCH_INTERVAL})",
+    )
+    watch_parser.add_argument(
+        "--format",
+        choices=("text", "json"),
+        default="text",
+        help="Print changes as text, or as one JSON object per line (default: text)",
+    )
+    watch_parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Poll once, printing the changes since the previous watch, and exit",
+    )
+    watch_parser.add_argument("--state-dir", help="Directory of the watch snapshots (default: the cache directory)")
+    watch_parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_SCHEDULE_WORKERS,
+        help=f"Maximum number of schedules fetched in parallel (default: {DEFAULT_SCHEDULE_WORKERS})",
+    )
+
+    # Point-in-time lookup command
+    at_parser = subparsers.add_parser("at", help="Show who is on call at a point in time")
+    at_parser.add_argument("time", help="Point in time (YYYY-MM-DD HH:MM, local time unless a zone is given)")
+    at_parser.add_argument("--schedule-id", help="Schedule ID (defaults to schedule_id in the config)")
+
+    # Range lookup command
+    between_parser = subparsers.add_parser("between", help="Show shifts overlapping a time range")
+    between_parser.add_argument("start", help="Range start (YYYY-MM-DD [HH:MM])")
+    between_parser.add_argument("end", help="Range end (YYYY-MM-DD [HH:MM])")
+    between_parser.add_argument("--schedule-id", help="Schedule ID (defaults to schedule_id in the config)")
 
     # Override command
     override_parser = subparsers.add_parser("override", help="Create shift override")
-    override_parser.add_argument("--user", help="User to override (email)", required=True)
-    override_parser.add_argument("--start", help="Start time (YYYY-MM-DD HH:MM)", required=True)
-    override_parser.add_argument("--end", help="End time (YYYY-MM-DD HH:MM)", required=True)
+    override_parser.add_argument("--user", help="User taking the shifts (email)", required=True)
+    override_parser.add_argument("--target", help="User whose shifts are taken over (email)", required=True)
+    override_parser.add_argument("--start", help="First day of the overridden shifts (YYYY-MM-DD)", required=True)
+    override_parser.add_argument("--end", help="Last day of the overridden shifts (YYYY-MM-DD)")
+    override_parser.add_argument("--schedule-id", help="Schedule ID (defaults to schedule_id in the config)")
+    override_parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_OVERRIDE_CHUNK_SIZE,
+        help=f"Maximum number of overrides per request (default: {DEFAULT_OVERRIDE_CHUNK_SIZE})",
+    )
+    override_parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_OVERRIDE_WORKERS,
+        help=f"Maximum number of requests in flight (default: {DEFAULT_OVERRIDE_WORKERS})",
+    )
+    override_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print the overrides that would be created, and the shifts already covered, without creating any",
+    )
 
     # REPL command
-    subparsers.add_parser("repl", help="Start interactive REPL")
+    repl_parser = subparsers.add_parser("repl", help="Start interactive REPL")
+    repl_parser.add_argument("--schedule-id", help="Schedule ID (defaults to schedule_id in the config)")
+    repl_parser.add_argument(
+        "--refresh",
+        type=int,
+        metavar="SECONDS",
+        help="Refresh near-term shifts in the background every SECONDS while idle (default: repl_refresh, or off)",
+    )
+
+    # Daemon command
+    daemon_parser = subparsers.add_parser(
+        "daemon", help="Keep shifts warm in the background and answer next, plan and upcoming over a socket"
+    )
+    daemon_parser.add_argument(
+        "--socket", help="Socket path (default: $MYSHIFT_SOCKET, or myshift.sock in $XDG_RUNTIME_DIR)"
+    )
+    daemon_parser.add_argument(
+        "--refresh",
+        type=int,
+        metavar="SECONDS",
+        help="Refresh near-term shifts every SECONDS (default: daemon.refresh in the config, or 60; 0 disables)",
+    )
+
+    # Config command
+    config_parser = subparsers.add_parser("config", help="Print a sample configuration or validate the current one")
+    config_parser.add_argument("--print", action="store_true", help="Print a sample configuration file")
+    config_parser.add_argument(
+        "--compile",
+        action="store_true",
+        help="Validate every profile and resolve emails and schedule names to IDs into a snapshot used at startup",
+    )
 
     return parser.parse_args()
 
@@ -64,32 +335,200 @@ def parse_args() -> argparse.Namespace:
 def main() -> int:
     """Main entry point."""
     args = parse_args()
-    config = load_config()
+
+    if args.command == "config":
+        from myshift.config import config_main
+
+        config_args = ["--print"] if args.print else ["--compile"] if args.compile else []
+        if args.config_profile:
+            config_args += ["--config-profile", args.config_profile]
+        config_main(config_args)
+        return 0
+
+    if args.command is None:
+        print("No command specified. Use --help for usage information.")
+        return 1
+
+    # Hand the command to a running daemon if there is one; it answers from warm state
+    if args.command in ("next", "plan", "upcoming") and not (
+        args.no_daemon or args.profile or args.async_fetch or args.sharded or args.fetch_engine
+    ):
+        from myshift.daemon import request_daemon, request_from_args
+
+        status = request_daemon(request_from_args(args))
+        if status is not None:
+            return status
+
+    from myshift.config import get_my_user_id, load_config
+    from myshift.util import get_pd_session, resolve_schedule_id
+
+    config = load_config(args.config_profile)
+    if args.async_fetch:
+        config["fetch_mode"] = "async"
+    if args.sharded:
+        config["fetch_mode"] = "sharded"
+    if args.fetch_engine:
+        config["fetch_engine"] = args.fetch_engine
+    if args.profile:
+        config["profile"] = args.profile_format
+
+    if args.command == "next" and args.users:
+        from myshift.next import next_shifts
+
+        pd = get_pd_session(config)
+        schedule_id = resolve_schedule_id(args, config)
+        emails = [email.strip() for value in args.users for email in value.split(",") if email.strip()]
+        next_shifts(pd, schedule_id, emails)
+        return 0
 
     if args.command == "next":
+        from myshift.next import next_shift
+
         pd = get_pd_session(config)
-        schedule_id = resolve_schedule_id(config)
-        next_shift(pd, schedule_id, args.user)
+        schedule_id = resolve_schedule_id(args, config)
+        user_id = None if args.user else get_my_user_id(config)
+        next_shift(pd, schedule_id, args.user or config.get("my_user"), user_id=user_id)
+        return 0
+
+    if args.command == "upcoming":
+        from myshift.upcoming import upcoming_shifts
+
+        pd = get_pd_session(config)
+        schedule_id = resolve_schedule_id(args, config)
+        user_id = None if args.user else get_my_user_id(config)
+        upcoming_shifts(pd, schedule_id, args.user or config.get("my_user"), args.days, user_id=user_id)
+        return 0
+
+    if args.command == "daemon":
+        from myshift.daemon import DEFAULT_FULL_REFRESH, DEFAULT_REFRESH, serve
+
+        settings = config.get("daemon") if isinstance(config.get("daemon"), dict) else {}
+        refresh = args.refresh if args.refresh is not None else int(settings.get("refresh", DEFAULT_REFRESH))
+        serve(
+            config,
+            os.path.expanduser(args.socket) if args.socket else None,
+            refresh=refresh,
+            full_refresh=int(settings.get("full_refresh", DEFAULT_FULL_REFRESH)),
+            profile=args.config_profile,
+        )
         return 0
 
     if args.command == "plan":
+        from myshift.plan import plan_schedules
+        from myshift.util import resolve_schedule_ids
+
+        pd = get_pd_session(config)
+        schedules = resolve_schedule_ids(args, config, pd)
+        plan_schedules(pd, schedules, args.days, args.workers, args.stream)
+        return 0
+
+    if args.command == "stats":
+        from myshift.stats import load_stats, stats_period
+        from myshift.util import resolve_schedule_ids
+
+        try:
+            since, until = stats_period(args.quarter, args.since, args.until)
+        except (ValueError, OverflowError) as e:
+            print(f"Invalid period: {e}", file=sys.stderr)
+            return 1
+
+        pd = get_pd_session(config)
+        schedules = resolve_schedule_ids(args, config, pd)
+        load_stats(pd, schedules, since, until, args.workers, args.night_start, args.night_end)
+        return 0
+
+    if args.command == "gaps":
+        from myshift.gaps import check_coverage
+        from myshift.lookup import parse_time
+        from myshift.util import resolve_schedule_ids
+
+        try:
+            since = parse_time(args.since) if args.since else None
+        except (ValueError, OverflowError) as e:
+            print(f"Invalid time: {e}", file=sys.stderr)
+            return 1
+
+        pd = get_pd_session(config)
+        schedules = resolve_schedule_ids(args, config, pd)
+        check_coverage(pd, schedules, args.days, since, args.expected, args.combined, args.workers)
+        return 0
+
+    if args.command == "export":
+        from myshift.export import export_ics
+        from myshift.lookup import parse_time
+        from myshift.util import resolve_schedule_ids
+
+        try:
+            since = parse_time(args.since) if args.since else None
+        except (ValueError, OverflowError) as e:
+            print(f"Invalid time: {e}", file=sys.stderr)
+            return 1
+
+        pd = get_pd_session(config)
+        schedules = resolve_schedule_ids(args, config, pd)
+        export_ics(pd, schedules, args.days, since, args.user, args.output, args.workers)
+        return 0
+
+    if args.command == "watch":
+        from pathlib import Path
+
+        from myshift.util import resolve_schedule_ids
+        from myshift.watch import get_watch_state_dir, watch_schedules
+
+        if args.interval < 1 or args.days < 1:
+            print("--interval and --days must be positive", file=sys.stderr)
+            return 1
+
         pd = get_pd_session(config)
-        schedule_id = resolve_schedule_id(config)
-        start = date_parser.parse(args.start)
-        end = date_parser.parse(args.end)
-        plan_schedule(pd, schedule_id, start, end)
+        schedules = resolve_schedule_ids(args, config, pd)
+        state_dir = Path(args.state_dir).expanduser() if args.state_dir else get_watch_state_dir(config)
+        watch_schedules(
+            pd, schedules, state_dir, args.days, args.users, args.interval, args.format, args.once, args.workers
+        )
+        return 0
+
+    if args.command in ("at", "between"):
+        from myshift.lookup import on_call_at, parse_time, shifts_between
+
+        try:
+            times = [parse_time(value) for value in ((args.time,) if args.command == "at" else (args.start, args.end))]
+        except (ValueError, OverflowError) as e:
+            print(f"Invalid time: {e}", file=sys.stderr)
+            return 1
+
+        pd = get_pd_session(config)
+        schedule_id = resolve_schedule_id(args, config)
+        if args.command == "at":
+            on_call_at(pd, schedule_id, times[0])
+        else:
+            shifts_between(pd, schedule_id, times[0], times[1])
         return 0
 
     if args.command == "override":
+        from myshift.override import create_override
+
         pd = get_pd_session(config)
-        schedule_id = resolve_schedule_id(config)
-        start = date_parser.parse(args.start)
-        end = date_parser.parse(args.end)
-        create_override(pd, schedule_id, args.user, start, end)
+        schedule_id = resolve_schedule_id(args, config)
+        create_override(
+            pd,
+            schedule_id,
+            user_email=args.user,
+            target_user_email=args.target,
+            start_str=args.start,
+            end_str=args.end,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            dry_run=args.dry_run,
+        )
         return 0
 
     if args.command == "repl":
-        start_repl()
+        from myshift.repl import start_repl
+
+        pd = get_pd_session(config, warm=True)
+        schedule_id = resolve_schedule_id(args, config)
+        refresh = args.refresh if args.refresh is not None else int(config.get("repl_refresh", 0))
+        start_repl(pd, schedule_id, refresh)
         return 0
 
     print("No command specified. Use --help for usage information.")
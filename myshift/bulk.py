@@ -0,0 +1,418 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Bulk submission of schedule overrides.
+
+Creating overrides for many shifts at once is split into bounded chunks:
+- Chunks are submitted concurrently, each request waiting on the session's
+  rate limiter (see myshift.ratelimit)
+- Failed chunks are retried with back-off; a chunk rejected as a whole is
+  resubmitted one override at a time, so one bad entry doesn't fail the rest
+- Every shift gets its own result
+
+Each override has a deterministic idempotency key derived from the schedule,
+user and time range. Keys are recorded in a local journal before submission
+and marked done with the created override's ID afterwards, so a re-run skips
+overrides that were already created. Journal entries are reconciled against
+the overrides that exist on the schedule: keys left pending by a crash, or by
+a request that failed without saying what it created, are marked done if the
+override exists, and entries whose override has been deleted are dropped.
+"""
+
+import hashlib
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, TypedDict
+
+from pagerduty import HttpError, RestApiV2Client
+
+from myshift.cache import connect, get_cache_path, get_cache_settings, init_db, transaction
+from myshift.defaults import DEFAULT_OVERRIDE_CHUNK_SIZE, DEFAULT_OVERRIDE_WORKERS
+from myshift.intervals import ShiftIndex
+from myshift.timestamps import parse_utc
+
+JOURNAL_DB_NAME = "overrides.sqlite"
+
+DEFAULT_RETRIES = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS overrides (
+    key TEXT PRIMARY KEY,
+    schedule_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    starts_at TEXT NOT NULL,
+    ends_at TEXT NOT NULL,
+    override_id TEXT,
+    updated_at INTEGER NOT NULL
+);
+"""
+
+
+class OverrideResult(TypedDict):
+    """Outcome of creating the override of one shift."""
+
+    key: str
+    start: str
+    end: str
+    status: str  # "created", "exists", "failed" or "unknown" (may have been created; reconciled by the next run)
+    override_id: Optional[str]
+    error: Optional[str]
+
+
+def idempotency_key(schedule_id: str, user_id: str, start: str, end: str) -> str:
+    """Get the deterministic idempotency key of an override.
+
+    Args:
+        schedule_id: PagerDuty schedule ID
+        user_id: ID of the user taking the shift
+        start: Override start (PagerDuty timestamp)
+        end: Override end (PagerDuty timestamp)
+
+    Returns:
+        Hex key, identical for identical overrides
+    """
+    return hashlib.sha256(f"{schedule_id}|{user_id}|{start}|{end}".encode()).hexdigest()[:32]
+
+
+class OverrideJournal:
+    """Local record of submitted overrides, keyed by idempotency key."""
+
+    def __init__(self, path: Path):
+        """Initialize the journal, creating the database if needed.
+
+        Args:
+            path: Path of the SQLite database file
+        """
+        self.path = path
+        init_db(self.path, _SCHEMA)
+
+    def lookup(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Get the journal entries of some keys.
+
+        Args:
+            keys: Idempotency keys
+
+        Returns:
+            Mapping of the keys found to their override ID (None while pending)
+        """
+        keys = list(keys)
+        found: Dict[str, Optional[str]] = {}
+        with connect(self.path) as conn:
+            for i in range(0, len(keys), 500):
+                batch = keys[i : i + 500]
+                # Only placeholders are formatted into the query; the keys are bound parameters
+                placeholders = ",".join("?" * len(batch))
+                query = "SELECT key, override_id FROM overrides WHERE key IN (%s)" % placeholders  # nosec B608
+                rows = conn.execute(query, batch)
+                found.update(dict(rows))
+        return found
+
+    def mark_pending(self, schedule_id: str, user_id: str, overrides: List[Dict[str, Any]]) -> None:
+        """Record overrides about to be submitted."""
+        now = int(time.time())
+        rows = [(o["key"], schedule_id, user_id, o["start"], o["end"], now) for o in overrides]
+        with transaction(self.path) as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO overrides (key, schedule_id, user_id, starts_at, ends_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def mark_done(self, created: Dict[str, str]) -> None:
+        """Record the IDs of created overrides, by idempotency key."""
+        now = int(time.time())
+        with transaction(self.path) as conn:
+            conn.executemany(
+                "UPDATE overrides SET override_id = ?, updated_at = ? WHERE key = ?",
+                [(override_id, now, key) for key, override_id in created.items()],
+            )
+
+    def forget(self, keys: Iterable[str]) -> None:
+        """Drop entries of overrides that do not exist."""
+        with transaction(self.path) as conn:
+            conn.executemany("DELETE FROM overrides WHERE key = ?", [(key,) for key in keys])
+
+
+def open_override_journal(config: Dict[str, Any]) -> Optional[OverrideJournal]:
+    """Create the override journal, in the cache directory.
+
+    The journal guards against duplicate overrides, so it is kept even when
+    the shift cache is disabled.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        OverrideJournal instance, or None if it cannot be opened
+    """
+    path = get_cache_path(get_cache_settings(config) or {}, JOURNAL_DB_NAME)
+    try:
+        return OverrideJournal(path)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Warning: override journal disabled, cannot open {path}: {e}", file=sys.stderr)
+        return None
+
+
+def _retryable(error: Exception) -> bool:
+    """Whether a failed submission is worth retrying."""
+    if isinstance(error, HttpError):
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return True
+
+
+def _ambiguous(error: Exception) -> bool:
+    """Whether a failed submission may still have created overrides (e.g. a 5xx or a dropped connection)."""
+    return not isinstance(error, HttpError) or error.response.status_code >= 500
+
+
+def list_overrides(
+    session: RestApiV2Client, schedule_id: str, since: datetime, until: datetime
+) -> List[Dict[str, Any]]:
+    """Get the overrides a schedule has in a time range.
+
+    Args:
+        session: PagerDuty API session
+        schedule_id: PagerDuty schedule ID
+        since: Range start
+        until: Range end
+
+    Returns:
+        List of PagerDuty override records
+    """
+    params = {"since": since.isoformat(), "until": until.isoformat()}
+    return list(session.iter_all(f"/schedules/{schedule_id}/overrides", params=params))
+
+
+def _span(overrides: List[Dict[str, Any]]) -> Tuple[datetime, datetime]:
+    """Get the time range covered by some overrides."""
+    return min(parse_utc(o["start"]) for o in overrides), max(parse_utc(o["end"]) for o in overrides)
+
+
+def _find_existing(overrides: List[Dict[str, Any]], records: Iterable[Dict[str, Any]]) -> Dict[str, str]:
+    """Find overrides among a schedule's override records.
+
+    Timestamps are compared as instants, as PagerDuty may not return them in the form they were submitted in.
+
+    Returns:
+        Mapping of idempotency key to override ID, for the overrides that exist
+    """
+    existing: Dict[Tuple[str, datetime, datetime], str] = {}
+    for found in records:
+        existing[(found["user"]["id"], parse_utc(found["start"]), parse_utc(found["end"]))] = found["id"]
+
+    created = {}
+    for override in overrides:
+        override_id = existing.get((override["user_id"], parse_utc(override["start"]), parse_utc(override["end"])))
+        if override_id:
+            created[override["key"]] = override_id
+    return created
+
+
+def _indexed(index: ShiftIndex, override: Dict[str, Any]) -> bool:
+    """Whether an index of a schedule's overrides holds an override."""
+    start, end = parse_utc(override["start"]), parse_utc(override["end"])
+    return (start, end, override["user_id"]) in index.between(start, end)
+
+
+def _submit_chunk(
+    session: RestApiV2Client,
+    schedule_id: str,
+    chunk: List[Dict[str, Any]],
+    retries: int,
+) -> Dict[str, Tuple[str, Optional[str], Optional[str]]]:
+    """Submit one chunk of overrides, with retries.
+
+    An attempt that failed without saying which overrides it created is not
+    simply retried: the schedule's overrides are listed first, and only the
+    overrides still missing are resubmitted.
+
+    Returns:
+        Mapping of idempotency key to (status, override ID, error message), where
+        status is "created", "failed" or "unknown" (the attempts may have created it)
+    """
+    outcome: Dict[str, Tuple[str, Optional[str], Optional[str]]] = {}
+    pending = list(chunk)
+    error = "no result after retries"
+    ambiguous = False
+
+    def settle() -> List[Dict[str, Any]]:
+        # Keep the overrides an ambiguous attempt did create; the rest are still pending
+        created = _find_existing(pending, list_overrides(session, schedule_id, *_span(pending)))
+        for key, override_id in created.items():
+            outcome[key] = ("created", override_id, None)
+        return [o for o in pending if o["key"] not in created]
+
+    # One more pass than there are attempts, to settle the last one
+    for attempt in range(retries + 2):
+        if ambiguous:
+            try:
+                pending = settle()
+            except Exception as e:
+                error = f"{error}; listing overrides failed: {e}"
+                break
+            ambiguous = False
+        if not pending or attempt > retries:
+            break
+        if attempt:
+            time.sleep(min(30.0, 2.0**attempt))
+
+        payload = [
+            {
+                "start": o["start"],
+                "end": o["end"],
+                "user": {"id": o["user_id"], "type": "user_reference"},
+                "time_zone": "UTC",
+            }
+            for o in pending
+        ]
+        try:
+            results = session.rpost(f"/schedules/{schedule_id}/overrides", json=payload)
+        except Exception as e:
+            if isinstance(e, HttpError) and not _retryable(e) and len(pending) > 1:
+                # Rejected as a whole: find the bad entries by submitting them one by one
+                for override in pending:
+                    outcome.update(_submit_chunk(session, schedule_id, [override], retries))
+                return outcome
+            if not _retryable(e):
+                for override in pending:
+                    outcome[override["key"]] = ("failed", None, str(e))
+                return outcome
+            error = str(e)
+            ambiguous = _ambiguous(e)
+            continue
+
+        retry = []
+        for override, result in zip(pending, results or []):
+            status = int(result.get("status", 201))
+            if 200 <= status < 300 and result.get("override"):
+                outcome[override["key"]] = ("created", result["override"]["id"], None)
+            elif status == 429 or status >= 500:
+                retry.append(override)
+                error = f"status {status}"
+                ambiguous = ambiguous or status >= 500
+            else:
+                error_message = "; ".join(map(str, result.get("errors") or [f"status {status}"]))
+                outcome[override["key"]] = ("failed", None, error_message)
+        if len(results or []) < len(pending):
+            # Overrides without a result may have been created all the same
+            retry.extend(pending[len(results or []) :])
+            ambiguous = True
+        pending = retry
+
+    for override in pending:
+        outcome.setdefault(override["key"], ("unknown" if ambiguous else "failed", None, error))
+    return outcome
+
+
+def submit_overrides(
+    session: RestApiV2Client,
+    schedule_id: str,
+    user_id: str,
+    shifts: List[Dict[str, str]],
+    chunk_size: int = DEFAULT_OVERRIDE_CHUNK_SIZE,
+    workers: int = DEFAULT_OVERRIDE_WORKERS,
+    retries: int = DEFAULT_RETRIES,
+    existing: Optional[ShiftIndex] = None,
+) -> List[OverrideResult]:
+    """Create overrides putting a user on a list of shifts.
+
+    Uses the session's override journal, if any, to skip overrides created by
+    earlier runs. Journal entries are checked against the schedule's overrides,
+    so overrides deleted since are created again. Requests wait on the
+    session's rate limiter, if any.
+
+    Args:
+        session: PagerDuty API session
+        schedule_id: PagerDuty schedule ID
+        user_id: ID of the user taking the shifts
+        shifts: Shifts to override, each with PagerDuty 'start' and 'end' timestamps
+        chunk_size: Maximum number of overrides per request
+        workers: Maximum number of requests in flight
+        retries: Retries of a failed chunk
+        existing: Index of the schedule's overrides over the shifts, if already fetched, to check done
+            journal entries against; the overrides are listed when needed otherwise
+
+    Returns:
+        One result per shift, in the order of the shifts
+    """
+    overrides = []
+    seen = set()
+    for shift in shifts:
+        key = idempotency_key(schedule_id, user_id, shift["start"], shift["end"])
+        if key not in seen:
+            seen.add(key)
+            overrides.append({"key": key, "start": shift["start"], "end": shift["end"], "user_id": user_id})
+
+    outcome: Dict[str, Tuple[str, Optional[str], Optional[str]]] = {}
+    journal: Optional[OverrideJournal] = getattr(session, "override_journal", None)
+    present: Dict[str, str] = {}
+    if journal is not None:
+        known = journal.lookup(o["key"] for o in overrides)
+        done = [o for o in overrides if known.get(o["key"])]
+        pending = [o for o in overrides if o["key"] in known and not known[o["key"]]]
+        if pending or (done and existing is None):
+            # Pending entries need the IDs of their overrides, if they were created
+            present = _find_existing(pending + done, list_overrides(session, schedule_id, *_span(pending + done)))
+        elif done:
+            present = {o["key"]: known[o["key"]] for o in done if _indexed(existing, o)}
+        # Pending entries left by an interrupted run, or done entries whose override has been deleted since
+        journal.forget(key for key in known if key not in present)
+        journal.mark_done(present)
+        journal.mark_pending(schedule_id, user_id, [o for o in overrides if o["key"] not in present])
+
+    to_submit = [o for o in overrides if o["key"] not in present]
+    chunks = [to_submit[i : i + max(1, chunk_size)] for i in range(0, len(to_submit), max(1, chunk_size))]
+    if chunks:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(chunks)))) as executor:
+            for chunk_outcome in executor.map(
+                lambda chunk: _submit_chunk(session, schedule_id, chunk, retries), chunks
+            ):
+                outcome.update(chunk_outcome)
+
+    if journal is not None:
+        journal.mark_done({key: override_id for key, (_, override_id, _) in outcome.items() if override_id})
+        # Overrides that may have been created stay pending, to be reconciled by the next run
+        journal.forget(key for key, (status, _, _) in outcome.items() if status == "failed")
+
+    results: List[OverrideResult] = []
+    for shift in shifts:
+        key = idempotency_key(schedule_id, user_id, shift["start"], shift["end"])
+        if key in present:
+            results.append(
+                {
+                    "key": key,
+                    "start": shift["start"],
+                    "end": shift["end"],
+                    "status": "exists",
+                    "override_id": present[key],
+                    "error": None,
+                }
+            )
+            continue
+        status, override_id, error = outcome.get(key, ("failed", None, "not submitted"))
+        results.append(
+            {
+                "key": key,
+                "start": shift["start"],
+                "end": shift["end"],
+                "status": status,
+                "override_id": override_id,
+                "error": error,
+            }
+        )
+    return results
@@ -0,0 +1,445 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Persistent on-disk cache for PagerDuty on-call shifts.
+
+This module provides:
+- Cache directory discovery
+- A SQLite-backed shift store keyed by schedule ID and time range
+- Incremental window refresh that only fetches the uncovered edges of a query
+
+The store records which time intervals have already been fetched for each
+schedule. Fetched intervals expire after a short TTL for the near-term part of
+the window (where overrides and swaps happen most) and after a longer maximum
+age everywhere else. The database runs in WAL mode and every write happens in
+an immediate transaction, so concurrent CLI processes can share one store.
+
+The cache can be stored in multiple locations:
+- Linux: $XDG_CACHE_HOME/myshift or ~/.cache/myshift
+- macOS: ~/Library/Caches/myshift
+"""
+
+import os
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from myshift.timestamps import parse_utc
+
+SHIFT_DB_NAME = "shifts.sqlite"
+
+# Defaults for the 'cache' section of the configuration file, in seconds
+DEFAULT_TTL = 5 * 60
+DEFAULT_NEAR_TERM = 24 * 60 * 60
+DEFAULT_MAX_AGE = 60 * 60
+DEFAULT_MIN_FETCH = 24 * 60 * 60
+
+ISO_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS shifts (
+    schedule_id TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    start_ts INTEGER NOT NULL,
+    end_ts INTEGER NOT NULL,
+    user_id TEXT NOT NULL,
+    PRIMARY KEY (schedule_id, scope, start_ts, end_ts, user_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS fetched (
+    schedule_id TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    since_ts INTEGER NOT NULL,
+    until_ts INTEGER NOT NULL,
+    fetched_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fetched_by_scope ON fetched (schedule_id, scope);
+"""
+
+Interval = Tuple[int, int]
+OncallFetcher = Callable[[datetime, datetime], Iterable[Dict[str, Any]]]
+
+
+def get_cache_dir() -> Path:
+    """Get the directory used for myshift's on-disk caches.
+
+    The directory is chosen in the following order:
+    1. $XDG_CACHE_HOME/myshift (Linux)
+    2. ~/Library/Caches/myshift (macOS)
+    3. ~/.cache/myshift (Linux default)
+
+    Returns:
+        Path of the cache directory (not necessarily existing yet)
+    """
+    if "XDG_CACHE_HOME" in os.environ:
+        return Path(os.environ["XDG_CACHE_HOME"]) / "myshift"
+
+    if sys.platform == "darwin":
+        return Path.home() / "Library" / "Caches" / "myshift"
+
+    return Path.home() / ".cache" / "myshift"
+
+
+@contextmanager
+def connect(path: Path) -> Iterator[sqlite3.Connection]:
+    """Open a cache database connection in autocommit mode; transactions are explicit.
+
+    Args:
+        path: Path of the SQLite database file
+
+    Yields:
+        Open connection, closed when the block exits
+    """
+    conn = sqlite3.connect(str(path), timeout=30, isolation_level=None)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+@contextmanager
+def transaction(path: Path) -> Iterator[sqlite3.Connection]:
+    """Open a cache database connection holding the write lock until the block exits.
+
+    Args:
+        path: Path of the SQLite database file
+
+    Yields:
+        Open connection inside an immediate transaction, committed when the
+        block exits normally and rolled back otherwise
+    """
+    with connect(path) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+def init_db(path: Path, schema: str) -> None:
+    """Create a cache database and its tables if needed.
+
+    Args:
+        path: Path of the SQLite database file
+        schema: SQL script creating the tables
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with connect(path) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(schema)
+
+
+def to_epoch(value: str) -> int:
+    """Convert a PagerDuty UTC timestamp (YYYY-MM-DDTHH:MM:SSZ) to epoch seconds."""
+    return int(parse_utc(value).timestamp())
+
+
+def from_epoch(value: int) -> str:
+    """Convert epoch seconds to a PagerDuty UTC timestamp (YYYY-MM-DDTHH:MM:SSZ)."""
+    return time.strftime(ISO_FORMAT, time.gmtime(value))
+
+
+def subtract_intervals(window: Interval, covered: List[Interval]) -> List[Interval]:
+    """Compute the parts of a window that are not covered by any interval.
+
+    Args:
+        window: (since, until) interval to check
+        covered: Intervals known to be covered, in any order and possibly overlapping
+
+    Returns:
+        Sorted list of uncovered (since, until) intervals inside the window
+    """
+    since, until = window
+    gaps: List[Interval] = []
+    cursor = since
+    for start, end in sorted(covered):
+        if end <= cursor:
+            continue
+        if start >= until:
+            break
+        if start > cursor:
+            gaps.append((cursor, start))
+        cursor = max(cursor, end)
+        if cursor >= until:
+            break
+
+    if cursor < until:
+        gaps.append((cursor, until))
+    return gaps
+
+
+class ShiftStore:
+    """SQLite-backed store of on-call shifts with incremental window refresh.
+
+    Shifts are stored per schedule and per scope. The scope is the user ID for
+    user-filtered queries and the empty string for whole-schedule queries, so a
+    user-filtered fetch never masquerades as full schedule coverage.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        ttl: int = DEFAULT_TTL,
+        near_term: int = DEFAULT_NEAR_TERM,
+        max_age: int = DEFAULT_MAX_AGE,
+        min_fetch: int = DEFAULT_MIN_FETCH,
+    ):
+        """Initialize the store, creating the database if needed.
+
+        Args:
+            path: Path of the SQLite database file
+            ttl: Seconds before fetched data in the near-term window is refreshed
+            near_term: Length in seconds of the near-term window, starting now
+            max_age: Seconds before any fetched data is refreshed
+            min_fetch: Minimum length in seconds of a refresh request; short
+                trailing gaps are extended so a moving "now" doesn't cause a
+                tiny API call on every run
+        """
+        self.path = path
+        self.ttl = ttl
+        self.near_term = near_term
+        self.max_age = max_age
+        self.min_fetch = min_fetch
+
+        init_db(self.path, _SCHEMA)
+
+    def _valid_coverage(self, conn: sqlite3.Connection, schedule_id: str, scope: str, now: int) -> List[Interval]:
+        """Get the fetched intervals that are still fresh enough to be used.
+
+        Near-term data expires after the TTL; data beyond the near-term window
+        stays valid until the maximum age.
+        """
+        near_end = now + self.near_term
+        rows = conn.execute(
+            "SELECT since_ts, until_ts, fetched_at FROM fetched WHERE schedule_id = ? AND scope = ?",
+            (schedule_id, scope),
+        ).fetchall()
+
+        covered: List[Interval] = []
+        for since, until, fetched_at in rows:
+            age = now - fetched_at
+            if age <= self.ttl:
+                covered.append((since, until))
+            elif age <= self.max_age and until > near_end:
+                covered.append((max(since, near_end), until))
+        return covered
+
+    def missing_intervals(
+        self, schedule_id: str, since: int, until: int, user_id: Optional[str] = None
+    ) -> List[Interval]:
+        """Get the parts of a window that have to be fetched from the API.
+
+        Args:
+            schedule_id: PagerDuty schedule ID
+            since: Window start in epoch seconds
+            until: Window end in epoch seconds
+            user_id: Optional user ID for user-filtered queries
+
+        Returns:
+            Sorted list of (since, until) intervals in epoch seconds
+        """
+        now = int(time.time())
+        with connect(self.path) as conn:
+            covered = self._valid_coverage(conn, schedule_id, user_id or "", now)
+
+        gaps = subtract_intervals((since, until), covered)
+        if gaps and gaps[-1][1] == until and gaps[-1][1] - gaps[-1][0] < self.min_fetch:
+            gaps[-1] = (gaps[-1][0], gaps[-1][0] + self.min_fetch)
+        return gaps
+
+    def store(
+        self,
+        schedule_id: str,
+        since: int,
+        until: int,
+        oncalls: Iterable[Dict[str, Any]],
+        user_id: Optional[str] = None,
+    ) -> None:
+        """Replace the cached shifts of a freshly fetched interval.
+
+        Shifts overlapping the interval are dropped before the new ones are
+        written, so shifts removed upstream disappear from the cache as well.
+
+        Args:
+            schedule_id: PagerDuty schedule ID
+            since: Fetched interval start in epoch seconds
+            until: Fetched interval end in epoch seconds
+            oncalls: On-call records returned by the API for the interval
+            user_id: Optional user ID for user-filtered queries
+        """
+        scope = user_id or ""
+        rows = [(schedule_id, scope, to_epoch(oc["start"]), to_epoch(oc["end"]), oc["user"]["id"]) for oc in oncalls]
+        now = int(time.time())
+
+        with transaction(self.path) as conn:
+            conn.execute(
+                "DELETE FROM shifts WHERE schedule_id = ? AND scope = ? AND end_ts > ? AND start_ts < ?",
+                (schedule_id, scope, since, until),
+            )
+            conn.executemany("INSERT OR IGNORE INTO shifts VALUES (?, ?, ?, ?, ?)", rows)
+            conn.execute("INSERT INTO fetched VALUES (?, ?, ?, ?, ?)", (schedule_id, scope, since, until, now))
+            self._prune(conn, now)
+
+    def _prune(self, conn: sqlite3.Connection, now: int) -> None:
+        """Drop coverage that can no longer be used and shifts outside any remaining coverage.
+
+        Shifts are kept as long as a fetched interval of their schedule and
+        scope overlaps them, however long ago they ended, so a window stored
+        in the same transaction is always read back whole.
+        """
+        conn.execute("DELETE FROM fetched WHERE fetched_at < ?", (now - self.max_age,))
+        conn.execute(
+            "DELETE FROM shifts WHERE NOT EXISTS (SELECT 1 FROM fetched f WHERE f.schedule_id = shifts.schedule_id "
+            "AND f.scope = shifts.scope AND f.until_ts > shifts.start_ts AND f.since_ts < shifts.end_ts)"
+        )
+
+    def load(self, schedule_id: str, since: int, until: int, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Read cached shifts overlapping a window.
+
+        Args:
+            schedule_id: PagerDuty schedule ID
+            since: Window start in epoch seconds
+            until: Window end in epoch seconds
+            user_id: Optional user ID for user-filtered queries
+
+        Returns:
+            List of on-call records shaped like the /oncalls API results
+            (start, end and user ID only)
+        """
+        with connect(self.path) as conn:
+            rows = conn.execute(
+                "SELECT start_ts, end_ts, user_id FROM shifts "
+                "WHERE schedule_id = ? AND scope = ? AND end_ts > ? AND start_ts < ? ORDER BY start_ts",
+                (schedule_id, user_id or "", since, until),
+            ).fetchall()
+
+        return [{"start": from_epoch(start), "end": from_epoch(end), "user": {"id": uid}} for start, end, uid in rows]
+
+    def fetch(
+        self,
+        schedule_id: str,
+        since: datetime,
+        until: datetime,
+        fetcher: OncallFetcher,
+        user_id: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Get on-call records for a window, fetching only what is missing.
+
+        Args:
+            schedule_id: PagerDuty schedule ID
+            since: Window start (timezone-aware)
+            until: Window end (timezone-aware)
+            fetcher: Callable fetching /oncalls records for a (since, until) range
+            user_id: Optional user ID for user-filtered queries
+
+        Returns:
+            Tuple of (on-call records in the window, number of records fetched from the API)
+        """
+        since_ts = int(since.timestamp())
+        until_ts = int(until.timestamp())
+
+        fetched = 0
+        for gap_since, gap_until in self.missing_intervals(schedule_id, since_ts, until_ts, user_id):
+            oncalls = list(
+                fetcher(
+                    datetime.fromtimestamp(gap_since, tz=since.tzinfo),
+                    datetime.fromtimestamp(gap_until, tz=since.tzinfo),
+                )
+            )
+            fetched += len(oncalls)
+            self.store(schedule_id, gap_since, gap_until, oncalls, user_id)
+
+        return self.load(schedule_id, since_ts, until_ts, user_id), fetched
+
+    def invalidate(self, schedule_id: str, since: datetime, until: datetime) -> None:
+        """Forget fetched coverage overlapping a window, e.g. after creating overrides.
+
+        Args:
+            schedule_id: PagerDuty schedule ID
+            since: Window start (timezone-aware)
+            until: Window end (timezone-aware)
+        """
+        with transaction(self.path) as conn:
+            conn.execute(
+                "DELETE FROM fetched WHERE schedule_id = ? AND until_ts > ? AND since_ts < ?",
+                (schedule_id, int(since.timestamp()), int(until.timestamp())),
+            )
+
+
+def get_cache_settings(config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Get the 'cache' section of the configuration.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        Cache settings dictionary (possibly empty), or None if caching is disabled
+    """
+    settings = config.get("cache", True)
+    if settings is False:
+        return None
+    if not isinstance(settings, dict):
+        settings = {}
+    if not settings.get("enabled", True):
+        return None
+    return settings
+
+
+def get_cache_path(settings: Dict[str, Any], name: str) -> Path:
+    """Get the path of a cache file, honoring the 'path' cache setting.
+
+    Args:
+        settings: Cache settings dictionary
+        name: File name inside the cache directory
+
+    Returns:
+        Path of the cache file
+    """
+    cache_dir = Path(settings["path"]).expanduser() if settings.get("path") else get_cache_dir()
+    return cache_dir / name
+
+
+def open_shift_store(config: Dict[str, Any]) -> Optional[ShiftStore]:
+    """Create the shift store described by the 'cache' section of the configuration.
+
+    The cache is enabled by default. Set 'cache: false' (or 'enabled: false'
+    inside the 'cache' section) to always fetch shifts from the API.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        ShiftStore instance, or None if caching is disabled or unavailable
+    """
+    settings = get_cache_settings(config)
+    if settings is None:
+        return None
+
+    path = get_cache_path(settings, SHIFT_DB_NAME)
+    try:
+        return ShiftStore(
+            path,
+            ttl=int(settings.get("ttl", DEFAULT_TTL)),
+            near_term=int(settings.get("near_term", DEFAULT_NEAR_TERM)),
+            max_age=int(settings.get("max_age", DEFAULT_MAX_AGE)),
+            min_fetch=int(settings.get("min_fetch", DEFAULT_MIN_FETCH)),
+        )
+    except (OSError, sqlite3.Error) as e:
+        print(f"Warning: shift cache disabled, cannot open {path}: {e}", file=sys.stderr)
+        return None
@@ -16,7 +16,10 @@
 
 This module handles:
 - Configuration file discovery and loading
+- Named profiles overriding the top-level settings
 - Configuration validation
+- Compiled snapshots of the configuration, with user emails and schedule
+  names already resolved to IDs
 - Sample configuration generation
 
 The configuration can be stored in multiple locations:
@@ -25,13 +28,13 @@ The configuration can be stored in multiple locations:
 """
 
 import argparse
+import json
 import os
+import re
 import sys
 from pathlib import Path
 from typing import Any, Dict, List, Optional, TypedDict, Union
 
-import yaml
-
 
 class ConfigDict(TypedDict, total=False):
     """Type definition for configuration dictionary."""
@@ -39,6 +42,17 @@ class ConfigDict(TypedDict, total=False):
     token: str
     schedule_id: str
     my_user: str
+    cache: Union[bool, Dict[str, Any]]
+    fetch_mode: str
+    fetch_engine: str
+    page_concurrency: int
+    shard_days: float
+    repl_refresh: int
+    http: Dict[str, Any]
+    rate_limit: Union[bool, Dict[str, Any]]
+    daemon: Dict[str, Any]
+    profiles: Dict[str, Dict[str, Any]]
+    my_user_id: str
 
 
 def get_config_paths() -> List[Path]:
@@ -66,13 +80,135 @@ def get_config_paths() -> List[Path]:
     return paths
 
 
-def load_config() -> ConfigDict:
+# Suffix replacing ".yaml" in the name of a configuration file's compiled snapshot
+SNAPSHOT_SUFFIX = ".snapshot.json"
+
+# Name under which the top-level settings are compiled
+DEFAULT_PROFILE = "default"
+
+# PagerDuty object IDs, e.g. "PABC123"
+_PD_ID = re.compile(r"^P[A-Z0-9]{6,}$")
+
+
+def is_pagerduty_id(value: str) -> bool:
+    """Whether a value looks like a PagerDuty object ID rather than a name or email."""
+    return bool(_PD_ID.match(value))
+
+
+def get_snapshot_path(path: Path) -> Path:
+    """Get the path of the compiled snapshot of a configuration file.
+
+    Args:
+        path: Path of the configuration file
+
+    Returns:
+        Path of the snapshot, next to the configuration file
+    """
+    return path.with_name(path.stem + SNAPSHOT_SUFFIX)
+
+
+def _source_stamp(path: Path) -> List[int]:
+    """Identify the version of a configuration file by its modification time and size."""
+    stat = path.stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def load_snapshot(path: Path) -> Optional[Dict[str, ConfigDict]]:
+    """Load the compiled snapshot of a configuration file, if it is up to date.
+
+    Args:
+        path: Path of the configuration file
+
+    Returns:
+        Dictionary mapping profile names to compiled configurations, or None
+        if there is no snapshot or the configuration file changed since it
+        was compiled
+    """
+    try:
+        with open(get_snapshot_path(path)) as f:
+            snapshot = json.load(f)
+        if snapshot.get("source") != str(path) or snapshot.get("stamp") != _source_stamp(path):
+            return None
+        return snapshot["profiles"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        return None
+
+
+def select_profile(config: Dict[str, Any], profile: Optional[str] = None) -> ConfigDict:
+    """Get the settings of a named profile, on top of the top-level settings.
+
+    Args:
+        config: Parsed configuration file
+        profile: Profile name (the top-level settings if not given)
+
+    Returns:
+        Configuration dictionary
+
+    Raises:
+        SystemExit: If the profile is not defined
+    """
+    selected = {key: value for key, value in config.items() if key != "profiles"}
+    if profile and profile != DEFAULT_PROFILE:
+        profiles = config.get("profiles") or {}
+        if not isinstance(profiles.get(profile), dict):
+            print(f"Error: profile '{profile}' is not defined in the configuration", file=sys.stderr)
+            sys.exit(1)
+        selected.update(profiles[profile])
+    return selected
+
+
+def find_config_path() -> Optional[Path]:
+    """Get the path of the first configuration file that exists.
+
+    Returns:
+        Path of the configuration file, or None if there is none
+    """
+    return next((path for path in get_config_paths() if path.exists()), None)
+
+
+def read_config(path: Path) -> Dict[str, Any]:
+    """Parse a configuration file, including all its profiles.
+
+    Args:
+        path: Path of the configuration file
+
+    Returns:
+        Parsed configuration
+
+    Raises:
+        SystemExit: If the file cannot be loaded
+    """
+    # Imported here so that 'config --print' and compiled snapshots don't pay for loading yaml
+    import yaml
+
+    try:
+        with open(path) as f:
+            config = yaml.safe_load(f)
+            if not isinstance(config, dict):
+                raise ValueError("Configuration must be a dictionary")
+            return config
+    except Exception as e:
+        print(
+            f"Error loading config from {path}: {e}",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+def load_config(profile: Optional[str] = None) -> ConfigDict:
     """Load configuration from the first available config file.
 
     The configuration file should be a YAML file containing:
-    - pagerduty_token: Required API token for PagerDuty
+    - token: Required API token for PagerDuty
     - my_user: Optional user ID or email for the current user
     - schedule_id: Optional default schedule ID
+    - profiles: Optional named sets of settings overriding the ones above
+
+    If the file has an up-to-date compiled snapshot (see 'myshift config
+    --compile'), the snapshot is used instead, with IDs already resolved.
+
+    Args:
+        profile: Optional profile name (defaults to $MYSHIFT_PROFILE, or the top-level settings)
 
     Returns:
         Configuration dictionary
@@ -80,20 +216,17 @@ def load_config() -> ConfigDict:
     Raises:
         SystemExit: If no config file is found or if there's an error loading the file
     """
-    for path in get_config_paths():
-        if path.exists():
-            try:
-                with open(path) as f:
-                    config = yaml.safe_load(f)
-                    if not isinstance(config, dict):
-                        raise ValueError("Configuration must be a dictionary")
-                    return config
-            except Exception as e:
-                print(
-                    f"Error loading config from {path}: {e}",
-                    file=sys.stderr,
-                )
+    profile = profile or os.environ.get("MYSHIFT_PROFILE") or None
+    path = find_config_path()
+    if path is not None:
+        compiled = load_snapshot(path)
+        if compiled is not None:
+            name = profile or DEFAULT_PROFILE
+            if name not in compiled:
+                print(f"Error: profile '{name}' is not defined in the configuration", file=sys.stderr)
                 sys.exit(1)
+            return compiled[name]
+        return select_profile(read_config(path), profile)
 
     print(
         "No configuration file found. Please create one using " "'myshift config --print'",
@@ -102,10 +235,100 @@ def load_config() -> ConfigDict:
     sys.exit(1)
 
 
+def get_my_user_id(config: Dict[str, Any]) -> Optional[str]:
+    """Get the ID of the configured user without calling the API, if it is known.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        my_user_id from a compiled snapshot, my_user if it is an ID, or None
+    """
+    my_user = config.get("my_user")
+    if config.get("my_user_id"):
+        return config["my_user_id"]
+    if my_user and is_pagerduty_id(my_user):
+        return my_user
+    return None
+
+
+def compile_config(path: Path) -> Dict[str, ConfigDict]:
+    """Compile a configuration file into a snapshot.
+
+    Every profile is validated, and user emails and schedule names are
+    resolved to IDs, so that commands using the snapshot start without
+    parsing YAML or calling the API for lookups.
+
+    Args:
+        path: Path of the configuration file
+
+    Returns:
+        Dictionary mapping profile names to compiled configurations
+
+    Raises:
+        SystemExit: If a profile is invalid or a lookup fails
+    """
+    from myshift.util import find_schedule_id, get_pd_session, get_user_id_by_email
+
+    raw = read_config(path)
+    names = [DEFAULT_PROFILE] + sorted((raw.get("profiles") or {}).keys())
+    sessions: Dict[str, Any] = {}
+    user_ids: Dict[str, str] = {}
+    schedule_ids: Dict[str, str] = {}
+
+    compiled: Dict[str, ConfigDict] = {}
+    for name in names:
+        config = select_profile(raw, name)
+        validate_config(config)
+        token = config.get("token")
+        if token not in sessions:
+            sessions[token] = get_pd_session(config)
+        session = sessions[token]
+
+        my_user = config.get("my_user")
+        if my_user:
+            if is_pagerduty_id(my_user):
+                config["my_user_id"] = my_user
+            else:
+                key = f"{token}:{my_user.lower()}"
+                if key not in user_ids:
+                    user_ids[key] = get_user_id_by_email(session, my_user)
+                config["my_user_id"] = user_ids[key]
+
+        schedule = config.get("schedule_id")
+        if schedule and not is_pagerduty_id(schedule):
+            key = f"{token}:{schedule}"
+            if key not in schedule_ids:
+                schedule_ids[key] = find_schedule_id(session, schedule)
+            config["schedule_id"] = schedule_ids[key]
+        compiled[name] = config
+    return compiled
+
+
+def write_snapshot(path: Path, compiled: Dict[str, ConfigDict]) -> Path:
+    """Write the compiled snapshot of a configuration file.
+
+    The snapshot holds the API token, so it is only readable by its owner.
+
+    Args:
+        path: Path of the configuration file
+        compiled: Dictionary mapping profile names to compiled configurations
+
+    Returns:
+        Path of the snapshot
+    """
+    snapshot_path = get_snapshot_path(path)
+    tmp_path = snapshot_path.with_name(snapshot_path.name + ".tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump({"source": str(path), "stamp": _source_stamp(path), "profiles": compiled}, f)
+    os.replace(tmp_path, snapshot_path)
+    return snapshot_path
+
+
 def print_sample_config() -> None:
     """Print a sample configuration file."""
-    print(
-        """# MyShift Configuration
+    print("""# MyShift Configuration
 # This file should be placed in one of the following locations:
 # - Linux: ~/.config/myshift.yaml
 # - macOS: ~/Library/Application Support/myshift.yaml
@@ -119,15 +342,58 @@ token: \"your-pagerduty-token\"
 # Your PagerDuty user ID or email (optional)
 # This will be used when no --user-id or --user-email is provided
 # my_user: \"your-email@example.com\"  # or \"your-user-id\"
-"""
-    )
+
+# Fetch pages of shifts concurrently, or long ranges as time windows fetched in parallel (optional, default: serial)
+# fetch_mode: async        # or: sharded
+# page_concurrency: 8      # pages, or time windows, fetched at the same time
+# shard_days: 7            # length of the time windows with fetch_mode: sharded
+
+# Source of schedule shifts: oncalls, rendered or auto (optional, default: auto)
+# fetch_engine: auto
+
+# Refresh near-term shifts in the background while the REPL is idle (optional, seconds, default: off)
+# repl_refresh: 300
+
+# HTTP connection settings (optional)
+# http:
+#   pool_size: 100         # maximum connections open at once (default: 100)
+#   keepalive: 60          # seconds an idle connection is kept for reuse
+#   connect_timeout: 5     # seconds
+#   read_timeout: 30       # seconds
+#   compression: true      # request gzip-compressed responses
+
+# Named profiles, selected with --config-profile NAME or $MYSHIFT_PROFILE (optional)
+# Each profile overrides the top-level settings above.
+# profiles:
+#   secondary:
+#     schedule_id: "Secondary On-Call"  # schedule names are resolved by 'myshift config --compile'
+
+# Client-side rate limit shared by every request of a session (optional, enabled by default)
+# Set 'rate_limit: false' to disable it.
+# rate_limit:
+#   rate: 15    # requests per second
+#   burst: 15   # requests allowed at once after a quiet period
+
+# Background daemon started with 'myshift daemon' (optional)
+# daemon:
+#   refresh: 60          # seconds between refreshes of near-term shifts
+#   full_refresh: 3600   # seconds between refreshes of every loaded shift
+
+# On-disk shift cache (optional, enabled by default)
+# Set 'cache: false' to always fetch shifts from PagerDuty.
+# cache:
+#   ttl: 300          # seconds before near-term shifts are refreshed
+#   near_term: 86400  # seconds from now that count as near-term
+#   max_age: 3600     # seconds before any cached shifts are refreshed
+#   user_ttl: 86400   # seconds before cached user details are refreshed
+""")
 
 
 def validate_config(config: ConfigDict) -> None:
     """Validate the configuration parameters.
 
     Checks for:
-    - Presence of required pagerduty_token
+    - Presence of required token
     - Valid format of my_user (if present)
     - Valid format of schedule_id (if present)
 
@@ -172,15 +438,35 @@ def config_main(args: Optional[List[str]] = None) -> None:
         action="store_true",
         help="Print a sample configuration file",
     )
+    parser.add_argument(
+        "--compile",
+        action="store_true",
+        help="Validate every profile and write a snapshot with emails and schedule names resolved to IDs",
+    )
+    parser.add_argument(
+        "--config-profile",
+        metavar="NAME",
+        help="Profile to validate (default: the top-level settings)",
+    )
     parsed_args = parser.parse_args(args)
 
     if parsed_args.print:
         print_sample_config()
         return
 
+    if parsed_args.compile:
+        path = find_config_path()
+        if path is None:
+            print("No configuration file found. Please create one using 'myshift config --print'", file=sys.stderr)
+            sys.exit(1)
+        compiled = compile_config(path)
+        snapshot_path = write_snapshot(path, compiled)
+        print(f"Compiled {len(compiled)} profile(s) ({', '.join(compiled)}) to {snapshot_path}")
+        return
+
     # If no options provided, validate the configuration
     try:
-        config = load_config()
+        config = load_config(parsed_args.config_profile)
         validate_config(config)
         print("Configuration is valid.")
     except Exception as e:
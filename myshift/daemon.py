@@ -0,0 +1,354 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Background daemon keeping warm state, and the thin client talking to it.
+
+'myshift daemon' holds a PagerDuty session, the user directory and one
+timeline per schedule in memory, refreshes them on a schedule, and answers
+'next', 'plan' and 'upcoming' over a Unix socket. When the daemon is running,
+those commands send their arguments to it and print its answer, without
+loading the configuration or the PagerDuty client.
+
+The protocol is one JSON request line from the client, answered by one JSON
+object with the exit status and the captured stdout and stderr of the
+command. A request the daemon cannot answer from its timelines (e.g. a plan
+across several schedules), or made with another configuration profile than
+the daemon's, is answered with {"fallback": true}, and the client runs the
+command locally.
+
+Only light modules are imported at the top of this file, since the client
+side runs on every invocation; the server side imports the rest when it
+starts.
+"""
+
+import json
+import os
+import socket
+import sys
+from typing import Any, Dict, Optional
+
+# Seconds between refreshes of the near-term shifts, and of every loaded shift
+DEFAULT_REFRESH = 60
+DEFAULT_FULL_REFRESH = 60 * 60
+
+# The client gives up on the daemon (and runs the command itself) after this many seconds
+CONNECT_TIMEOUT = 0.5
+RESPONSE_TIMEOUT = 60.0
+
+# Commands the daemon answers
+DAEMON_COMMANDS = ("next", "plan", "upcoming")
+
+SOCKET_ENV = "MYSHIFT_SOCKET"
+
+
+def get_socket_path() -> str:
+    """Get the path of the daemon's socket.
+
+    The path is $MYSHIFT_SOCKET if set, otherwise myshift.sock in
+    $XDG_RUNTIME_DIR, or a per-user file in the temporary directory.
+
+    Returns:
+        Path of the Unix socket
+    """
+    # Plain os.path rather than pathlib or tempfile, which are slow to import for the thin client
+    if os.environ.get(SOCKET_ENV):
+        return os.path.expanduser(os.environ[SOCKET_ENV])
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return os.path.join(os.environ["XDG_RUNTIME_DIR"], "myshift.sock")
+    # A shared directory: request_daemon only talks to a socket owned by the current user
+    tmp_dir = os.environ.get("TMPDIR") or "/tmp"  # nosec B108
+    return os.path.join(tmp_dir, f"myshift-{os.getuid()}.sock")
+
+
+def request_from_args(args: Any) -> Dict[str, Any]:
+    """Build a daemon request from parsed command line arguments.
+
+    Args:
+        args: Command line arguments object
+
+    Returns:
+        Request dictionary
+    """
+    # The daemon only answers for the profile it was started with
+    request = {"command": args.command, "config_profile": getattr(args, "config_profile", None) or None}
+    for name in ("user", "users", "schedule_id", "schedule_ids", "team", "days", "stream"):
+        if getattr(args, name, None) is not None:
+            request[name] = getattr(args, name)
+    return request
+
+
+def request_daemon(request: Dict[str, Any], path: Optional[str] = None) -> Optional[int]:
+    """Have the daemon run a command, printing its output.
+
+    Args:
+        request: Request dictionary (see request_from_args)
+        path: Socket path (defaults to get_socket_path())
+
+    Returns:
+        Exit status of the command, or None if no daemon answered it and the
+        command should run locally
+    """
+    path = path or get_socket_path()
+    try:
+        if not hasattr(socket, "AF_UNIX") or os.stat(path).st_uid != os.getuid():
+            # Another user's socket, e.g. planted in the shared temporary directory, isn't trusted
+            return None
+    except OSError:
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(path)
+            sock.settimeout(RESPONSE_TIMEOUT)
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            with sock.makefile("rb") as stream:
+                response = json.loads(stream.readline() or b"{}")
+    except (OSError, ValueError):
+        return None
+
+    if not response or response.get("fallback"):
+        return None
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stderr.write(response.get("stderr", ""))
+    return int(response.get("status", 0))
+
+
+class DaemonState:
+    """Warm session and timelines of a running daemon."""
+
+    def __init__(self, session: Any, config: Dict[str, Any], profile: Optional[str] = None):
+        """Initialize the state.
+
+        Args:
+            session: PagerDuty API session
+            config: Configuration dictionary
+            profile: Name of the configuration profile the configuration was loaded with
+        """
+        import threading
+
+        self.session = session
+        self.config = config
+        self.profile = profile or None
+        self.timelines: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def timeline(self, schedule_id: str) -> Any:
+        """Get the timeline of a schedule, creating it on first use."""
+        from myshift.timeline import Timeline
+
+        if schedule_id not in self.timelines:
+            self.timelines[schedule_id] = Timeline(self.session, schedule_id)
+        return self.timelines[schedule_id]
+
+    def refresh(self, full: bool = False) -> None:
+        """Refresh the loaded timelines, near-term shifts only unless full is set."""
+        from myshift.ratelimit import background
+
+        for timeline in list(self.timelines.values()):
+            try:
+                with background():
+                    if full:
+                        timeline.refresh()
+                    else:
+                        timeline.refresh_near_term()
+            except (Exception, SystemExit):
+                # Errors surface on the next request that needs the API
+                pass
+
+    def _run(self, request: Dict[str, Any]) -> bool:
+        """Run a request, printing its output; False if it must run in the client instead."""
+        from datetime import datetime, timedelta
+
+        from dateutil import tz
+
+        from myshift.config import get_my_user_id
+        from myshift.next import print_next_shift, print_next_shifts
+        from myshift.plan import print_plan
+        from myshift.repl import NEXT_DAYS
+        from myshift.upcoming import print_upcoming
+
+        if request.get("config_profile") != self.profile:
+            return False
+
+        command = request.get("command")
+        schedule_ids = [s for value in request.get("schedule_ids") or [] for s in value.split(",") if s]
+        if request.get("team") or request.get("stream") or len(schedule_ids) > 1 or command not in DAEMON_COMMANDS:
+            return False
+
+        schedule_id = request.get("schedule_id") or (schedule_ids[0] if schedule_ids else None)
+        schedule_id = schedule_id or self.config.get("schedule_id")
+        if not schedule_id:
+            print(
+                "Schedule ID must be specified either as a command line argument "
+                "or in the configuration file (schedule_id).",
+                file=sys.stderr,
+            )
+            sys.exit(2)
+
+        timeline = self.timeline(schedule_id)
+        now = datetime.now(tz.tzlocal())
+        if command == "plan":
+            days = int(request.get("days") or 28)
+            until = now + timedelta(days=days)
+            index, user_map = timeline.get(now, until)
+            print_plan(index.between(now, until), user_map, days)
+            return True
+
+        if command == "next" and request.get("users"):
+            emails = [email.strip() for value in request["users"] for email in value.split(",") if email.strip()]
+            user_ids = timeline.user_ids(emails)
+            index, _ = timeline.get(now, now + timedelta(days=NEXT_DAYS))
+            print_next_shifts(index, user_ids, emails, now)
+            return True
+
+        email = request.get("user") or self.config.get("my_user")
+        user_id = None if request.get("user") else get_my_user_id(self.config)
+        if not email and not user_id:
+            print("Email address is required", file=sys.stderr)
+            sys.exit(1)
+        user_id = user_id or timeline.user_id(email)
+        if command == "next":
+            index, _ = timeline.get(now, now + timedelta(days=NEXT_DAYS))
+            print_next_shift(index, user_id, now)
+        else:
+            days = int(request.get("days") or 28)
+            until = now + timedelta(days=days)
+            index, _ = timeline.get(now, until)
+            print_upcoming([(start, end) for start, end, user in index.between(now, until) if user == user_id], days)
+        return True
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer a request.
+
+        Requests are answered one at a time, since their output is captured
+        from sys.stdout and sys.stderr.
+
+        Args:
+            request: Request dictionary
+
+        Returns:
+            Response dictionary
+        """
+        import io
+        from contextlib import redirect_stderr, redirect_stdout
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        status = 0
+        with self._lock, redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                if not self._run(request):
+                    return {"fallback": True}
+            except SystemExit as e:
+                status = e.code if isinstance(e.code, int) else 1
+            except Exception as e:
+                print(f"Error: {e}", file=sys.stderr)
+                status = 1
+        return {"status": status, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+
+def serve(
+    config: Dict[str, Any],
+    path: Optional[str] = None,
+    refresh: int = DEFAULT_REFRESH,
+    full_refresh: int = DEFAULT_FULL_REFRESH,
+    session: Any = None,
+    profile: Optional[str] = None,
+) -> None:
+    """Run the daemon until interrupted.
+
+    Args:
+        config: Configuration dictionary
+        path: Socket path (defaults to get_socket_path())
+        refresh: Seconds between refreshes of the near-term shifts (0 disables them)
+        full_refresh: Seconds between refreshes of every loaded shift (0 disables them)
+        session: PagerDuty API session (defaults to one created from the configuration)
+        profile: Name of the configuration profile the configuration was loaded with; requests
+            made with another profile are run by the client
+
+    Raises:
+        SystemExit: If another daemon is already listening on the socket
+    """
+    import signal
+    import socketserver
+    import threading
+    import time
+
+    from myshift.util import get_pd_session
+
+    path = path or get_socket_path()
+    if os.path.exists(path):
+        if _answers(path):
+            print(f"A daemon is already listening on {path}", file=sys.stderr)
+            sys.exit(1)
+        os.unlink(path)
+
+    state = DaemonState(session or get_pd_session(config, warm=True), config, profile)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            try:
+                request = json.loads(self.rfile.readline() or b"{}")
+            except ValueError:
+                request = {}
+            self.wfile.write(json.dumps(state.handle(request)).encode() + b"\n")
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    stop = threading.Event()
+
+    def refresh_loop() -> None:
+        last_full = time.monotonic()
+        while not stop.wait(refresh):
+            full = full_refresh > 0 and time.monotonic() - last_full >= full_refresh
+            state.refresh(full)
+            if full:
+                last_full = time.monotonic()
+
+    old_umask = os.umask(0o077)
+    try:
+        server = Server(path, Handler)
+    finally:
+        os.umask(old_umask)
+
+    # Stop cleanly on SIGTERM as well as Ctrl-C (signal handlers can only be set from the main thread)
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown, daemon=True).start())
+    if refresh > 0:
+        threading.Thread(target=refresh_loop, name="myshift-daemon-refresh", daemon=True).start()
+
+    print(f"Serving on {path}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def _answers(path: str) -> bool:
+    """Whether something accepts connections on a socket."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(path)
+        return True
+    except OSError:
+        return False
@@ -0,0 +1,40 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Defaults shared by the command line and the modules implementing its commands.
+
+This module imports nothing, so the command line can show the defaults in its
+help without loading the subcommand modules and the PagerDuty client stack.
+"""
+
+# Maximum number of schedules fetched at the same time by plan, stats, gaps, export and watch
+DEFAULT_SCHEDULE_WORKERS = 8
+
+# Local hours (0-23) between which on-call time counts as night time
+DEFAULT_NIGHT_START = 22
+DEFAULT_NIGHT_END = 6
+
+# Maximum number of overrides per request, and of override requests in flight
+DEFAULT_OVERRIDE_CHUNK_SIZE = 10
+DEFAULT_OVERRIDE_WORKERS = 4
+
+# Seconds between polls of the watch command, and days of shifts watched from now
+DEFAULT_WATCH_INTERVAL = 300
+DEFAULT_WATCH_DAYS = 28
+
+# Sources of schedule shifts: "oncalls" reads /oncalls, "rendered" reads the
+# schedule's final rendered entries, and "auto" uses the rendered entries
+# whenever they answer the same question (every user's shifts)
+FETCH_ENGINES = ("oncalls", "rendered", "auto")
+DEFAULT_FETCH_ENGINE = "auto"
@@ -0,0 +1,291 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""iCalendar export of on-call shifts.
+
+This module provides functionality to publish shifts as an iCalendar (.ics)
+feed for calendar apps, including:
+- Exporting every shift of one or more schedules, or one user's shifts
+- Writing events as they are formatted, without building the document in memory
+- Stable event UIDs derived from the schedule, user and interval
+- Incremental re-exports
+
+Every export to a file records a hash of each event's content in a state file
+next to it (FILE.state.json). A re-export keeps the DTSTAMP and SEQUENCE of
+unchanged events, so their text is identical, bumps the SEQUENCE of events
+whose content changed, and leaves the file untouched when no event changed.
+Calendar apps polling the feed, and a cron job refreshing many feeds, then
+only see real changes.
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from dateutil import tz
+from pagerduty import RestApiV2Client
+
+from myshift import __version__
+from myshift.defaults import DEFAULT_SCHEDULE_WORKERS
+from myshift.plan import with_label
+from myshift.util import build_user_map_for_ids, get_shift_array, get_user_id_by_email
+
+# Suffix of the state file recorded next to an exported file
+STATE_SUFFIX = ".state.json"
+
+PRODID = f"-//myshift//myshift {__version__}//EN"
+
+# Lines longer than this many octets are folded (RFC 5545, section 3.1)
+MAX_LINE_OCTETS = 75
+
+# (start, end, user_id, schedule_id) of an exported shift, with times in epoch seconds
+ExportShift = Tuple[int, int, str, str]
+
+# Content hash, SEQUENCE and DTSTAMP of an exported event, by UID
+EventState = Dict[str, Tuple[str, int, str]]
+
+
+def event_uid(schedule_id: str, user_id: str, start: int, end: int) -> str:
+    """Get the stable UID of a shift's event.
+
+    Args:
+        schedule_id: PagerDuty schedule ID
+        user_id: PagerDuty user ID
+        start: Start time in epoch seconds
+        end: End time in epoch seconds
+
+    Returns:
+        UID that stays the same across exports as long as the shift does
+    """
+    digest = hashlib.sha256(f"{schedule_id}/{user_id}/{start}/{end}".encode()).hexdigest()
+    return f"{digest[:32]}@myshift"
+
+
+def format_stamp(epoch: int) -> str:
+    """Format an epoch-second time as an iCalendar UTC date-time."""
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def escape_text(value: str) -> str:
+    """Escape a value for an iCalendar TEXT property."""
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def fold_line(line: str) -> str:
+    """Fold a content line longer than 75 octets, without splitting UTF-8 characters.
+
+    Args:
+        line: Content line, without its line break
+
+    Returns:
+        The line with CRLF line breaks, continuation lines starting with a space
+    """
+    if len(line.encode()) <= MAX_LINE_OCTETS:
+        return line + "\r\n"
+
+    parts: List[str] = []
+    current, size, limit = [], 0, MAX_LINE_OCTETS
+    for char in line:
+        octets = len(char.encode())
+        if size + octets > limit:
+            parts.append("".join(current))
+            # Continuation lines start with a space, which counts towards their length
+            current, size, limit = [], 0, MAX_LINE_OCTETS - 1
+        current.append(char)
+        size += octets
+    parts.append("".join(current))
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def load_state(path: str) -> EventState:
+    """Load the event state recorded by the previous export to a file.
+
+    Args:
+        path: Path of the exported file
+
+    Returns:
+        Event state by UID (empty if there is none or it cannot be read)
+    """
+    try:
+        with open(path + STATE_SUFFIX) as f:
+            return {uid: (value[0], int(value[1]), value[2]) for uid, value in json.load(f)["events"].items()}
+    except (OSError, ValueError, KeyError, TypeError, IndexError):
+        return {}
+
+
+def save_state(path: str, state: EventState) -> None:
+    """Record the event state of an export to a file.
+
+    Args:
+        path: Path of the exported file
+        state: Event state by UID
+    """
+    tmp_path = path + STATE_SUFFIX + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"events": state}, f, separators=(",", ":"))
+    os.replace(tmp_path, path + STATE_SUFFIX)
+
+
+def write_calendar(
+    out: TextIO,
+    shifts: Iterable[ExportShift],
+    names: Dict[str, str],
+    labels: Dict[str, str],
+    calendar_name: str,
+    previous: Optional[EventState] = None,
+    now: Optional[datetime] = None,
+) -> Tuple[EventState, int]:
+    """Write shifts as an iCalendar document, one event at a time.
+
+    Args:
+        out: Text stream to write to (written with CRLF line breaks as is)
+        shifts: (start, end, user_id, schedule_id) shifts, in the order to write them
+        names: Dictionary mapping user IDs to display names
+        labels: Dictionary mapping schedule IDs to display labels
+        calendar_name: Name of the calendar shown by calendar apps
+        previous: Event state of the previous export, to keep unchanged events identical
+        now: Time of this export (defaults to now)
+
+    Returns:
+        Tuple of (event state of this export, number of events new or changed since the previous export)
+    """
+    previous = previous or {}
+    stamp = format_stamp(int((now or datetime.now(timezone.utc)).timestamp()))
+    state: EventState = {}
+    changed = 0
+
+    out.write(fold_line("BEGIN:VCALENDAR"))
+    out.write(fold_line("VERSION:2.0"))
+    out.write(fold_line(f"PRODID:{PRODID}"))
+    out.write(fold_line("CALSCALE:GREGORIAN"))
+    out.write(fold_line("METHOD:PUBLISH"))
+    out.write(fold_line(f"X-WR-CALNAME:{escape_text(calendar_name)}"))
+    for start, end, user_id, schedule_id in shifts:
+        uid = event_uid(schedule_id, user_id, start, end)
+        name = names.get(user_id, "Unknown")
+        content = (
+            fold_line(f"UID:{uid}")
+            + fold_line(f"DTSTART:{format_stamp(start)}")
+            + fold_line(f"DTEND:{format_stamp(end)}")
+            + fold_line(f"SUMMARY:{escape_text(f'On call: {name}')}")
+            + fold_line(f"DESCRIPTION:{escape_text(f'{name} is on call for {labels.get(schedule_id, schedule_id)}')}")
+            + fold_line("TRANSP:TRANSPARENT")
+        )
+        digest = hashlib.sha256(content.encode()).hexdigest()
+        if uid in previous and previous[uid][0] == digest:
+            state[uid] = previous[uid]
+        else:
+            state[uid] = (digest, previous[uid][1] + 1 if uid in previous else 0, stamp)
+            changed += 1
+        _, sequence, event_stamp = state[uid]
+        out.write("BEGIN:VEVENT\r\n")
+        out.write(content)
+        out.write(fold_line(f"DTSTAMP:{event_stamp}"))
+        out.write(fold_line(f"SEQUENCE:{sequence}"))
+        out.write("END:VEVENT\r\n")
+    out.write("END:VCALENDAR\r\n")
+    return state, changed
+
+
+def merge_schedules(shifts: Dict[str, Iterator[Tuple[int, int, str]]]) -> Iterator[ExportShift]:
+    """Merge the epoch-second shifts of several schedules into one chronological stream.
+
+    Args:
+        shifts: Dictionary mapping schedule IDs to their sorted (start, end, user_id) shifts
+
+    Returns:
+        Iterator over (start, end, user_id, schedule_id) tuples
+    """
+    return heapq.merge(*(with_label(schedule_shifts, schedule_id) for schedule_id, schedule_shifts in shifts.items()))
+
+
+def export_ics(
+    session: RestApiV2Client,
+    schedules: Dict[str, str],
+    days: int = 90,
+    since: Optional[datetime] = None,
+    email: Optional[str] = None,
+    output: Optional[str] = None,
+    workers: int = DEFAULT_SCHEDULE_WORKERS,
+) -> None:
+    """Export shifts of one or more schedules as an iCalendar feed.
+
+    Args:
+        session: PagerDuty API session
+        schedules: Dictionary mapping schedule IDs to display labels
+        days: Number of days to export (default: 90)
+        since: Start of the exported period (defaults to now)
+        email: Optional email address of the only user whose shifts are exported
+        output: Path of the file to write (defaults to stdout); re-exports to
+            the same file only rewrite it when events changed
+        workers: Maximum number of schedules fetched at the same time
+
+    Raises:
+        SystemExit: If API calls or writing the file fail
+    """
+    try:
+        since = since or datetime.now(tz.tzlocal())
+        until = since + timedelta(days=days)
+        user_id = get_user_id_by_email(session, email) if email else None
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(schedules)))) as executor:
+            results = list(
+                executor.map(
+                    lambda schedule_id: get_shift_array(session, schedule_id, until, since=since, quiet=True),
+                    schedules,
+                )
+            )
+
+        user_ids = {user for shifts in results for user in shifts.user_ids if user_id is None or user == user_id}
+        user_map = build_user_map_for_ids(session, user_ids)
+        names = {user: user_map.get(user, {"name": "Unknown"})["name"] for user in user_ids}
+        calendar_name = f"On call: {names[user_id] if user_id in names else email}" if email else "On-call shifts"
+        calendar_name += f" ({', '.join(schedules.values())})"
+        shifts = merge_schedules(
+            {
+                schedule_id: (shift for shift in array.iter_epochs() if user_id is None or shift[2] == user_id)
+                for schedule_id, array in zip(schedules, results)
+            }
+        )
+
+        if output is None:
+            write_calendar(sys.stdout, shifts, names, schedules, calendar_name)
+            return
+
+        previous = load_state(output)
+        tmp_path = output + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            state, changed = write_calendar(f, shifts, names, schedules, calendar_name, previous)
+        removed = len(previous.keys() - state.keys())
+        if not changed and not removed and os.path.exists(output):
+            os.unlink(tmp_path)
+            print(f"{output} is up to date ({len(state)} events)", file=sys.stderr)
+            return
+
+        os.replace(tmp_path, output)
+        save_state(output, state)
+        print(
+            f"Wrote {len(state)} events to {output} ({changed} new or changed, {removed} removed)",
+            file=sys.stderr,
+        )
+    except OSError as e:
+        print(f"Error writing calendar: {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error exporting shifts: {e}", file=sys.stderr)
+        sys.exit(1)
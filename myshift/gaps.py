@@ -0,0 +1,213 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Coverage gap and overlap detection for PagerDuty schedules.
+
+This module provides functionality to check a schedule's coverage over a
+period, including:
+- Finding windows where nobody is on call
+- Finding windows where more users than expected are on call at once
+- Checking several schedules separately, or as one combined rotation
+
+Coverage is computed with a sweep line: every shift contributes a start and
+an end event, the events are sorted once, and a single pass over them yields
+the windows in which the set of users on call stays the same. That is
+O(n log n) in the number of shifts, so year-long horizons are cheap once the
+shifts are fetched.
+"""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from dateutil import tz
+from pagerduty import RestApiV2Client
+
+from myshift.defaults import DEFAULT_SCHEDULE_WORKERS
+from myshift.shiftarray import EpochShift, ShiftArray
+from myshift.util import UserObject, build_user_map_for_ids, get_shift_array
+
+# (start, end, user IDs on call) of a window of constant coverage, with times in epoch seconds
+Window = Tuple[int, int, Tuple[str, ...]]
+
+# (kind, start, end, user IDs on call) of a coverage problem; kind is "gap", "under" or "over"
+Issue = Tuple[str, int, int, Tuple[str, ...]]
+
+
+def sweep_coverage(shifts: Iterable[EpochShift], since: int, until: int) -> Iterator[Window]:
+    """Split a period into windows in which the same users are on call.
+
+    A user on call in several overlapping shifts (e.g. at two escalation
+    levels) counts once.
+
+    Args:
+        shifts: (start, end, user_id) shifts with times in epoch seconds, in any order
+        since: Start of the period, in epoch seconds
+        until: End of the period, in epoch seconds
+
+    Yields:
+        (start, end, user_ids) windows covering the period in order, with
+        user_ids sorted; consecutive windows have different users
+    """
+    events = sorted(
+        (time, delta, user_id)
+        for start, end, user_id in shifts
+        if min(end, until) > max(start, since)
+        for time, delta in ((max(start, since), 1), (min(end, until), -1))
+    )
+
+    active: Dict[str, int] = {}
+    window_start = since
+    current: Tuple[str, ...] = ()
+    i = 0
+    while i < len(events):
+        time = events[i][0]
+        # Apply every event at this time before comparing coverage, so back-to-back shifts don't look like overlaps
+        while i < len(events) and events[i][0] == time:
+            _, delta, user_id = events[i]
+            count = active.get(user_id, 0) + delta
+            if count:
+                active[user_id] = count
+            else:
+                del active[user_id]
+            i += 1
+
+        users = tuple(sorted(active))
+        if users != current:
+            if time > window_start:
+                yield window_start, time, current
+            window_start, current = time, users
+
+    if until > window_start:
+        yield window_start, until, current
+
+
+def find_issues(windows: Iterable[Window], expected: int = 1) -> List[Issue]:
+    """Find the windows with less or more coverage than expected.
+
+    Consecutive windows with the same kind of problem are reported
+    separately when different users are on call, so every overlap names
+    the users involved.
+
+    Args:
+        windows: Windows of constant coverage (see sweep_coverage)
+        expected: Number of users expected to be on call at any time
+
+    Returns:
+        (kind, start, end, user_ids) issues in time order, where kind is
+        "gap" (nobody on call), "under" (fewer than expected) or "over"
+        (more than expected)
+    """
+    issues: List[Issue] = []
+    for start, end, users in windows:
+        if len(users) == expected:
+            continue
+        kind = "gap" if not users else "under" if len(users) < expected else "over"
+        if issues and issues[-1][0] == kind and issues[-1][2] == start and issues[-1][3] == users:
+            issues[-1] = (kind, issues[-1][1], end, users)
+        else:
+            issues.append((kind, start, end, users))
+    return issues
+
+
+def format_duration(seconds: int) -> str:
+    """Format a duration as days, hours and minutes, e.g. "1d 4h 30m"."""
+    days, rest = divmod(seconds // 60, 24 * 60)
+    hours, minutes = divmod(rest, 60)
+    return f"{days}d {hours}h {minutes}m" if days else f"{hours}h {minutes}m"
+
+
+def print_issues(issues: List[Issue], user_map: Dict[str, UserObject], label: str) -> None:
+    """Print the coverage problems of a schedule.
+
+    Args:
+        issues: Coverage problems (see find_issues)
+        user_map: Dictionary mapping user IDs to user information
+        label: Display label of the schedule
+    """
+    if not issues:
+        print(f"{label}: fully covered, no overlaps")
+        return
+
+    local_tz = tz.tzlocal()
+    print(f"{label}:")
+    for kind, start, end, users in issues:
+        line = (
+            f"  {kind.upper():<5} {datetime.fromtimestamp(start, local_tz).strftime('%Y-%m-%d %H:%M %Z')} to "
+            f"{datetime.fromtimestamp(end, local_tz).strftime('%Y-%m-%d %H:%M %Z')} ({format_duration(end - start)})"
+        )
+        if users:
+            line += ": " + ", ".join(user_map.get(user_id, {"name": "Unknown"})["name"] for user_id in users)
+        print(line)
+
+    totals = []
+    for kind, noun in (("gap", "gap"), ("under", "under-covered window"), ("over", "overlap")):
+        found = [end - start for issue_kind, start, end, _ in issues if issue_kind == kind]
+        if found:
+            totals.append(f"{len(found)} {noun}{'s' if len(found) > 1 else ''} ({format_duration(sum(found))})")
+    print(f"  Total: {', '.join(totals)}")
+
+
+def check_coverage(
+    session: RestApiV2Client,
+    schedules: Dict[str, str],
+    days: int = 28,  # 4 weeks
+    since: Optional[datetime] = None,
+    expected: int = 1,
+    combined: bool = False,
+    workers: int = DEFAULT_SCHEDULE_WORKERS,
+) -> None:
+    """Show the coverage gaps and overlaps of one or more schedules.
+
+    Args:
+        session: PagerDuty API session
+        schedules: Dictionary mapping schedule IDs to display labels
+        days: Number of days to check (default: 28 days / 4 weeks)
+        since: Start of the period (defaults to now)
+        expected: Number of users expected to be on call at any time
+        combined: Check the schedules together, as one rotation, instead of each on its own
+        workers: Maximum number of schedules fetched at the same time
+
+    Raises:
+        SystemExit: If API calls fail
+    """
+    try:
+        since = since or datetime.now(tz.tzlocal())
+        until = since + timedelta(days=days)
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(schedules)))) as executor:
+            results = list(
+                executor.map(
+                    lambda schedule_id: get_shift_array(session, schedule_id, until, since=since, quiet=True),
+                    schedules,
+                )
+            )
+
+        start, end = int(since.timestamp()), int(until.timestamp())
+        if combined:
+            labels = [f"{len(schedules)} schedules combined" if len(schedules) > 1 else next(iter(schedules.values()))]
+            results = [ShiftArray.concat(results)]
+        else:
+            labels = list(schedules.values())
+        reports = [find_issues(sweep_coverage(shifts.iter_epochs(), start, end), expected) for shifts in results]
+
+        user_ids = {user_id for issues in reports for *_, users in issues for user_id in users}
+        user_map = build_user_map_for_ids(session, user_ids)
+
+        print(f"Coverage from {since.strftime('%Y-%m-%d %H:%M %Z')} to {until.strftime('%Y-%m-%d %H:%M %Z')}:")
+        for label, issues in zip(labels, reports):
+            print_issues(issues, user_map, label)
+    except Exception as e:
+        print(f"Error checking coverage: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,94 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""In-memory interval index over on-call shifts.
+
+The index keeps shifts in a sorted array and answers queries with binary
+search:
+- Who is on call at a point in time
+- Which shifts overlap a time range
+- What is the next shift starting after a point in time
+
+Shifts in a schedule are bounded in length, so every shift covering time T
+starts in the window (T - longest shift, T]. Point and range queries therefore
+cost O(log n) plus the number of shifts starting in that window.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+Shift = Tuple[datetime, datetime, str]
+
+
+class ShiftIndex:
+    """Sorted-array index of (start_time, end_time, user_id) shifts."""
+
+    def __init__(self, shifts: Iterable[Shift]):
+        """Build the index.
+
+        Args:
+            shifts: (start_time, end_time, user_id) tuples, in any order
+        """
+        self._shifts: List[Shift] = sorted(shifts)
+        self._starts: List[datetime] = [shift[0] for shift in self._shifts]
+        self._longest = max((end - start for start, end, _ in self._shifts), default=timedelta(0))
+
+    def __len__(self) -> int:
+        return len(self._shifts)
+
+    def __iter__(self) -> Iterator[Shift]:
+        return iter(self._shifts)
+
+    def at(self, when: datetime) -> List[Shift]:
+        """Get the shifts covering a point in time.
+
+        Args:
+            when: Point in time (timezone-aware)
+
+        Returns:
+            Shifts with start <= when < end, sorted by start time
+        """
+        lo = bisect_right(self._starts, when - self._longest)
+        hi = bisect_right(self._starts, when)
+        return [shift for shift in self._shifts[lo:hi] if shift[1] > when]
+
+    def between(self, since: datetime, until: datetime) -> List[Shift]:
+        """Get the shifts overlapping a time range.
+
+        Args:
+            since: Range start (timezone-aware)
+            until: Range end (timezone-aware)
+
+        Returns:
+            Shifts with start < until and end > since, sorted by start time
+        """
+        lo = bisect_right(self._starts, since - self._longest)
+        hi = bisect_left(self._starts, until)
+        return [shift for shift in self._shifts[lo:hi] if shift[1] > since]
+
+    def next_after(self, when: datetime, user_id: Optional[str] = None) -> Optional[Shift]:
+        """Get the first shift starting at or after a point in time.
+
+        Args:
+            when: Point in time (timezone-aware)
+            user_id: Optional user ID to restrict the search to
+
+        Returns:
+            The next shift, or None if there is none in the index
+        """
+        for shift in self._shifts[bisect_left(self._starts, when) :]:
+            if user_id is None or shift[2] == user_id:
+                return shift
+        return None
@@ -0,0 +1,162 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Point-in-time and range lookups for PagerDuty on-call schedules.
+
+This module provides functionality to answer questions like "who is on call
+at 03:00 next Tuesday", including:
+- Showing who is on call at a point in time
+- Showing every shift overlapping a time range
+- Answering from an existing shift index without new API calls
+"""
+
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from dateutil import parser as date_parser
+from dateutil import tz
+from pagerduty import RestApiV2Client
+
+from myshift.intervals import Shift, ShiftIndex
+from myshift.util import UserObject, build_user_map, get_all_unique_shifts
+
+
+def parse_time(value: str) -> datetime:
+    """Parse a date/time argument, assuming local time if no timezone is given.
+
+    Args:
+        value: Date/time string, e.g. "2024-03-20 03:00"
+
+    Returns:
+        Timezone-aware datetime
+
+    Raises:
+        ValueError: If the value cannot be parsed
+    """
+    when = date_parser.parse(value)
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=tz.tzlocal())
+    return when
+
+
+def print_shifts(shifts: List[Shift], user_map: Dict[str, UserObject]) -> None:
+    """Print shifts with user names, one per line.
+
+    Args:
+        shifts: (start_time, end_time, user_id) tuples
+        user_map: Dictionary mapping user IDs to user information
+    """
+    for start, end, user_id in shifts:
+        user = user_map.get(user_id, {"name": "Unknown"})
+        print(f"{start.strftime('%Y-%m-%d %H:%M %Z')} to " f"{end.strftime('%Y-%m-%d %H:%M %Z')}: {user['name']}")
+
+
+def print_on_call_at(index: ShiftIndex, user_map: Dict[str, UserObject], when: datetime) -> None:
+    """Print who is on call at a point in time, answering from a shift index.
+
+    Args:
+        index: Shift index covering the point in time
+        user_map: Dictionary mapping user IDs to user information
+        when: Point in time (timezone-aware)
+    """
+    shifts = index.at(when)
+    if not shifts:
+        print(f"Nobody is on call at {when.strftime('%Y-%m-%d %H:%M %Z')}")
+        return
+
+    print(f"On call at {when.strftime('%Y-%m-%d %H:%M %Z')}:")
+    print_shifts(shifts, user_map)
+
+
+def print_shifts_between(index: ShiftIndex, user_map: Dict[str, UserObject], since: datetime, until: datetime) -> None:
+    """Print the shifts overlapping a time range, answering from a shift index.
+
+    Args:
+        index: Shift index covering the time range
+        user_map: Dictionary mapping user IDs to user information
+        since: Range start (timezone-aware)
+        until: Range end (timezone-aware)
+    """
+    shifts = index.between(since, until)
+    if not shifts:
+        print("No shifts found")
+        return
+
+    print(f"Shifts between {since.strftime('%Y-%m-%d %H:%M %Z')} and {until.strftime('%Y-%m-%d %H:%M %Z')}:")
+    print_shifts(shifts, user_map)
+
+
+def load_index(
+    session: RestApiV2Client, schedule_id: str, since: datetime, until: datetime
+) -> Tuple[ShiftIndex, Dict[str, UserObject]]:
+    """Fetch the shifts of a time range into an index, with user information.
+
+    Args:
+        session: PagerDuty API session
+        schedule_id: PagerDuty schedule ID
+        since: Range start (timezone-aware)
+        until: Range end (timezone-aware)
+
+    Returns:
+        Tuple of (shift index, dictionary mapping user IDs to user information)
+
+    Raises:
+        SystemExit: If API calls fail
+    """
+    shifts = get_all_unique_shifts(session, schedule_id, until, since=since)
+    return ShiftIndex(shifts), build_user_map(session, shifts)
+
+
+def on_call_at(session: RestApiV2Client, schedule_id: str, when: datetime) -> None:
+    """Show who is on call at a point in time.
+
+    Args:
+        session: PagerDuty API session
+        schedule_id: PagerDuty schedule ID
+        when: Point in time (timezone-aware)
+
+    Raises:
+        SystemExit: If API calls fail
+    """
+    try:
+        index, user_map = load_index(session, schedule_id, when, when + timedelta(seconds=1))
+        print_on_call_at(index, user_map, when)
+    except Exception as e:
+        print(f"Error looking up shifts: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def shifts_between(session: RestApiV2Client, schedule_id: str, since: datetime, until: datetime) -> None:
+    """Show every shift overlapping a time range.
+
+    Args:
+        session: PagerDuty API session
+        schedule_id: PagerDuty schedule ID
+        since: Range start (timezone-aware)
+        until: Range end (timezone-aware)
+
+    Raises:
+        SystemExit: If the range is empty or API calls fail
+    """
+    if until <= since:
+        print("End time must be after start time", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        index, user_map = load_index(session, schedule_id, since, until)
+        print_shifts_between(index, user_map, since, until)
+    except Exception as e:
+        print(f"Error looking up shifts: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -19,16 +19,114 @@ including:
 - Finding the next scheduled shift within a 3-month window
 - Filtering shifts by user (via ID or email)
 - Displaying shift details in a user-friendly format
+- Looking up the next shifts of many users at once, with one query
 """
 
 import sys
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import List, Optional
 
 from dateutil import tz
 from pagerduty import RestApiV2Client
 
-from myshift.util import get_unique_shifts, get_user_id_by_email
+from myshift.intervals import ShiftIndex
+from myshift.util import get_unique_shifts, get_unique_shifts_by_user, get_user_id_by_email, get_user_ids_by_email
+
+
+def print_next_shift(index: ShiftIndex, user_id: str, now: datetime) -> None:
+    """Print the current or next on-call shift of a user, answering from a shift index.
+
+    Args:
+        index: Shift index covering the look-ahead period
+        user_id: PagerDuty user ID
+        now: Current time (timezone-aware)
+    """
+    current = [shift for shift in index.at(now) if shift[2] == user_id]
+    if current:
+        print("Currently on call")
+        print(f"Shift ends: {current[0][1].strftime('%Y-%m-%d %H:%M %Z')}")
+        return
+
+    upcoming = index.next_after(now, user_id)
+    if upcoming:
+        print("Next shift:")
+        print(f"Starts: {upcoming[0].strftime('%Y-%m-%d %H:%M %Z')}")
+        print(f"Ends: {upcoming[1].strftime('%Y-%m-%d %H:%M %Z')}")
+    else:
+        print("No upcoming shifts found")
+
+
+def describe_next_shift(index: ShiftIndex, user_id: str, now: datetime) -> str:
+    """Describe the current or next on-call shift of a user in one line.
+
+    Args:
+        index: Shift index covering the look-ahead period
+        user_id: PagerDuty user ID
+        now: Current time (timezone-aware)
+
+    Returns:
+        Description of the shift
+    """
+    current = [shift for shift in index.at(now) if shift[2] == user_id]
+    if current:
+        return f"Currently on call, until {current[0][1].strftime('%Y-%m-%d %H:%M %Z')}"
+
+    upcoming = index.next_after(now, user_id)
+    if upcoming:
+        return f"Next shift {upcoming[0].strftime('%Y-%m-%d %H:%M %Z')} to {upcoming[1].strftime('%Y-%m-%d %H:%M %Z')}"
+    return "No upcoming shifts found"
+
+
+def print_next_shifts(index: ShiftIndex, user_ids: List[Optional[str]], emails: List[str], now: datetime) -> None:
+    """Print the current or next on-call shift of several users, one line each.
+
+    Args:
+        index: Shift index covering the look-ahead period
+        user_ids: PagerDuty user IDs, None for users that don't exist
+        emails: Email addresses of the users, in the same order
+        now: Current time (timezone-aware)
+    """
+    width = max(len(email) for email in emails)
+    for email, user_id in zip(emails, user_ids):
+        description = describe_next_shift(index, user_id, now) if user_id else "User not found in PagerDuty"
+        print(f"{email:<{width}}  {description}")
+
+
+def next_shifts(session: RestApiV2Client, schedule_id: str, emails: List[str], days: int = 90) -> None:
+    """Show the next on-call shift of several users.
+
+    The users are resolved in bulk and their shifts fetched with one query,
+    instead of one lookup and one query per user.
+
+    Args:
+        session: PagerDuty API session
+        schedule_id: PagerDuty schedule ID
+        emails: Email addresses of the users
+        days: Number of days to look ahead
+
+    Raises:
+        SystemExit: If no email is provided, no user is found or API calls fail
+    """
+    if not emails:
+        print("Email address is required", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        user_ids = get_user_ids_by_email(session, emails)
+        known = sorted({user_id for user_id in user_ids.values() if user_id})
+        if not known:
+            print("None of the users were found in PagerDuty.", file=sys.stderr)
+            sys.exit(1)
+
+        now = datetime.now(tz.tzlocal())
+        shifts = get_unique_shifts_by_user(session, known, schedule_id, now + timedelta(days=days))
+        index = ShiftIndex(
+            (start, end, user_id) for user_id, user_shifts in shifts.items() for start, end in user_shifts
+        )
+        print_next_shifts(index, [user_ids[email] for email in emails], emails, datetime.now(tz.tzlocal()))
+    except Exception as e:
+        print(f"Error fetching shift information: {e}", file=sys.stderr)
+        sys.exit(1)
 
 
 def next_shift(
@@ -36,6 +134,7 @@ def next_shift(
     schedule_id: str,
     email: Optional[str] = None,
     days: int = 90,
+    user_id: Optional[str] = None,
 ) -> None:
     """Show the next on-call shift for a user.
 
@@ -44,16 +143,17 @@ def next_shift(
         schedule_id: PagerDuty schedule ID
         email: Optional email address to look up user ID
         days: Number of days to look ahead
+        user_id: Optional user ID, skipping the email lookup (e.g. from a compiled config)
 
     Raises:
-        SystemExit: If email is not provided or API calls fail
+        SystemExit: If neither email nor user_id is provided or API calls fail
     """
-    if not email:
+    if not email and not user_id:
         print("Email address is required", file=sys.stderr)
         sys.exit(1)
 
     try:
-        user_id = get_user_id_by_email(session, email)
+        user_id = user_id or get_user_id_by_email(session, email)
         until = datetime.now(tz.tzlocal()) + timedelta(days=days)
 
         shifts = get_unique_shifts(session, user_id, schedule_id, until)
@@ -61,18 +161,8 @@ def next_shift(
             print("No upcoming shifts found")
             return
 
-        next_shift_start, next_shift_end = shifts[0]
-        now = datetime.now(tz.tzlocal())
-
-        if next_shift_start <= now <= next_shift_end:
-            print("Currently on call")
-            print(f"Shift ends: {next_shift_end.strftime('%Y-%m-%d %H:%M %Z')}")
-        elif next_shift_start > now:
-            print("Next shift:")
-            print(f"Starts: {next_shift_start.strftime('%Y-%m-%d %H:%M %Z')}")
-            print(f"Ends: {next_shift_end.strftime('%Y-%m-%d %H:%M %Z')}")
-        else:
-            print("No upcoming shifts found")
+        index = ShiftIndex((start, end, user_id) for start, end in shifts)
+        print_next_shift(index, user_id, datetime.now(tz.tzlocal()))
     except Exception as e:
         print(f"Error fetching shift information: {e}", file=sys.stderr)
         sys.exit(1)
@@ -2,13 +2,20 @@
 
 import sys
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, TypedDict
+from typing import Callable, Dict, List, Optional, Tuple, TypedDict
 
 from dateutil import parser as date_parser
 from dateutil import tz
-from pagerduty import RestApiV2Client, HttpError, UrlError
+from pagerduty import HttpError, RestApiV2Client, UrlError
 
-from myshift.util import get_user_id_by_email, get_user_name_by_id
+from myshift.bulk import list_overrides, submit_overrides
+from myshift.defaults import DEFAULT_OVERRIDE_CHUNK_SIZE, DEFAULT_OVERRIDE_WORKERS
+from myshift.intervals import ShiftIndex
+from myshift.timestamps import format_utc, parse_utc
+from myshift.util import get_user_id_by_email, get_user_name_by_id, list_oncalls
+
+# Days searched for the target's shifts when no end date is given
+DEFAULT_SEARCH_DAYS = 14
 
 
 class ShiftDict(TypedDict):
@@ -32,7 +39,7 @@ def get_consecutive_target_shifts(
         schedule_id: PagerDuty schedule ID
         target_user_id: User ID whose shifts to get
         start_date: Date to start looking for shifts
-        end_date: Optional end date to limit shifts (defaults to 14 days from start)
+        end_date: Optional end date to limit shifts (defaults to DEFAULT_SEARCH_DAYS days from start)
 
     Returns:
         List of shift dictionaries with start and end times
@@ -43,24 +50,23 @@ def get_consecutive_target_shifts(
     try:
         shifts: List[ShiftDict] = []
         if end_date is None:
-            end_date = start_date + timedelta(days=14)
-            
+            end_date = start_date + timedelta(days=DEFAULT_SEARCH_DAYS)
+
         params = {
             "schedule_ids": [schedule_id],  # Use modern list format
             "since": start_date.isoformat(),
             "until": end_date.isoformat(),
             "user_ids": [target_user_id],  # More efficient filtering
         }
-        
-        # Use modern iter_all for automatic pagination
-        all_oncalls = list(session.iter_all("/oncalls", params=params))
-        
+
+        all_oncalls = list_oncalls(session, params)
+
         for oc in all_oncalls:
             if oc.get("user", {}).get("id") == target_user_id:
                 shifts.append({"start": oc["start"], "end": oc["end"]})
-                
+
         return shifts
-        
+
     except HttpError as e:
         print(f"PagerDuty API error fetching shifts: {e.response.status_code} - {e}", file=sys.stderr)
         sys.exit(1)
@@ -69,6 +75,85 @@ def get_consecutive_target_shifts(
         sys.exit(1)
 
 
+def get_existing_overrides(session: RestApiV2Client, schedule_id: str, since: datetime, until: datetime) -> ShiftIndex:
+    """Get the overrides a schedule already has in a time range.
+
+    Args:
+        session: PagerDuty API session
+        schedule_id: PagerDuty schedule ID
+        since: Range start
+        until: Range end
+
+    Returns:
+        Index of the overrides as (start_time, end_time, user_id) shifts
+
+    Raises:
+        SystemExit: If API calls fail
+    """
+    try:
+        return ShiftIndex(
+            (parse_utc(o["start"]), parse_utc(o["end"]), o["user"]["id"])
+            for o in list_overrides(session, schedule_id, since, until)
+        )
+    except HttpError as e:
+        print(f"PagerDuty API error fetching overrides: {e.response.status_code} - {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def diff_overrides(
+    shifts: List[ShiftDict], existing: ShiftIndex, user_id: str
+) -> Tuple[List[ShiftDict], List[ShiftDict]]:
+    """Work out which parts of some shifts still need an override for a user.
+
+    Args:
+        shifts: Target shifts to override
+        existing: Index of the schedule's existing overrides
+        user_id: ID of the user taking the shifts
+
+    Returns:
+        Tuple of (overrides to create, shifts already covered by the user's
+        overrides). A partly covered shift only needs its uncovered parts.
+    """
+    missing: List[ShiftDict] = []
+    covered: List[ShiftDict] = []
+    for shift in shifts:
+        start, end = parse_utc(shift["start"]), parse_utc(shift["end"])
+        gaps = []
+        cursor = start
+        for o_start, o_end, o_user in existing.between(start, end):
+            if o_user != user_id or o_end <= cursor:
+                continue
+            if o_start > cursor:
+                gaps.append((cursor, o_start))
+            cursor = o_end
+            if cursor >= end:
+                break
+        if cursor < end:
+            gaps.append((cursor, end))
+
+        if not gaps:
+            covered.append(shift)
+        elif gaps == [(start, end)]:
+            missing.append(shift)
+        else:
+            missing.extend({"start": format_utc(g_start), "end": format_utc(g_end)} for g_start, g_end in gaps)
+    return missing, covered
+
+
+def print_override_diff(user_name: str, missing: List[ShiftDict], covered: List[ShiftDict]) -> None:
+    """Print the overrides that would be created, and the shifts already covered.
+
+    Args:
+        user_name: Name of the user taking the shifts
+        missing: Overrides to create
+        covered: Shifts already covered by the user's overrides
+    """
+    print(f"Would create {len(missing)} override(s) for {user_name}; {len(covered)} shift(s) already covered")
+    marked = [("+", shift) for shift in missing] + [("=", shift) for shift in covered]
+    for mark, shift in sorted(marked, key=lambda item: parse_utc(item[1]["start"])):
+        print(f"  {mark} {shift['start']} - {shift['end']}")
+
+
 def create_override(
     session: RestApiV2Client,
     schedule_id: str,
@@ -78,7 +163,11 @@ def create_override(
     target_user_email: Optional[str] = None,
     start_str: Optional[str] = None,
     end_str: Optional[str] = None,
-) -> None:
+    chunk_size: int = DEFAULT_OVERRIDE_CHUNK_SIZE,
+    workers: int = DEFAULT_OVERRIDE_WORKERS,
+    dry_run: bool = False,
+    on_change: Optional[Callable[[datetime, datetime], None]] = None,
+) -> Tuple[datetime, datetime]:
     """Create an override for a PagerDuty schedule.
 
     Args:
@@ -90,9 +179,17 @@ def create_override(
         target_user_email: PagerDuty user email whose shifts will be overridden
         start_str: Start date string (YYYY-MM-DD)
         end_str: Optional end date string (YYYY-MM-DD) to limit overrides
+        chunk_size: Maximum number of overrides per request
+        workers: Maximum number of requests in flight
+        dry_run: Only print which overrides would be created
+        on_change: Optional callable invalidating other views of the schedule, called with the
+            time range of the overrides that were or may have been created, before any failure exits
+
+    Returns:
+        Tuple of (start, end) of the time range covered by the overrides, in UTC
 
     Raises:
-        SystemExit: If required parameters are missing or API calls fail
+        SystemExit: If required parameters are missing, API calls fail or any override fails
     """
     if not user_id and not user_email:
         print("User ID or email is required", file=sys.stderr)
@@ -125,63 +222,83 @@ def create_override(
 
         # Get consecutive shifts for the target user
         shifts = get_consecutive_target_shifts(session, schedule_id, target_user_id, start, end)
-        if not shifts:
+        if shifts:
+            span = (
+                min(parse_utc(shift["start"]) for shift in shifts),
+                max(parse_utc(shift["end"]) for shift in shifts),
+            )
+            existing = get_existing_overrides(session, schedule_id, *span)
+            missing, covered = diff_overrides(shifts, existing, user_id)
+        else:
+            # /oncalls shows the overrides in place, so a re-run finds none of the target's shifts left:
+            # that's only an error if the user has no overrides in the range either
+            until = end if end is not None else start + timedelta(days=DEFAULT_SEARCH_DAYS)
+            existing = get_existing_overrides(session, schedule_id, start, until)
+            covered = [
+                {"start": format_utc(o_start), "end": format_utc(o_end)}
+                for o_start, o_end, o_user in existing
+                if o_user == user_id
+            ]
+            if not covered:
+                print(
+                    f"No consecutive shifts found for user {target_user_id} starting from {start_str}", file=sys.stderr
+                )
+                sys.exit(1)
+            missing = []
+            span = (min(parse_utc(o["start"]) for o in covered), max(parse_utc(o["end"]) for o in covered))
+        user_name = get_user_name_by_id(session, user_id)
+        if dry_run:
+            print_override_diff(user_name, missing, covered)
+            return span
+        if covered:
+            print(f"{len(covered)} shift(s) already covered by overrides for {user_name}")
+        if not missing:
+            return span
+
+        results = submit_overrides(
+            session, schedule_id, user_id, missing, chunk_size=chunk_size, workers=workers, existing=existing
+        )
+        applied = [r for r in results if r["override_id"]]
+        failed = [r for r in results if r["status"] == "failed"]
+        unknown = [r for r in results if r["status"] == "unknown"]
+
+        affected = None
+        if applied:
+            affected = (
+                min(parse_utc(r["start"]) for r in applied),
+                max(parse_utc(r["end"]) for r in applied),
+            )
+        changed = applied + unknown
+        if changed:
+            changed_span = (
+                min(parse_utc(r["start"]) for r in changed),
+                max(parse_utc(r["end"]) for r in changed),
+            )
+            store = getattr(session, "shift_store", None)
+            if store is not None:
+                store.invalidate(schedule_id, *changed_span)
+            if on_change is not None:
+                on_change(*changed_span)
+
+        created = sum(1 for r in results if r["status"] == "created")
+        print(f"Created {created} of {len(results)} override(s) for {user_name}")
+        for i, result in enumerate(results, 1):
+            print(f"Override {i}: {result['status']}")
+            print(f"  Start: {result['start']}")
+            print(f"  End: {result['end']}")
+            if result["error"]:
+                print(f"  Error: {result['error']}")
+
+        if unknown:
             print(
-                f"No consecutive shifts found for user {target_user_id} "
-                f"starting from {start_str}",
+                f"{len(unknown)} override(s) may or may not have been created; re-run to check them",
                 file=sys.stderr,
             )
+        if failed or unknown or affected is None:
+            print(f"Failed to create {len(failed)} override(s)", file=sys.stderr)
             sys.exit(1)
+        return affected
 
-        # Create overrides using modern batch creation pattern
-        # The API supports creating multiple overrides in one request
-        overrides_to_create = [
-            {
-                "start": shift["start"],
-                "end": shift["end"],
-                "user": {"id": user_id, "type": "user_reference"},
-                "time_zone": "UTC"  # Explicitly set timezone
-            }
-            for shift in shifts
-        ]
-
-        # Use modern rpost for wrapped entity handling
-        try:
-            result = session.rpost(
-                f"/schedules/{schedule_id}/overrides", 
-                json=overrides_to_create  # Modern pattern: pass list directly
-            )
-            
-            if result:
-                user_name = get_user_name_by_id(session, user_id)
-                print(f"Successfully created {len(shifts)} override(s) for {user_name}")
-                for i, shift in enumerate(shifts, 1):
-                    print(f"Override {i}:")
-                    print(f"  Start: {shift['start']}")
-                    print(f"  End: {shift['end']}")
-            else:
-                print("Failed to create override", file=sys.stderr)
-                sys.exit(1)
-                
-        except HttpError as e:
-            if e.response.status_code == 400:
-                print(f"Invalid override request: {e}", file=sys.stderr)
-                # Try to extract specific error details from response
-                try:
-                    error_details = e.response.json()
-                    if "errors" in error_details:
-                        for error in error_details["errors"]:
-                            print(f"  - {error}", file=sys.stderr)
-                except:
-                    pass
-            elif e.response.status_code == 403:
-                print("Insufficient permissions to create overrides", file=sys.stderr)
-            elif e.response.status_code == 404:
-                print(f"Schedule {schedule_id} not found", file=sys.stderr)
-            else:
-                print(f"PagerDuty API error: {e.response.status_code} - {e}", file=sys.stderr)
-            sys.exit(1)
-            
     except UrlError as e:
         print(f"Invalid API request: {e}", file=sys.stderr)
         sys.exit(1)
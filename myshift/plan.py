@@ -17,24 +17,95 @@
 This module provides functionality to view and plan on-call schedules,
 including:
 - Viewing all shifts in a schedule for a specified time period
+- Viewing a merged timeline across many schedules, fetched in parallel
+- Streaming long horizons, printing shifts while pages are still arriving
 - Displaying shifts with user information
 - Configurable look-ahead period
 """
 
+import heapq
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from dateutil import tz
 from pagerduty import RestApiV2Client
 
-from myshift.util import UserObject, build_user_map, get_all_unique_shifts
+from myshift.defaults import DEFAULT_SCHEDULE_WORKERS
+from myshift.stream import iter_unique_shifts
+from myshift.util import (
+    UserObject,
+    build_user_map,
+    build_user_map_for_ids,
+    get_all_unique_shifts,
+    get_shift_array,
+    get_user_name_by_id,
+)
+
+
+def print_shift_stream(
+    session: RestApiV2Client,
+    timeline: Iterable[Tuple[datetime, datetime, str, Optional[str]]],
+) -> int:
+    """Print shifts as they arrive, resolving each user name once.
+
+    Args:
+        session: PagerDuty API session
+        timeline: (start_time, end_time, user_id, label) tuples; the label is
+            appended to the line unless it is None
+
+    Returns:
+        Number of shifts printed
+    """
+    names: Dict[str, str] = {}
+    count = 0
+    for start, end, user_id, label in timeline:
+        if user_id not in names:
+            names[user_id] = get_user_name_by_id(session, user_id)
+        line = f"{start.strftime('%Y-%m-%d %H:%M %Z')} to {end.strftime('%Y-%m-%d %H:%M %Z')}: {names[user_id]}"
+        print(line if label is None else f"{line} [{label}]", flush=True)
+        count += 1
+    return count
+
+
+def with_label(shifts: Iterable[Tuple[Any, Any, str]], label: str) -> Iterator[Tuple[Any, Any, str, str]]:
+    """Tag each (start_time, end_time, user_id) shift with a schedule label.
+
+    Args:
+        shifts: Shifts of one schedule
+        label: Display label of the schedule
+
+    Yields:
+        (start_time, end_time, user_id, label) tuples
+    """
+    for start, end, user_id in shifts:
+        yield start, end, user_id, label
+
+
+def print_plan(shifts: List[Tuple[datetime, datetime, str]], user_map: Dict[str, UserObject], days: int) -> None:
+    """Print planned shifts with user names.
+
+    Args:
+        shifts: (start_time, end_time, user_id) tuples, sorted chronologically
+        user_map: Dictionary mapping user IDs to user information
+        days: Number of days the shifts cover
+    """
+    if not shifts:
+        print("No shifts found")
+        return
+
+    print(f"Shifts for the next {days} days:")
+    for start, end, user_id in shifts:
+        user = user_map.get(user_id, {"name": "Unknown"})
+        print(f"{start.strftime('%Y-%m-%d %H:%M %Z')} to " f"{end.strftime('%Y-%m-%d %H:%M %Z')}: {user['name']}")
 
 
 def plan_shifts(
     session: RestApiV2Client,
     schedule_id: str,
     days: int = 28,  # 4 weeks
+    stream: bool = False,
 ) -> None:
     """Show planned shifts for a period.
 
@@ -42,23 +113,99 @@ def plan_shifts(
         session: PagerDuty API session
         schedule_id: PagerDuty schedule ID
         days: Number of days to show (default: 28 days / 4 weeks)
+        stream: Print shifts while pages are still arriving, with bounded memory
 
     Raises:
         SystemExit: If API calls fail
     """
     try:
         until = datetime.now(tz.tzlocal()) + timedelta(days=days)
+        if stream:
+            print(f"Shifts for the next {days} days:")
+            timeline = (
+                (start, end, user_id, None) for start, end, user_id in iter_unique_shifts(session, schedule_id, until)
+            )
+            if not print_shift_stream(session, timeline):
+                print("No shifts found")
+            return
+
         shifts = get_all_unique_shifts(session, schedule_id, until)
         user_map = build_user_map(session, shifts)
+        print_plan(shifts, user_map, days)
+    except Exception as e:
+        print(f"Error planning shifts: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def plan_schedules(
+    session: RestApiV2Client,
+    schedules: Dict[str, str],
+    days: int = 28,  # 4 weeks
+    workers: int = DEFAULT_SCHEDULE_WORKERS,
+    stream: bool = False,
+) -> None:
+    """Show a merged timeline of planned shifts across several schedules.
+
+    Schedules are fetched in parallel with a bounded worker pool. User details
+    are resolved once for all schedules, and the shifts are printed as a single
+    chronologically sorted timeline labelled by schedule.
+
+    Args:
+        session: PagerDuty API session
+        schedules: Dictionary mapping schedule IDs to display labels
+        days: Number of days to show (default: 28 days / 4 weeks)
+        workers: Maximum number of schedules fetched at the same time
+        stream: Print shifts while pages are still arriving, with bounded
+            memory; the schedules are then read one page at a time instead of
+            in parallel
+
+    Raises:
+        SystemExit: If API calls fail
+    """
+    if len(schedules) == 1:
+        plan_shifts(session, next(iter(schedules)), days, stream)
+        return
+
+    try:
+        until = datetime.now(tz.tzlocal()) + timedelta(days=days)
+        if stream:
+            print(f"Shifts for the next {days} days across {len(schedules)} schedules:")
+            timeline = heapq.merge(
+                *(
+                    with_label(iter_unique_shifts(session, schedule_id, until), label)
+                    for schedule_id, label in schedules.items()
+                )
+            )
+            if not print_shift_stream(session, timeline):
+                print("No shifts found")
+            return
+
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(schedules)))) as executor:
+            results = list(
+                executor.map(lambda schedule_id: get_shift_array(session, schedule_id, until, quiet=True), schedules)
+            )
+
+        # Each schedule's shifts are already sorted, so a k-way merge on epoch
+        # seconds keeps the timeline in order; datetimes are only created to print
+        timeline = heapq.merge(
+            *(with_label(shifts.iter_epochs(), label) for label, shifts in zip(schedules.values(), results))
+        )
+        user_ids = {user_id for shifts in results for user_id in shifts.user_ids}
+        user_map = build_user_map_for_ids(session, user_ids)
 
-        if not shifts:
+        if not any(results):
             print("No shifts found")
             return
 
-        print(f"Shifts for the next {days} days:")
-        for start, end, user_id in shifts:
+        print(f"Shifts for the next {days} days across {len(schedules)} schedules:")
+        local_tz = tz.tzlocal()
+        times: Dict[int, str] = {}
+        for start, end, user_id, label in timeline:
+            for epoch in (start, end):
+                if epoch not in times:
+                    times[epoch] = datetime.fromtimestamp(epoch, local_tz).strftime("%Y-%m-%d %H:%M %Z")
             user = user_map.get(user_id, {"name": "Unknown"})
-            print(f"{start.strftime('%Y-%m-%d %H:%M %Z')} to " f"{end.strftime('%Y-%m-%d %H:%M %Z')}: {user['name']}")
+            print(f"{times[start]} to {times[end]}: {user['name']} [{label}]")
     except Exception as e:
         print(f"Error planning shifts: {e}", file=sys.stderr)
         sys.exit(1)
@@ -0,0 +1,211 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Per-invocation profiling of PagerDuty API usage.
+
+A profiler attached to the session (see get_pd_session and --profile) records:
+- Requests per endpoint, and the HTTP attempts they took (retries = attempts - requests)
+- Latency percentiles of the attempts, and bytes sent and received (as
+  downloaded, before decompression)
+- Pages fetched from paginated endpoints
+- Time spent in requests beyond the HTTP attempts themselves, which is
+  dominated by sleeping in retry back-off
+- CPU time of local processing sections, such as decoding and deduplication
+- Waiting on the session's rate limiter, if it has one
+
+The summary is printed to stderr when the process exits, as text or JSON.
+"""
+
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Any, ContextManager, Dict, Iterator, List, Optional
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Get a nearest-rank percentile of a list of values (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+class EndpointStats:
+    """Counters for one API endpoint."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.attempts = 0
+        self.pages = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+        self.backoff = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "attempts": self.attempts,
+            "retries": max(0, self.attempts - self.requests),
+            "pages": self.pages,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "latency_ms": {f"p{pct}": round(percentile(self.latencies, pct) * 1000, 1) for pct in (50, 90, 99, 100)},
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "backoff_s": round(self.backoff, 3),
+        }
+
+
+class Profiler:
+    """Collects API and CPU statistics for one myshift invocation."""
+
+    def __init__(self, output_format: str = "text"):
+        """Start profiling.
+
+        Args:
+            output_format: Summary format, 'text' or 'json'
+        """
+        self.output_format = output_format
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.sections: Dict[str, List[float]] = {}
+        # Set by get_pd_session when the session has a rate limiter
+        self.rate_limiter: Optional[Any] = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stats(self, endpoint: str) -> EndpointStats:
+        if endpoint not in self.endpoints:
+            self.endpoints[endpoint] = EndpointStats()
+        return self.endpoints[endpoint]
+
+    def begin_request(self) -> None:
+        """Mark the start of a logical request on the current thread."""
+        self._local.attempt_time = 0.0
+
+    def record_attempt(self, endpoint: str, response: Any) -> None:
+        """Record one HTTP attempt of a request.
+
+        Args:
+            endpoint: Endpoint label, e.g. "GET /oncalls"
+            response: Response received for the attempt
+        """
+        elapsed = response.elapsed.total_seconds()
+        self._local.attempt_time = getattr(self._local, "attempt_time", 0.0) + elapsed
+        request = response.request
+        with self._lock:
+            stats = self._stats(endpoint)
+            stats.attempts += 1
+            stats.latencies.append(elapsed)
+            stats.statuses[response.status_code] += 1
+            stats.bytes_sent += len(request.content or b"")
+            stats.bytes_received += response.num_bytes_downloaded
+            if response.is_success and request.method == "GET" and "limit" in request.url.params:
+                stats.pages += 1
+
+    def end_request(self, endpoint: str, wall: float) -> None:
+        """Record the end of a logical request on the current thread.
+
+        Args:
+            endpoint: Endpoint label, e.g. "GET /oncalls"
+            wall: Wall time of the whole request, including retries
+        """
+        backoff = max(0.0, wall - getattr(self._local, "attempt_time", 0.0))
+        with self._lock:
+            stats = self._stats(endpoint)
+            stats.requests += 1
+            stats.backoff += backoff
+
+    @contextmanager
+    def section(self, name: str) -> Iterator[None]:
+        """Measure the CPU time of a block of local processing on the current thread."""
+        started = time.thread_time()
+        try:
+            yield
+        finally:
+            elapsed = time.thread_time() - started
+            with self._lock:
+                self.sections.setdefault(name, []).append(elapsed)
+
+    def summary(self) -> Dict[str, Any]:
+        """Get the collected statistics as a dictionary."""
+        with self._lock:
+            endpoints = {name: stats.to_dict() for name, stats in sorted(self.endpoints.items())}
+            sections = {
+                name: {"calls": len(times), "cpu_s": round(sum(times), 3)} for name, times in self.sections.items()
+            }
+        return {
+            "wall_s": round(time.perf_counter() - self.started, 3),
+            "cpu_s": round(time.process_time() - self.cpu_started, 3),
+            "requests": sum(stats["requests"] for stats in endpoints.values()),
+            "retries": sum(stats["retries"] for stats in endpoints.values()),
+            "backoff_s": round(sum(stats["backoff_s"] for stats in endpoints.values()), 3),
+            "endpoints": endpoints,
+            "sections": sections,
+            "rate_limit": self.rate_limiter.stats() if self.rate_limiter is not None else None,
+        }
+
+    def format_text(self, summary: Dict[str, Any]) -> str:
+        """Format a summary for humans."""
+        lines = [
+            f"Profile: {summary['wall_s']:.2f}s wall, {summary['cpu_s']:.2f}s CPU, "
+            f"{summary['requests']} API requests, {summary['retries']} retries, "
+            f"{summary['backoff_s']:.2f}s in back-off",
+            f"{'endpoint':<40} {'reqs':>5} {'tries':>5} {'pages':>5} {'p50 ms':>8} {'p90 ms':>8} "
+            f"{'p99 ms':>8} {'max ms':>8} {'KiB in':>8} {'backoff s':>9}",
+        ]
+        for name, stats in summary["endpoints"].items():
+            latency = stats["latency_ms"]
+            lines.append(
+                f"{name:<40} {stats['requests']:>5} {stats['attempts']:>5} {stats['pages']:>5} "
+                f"{latency['p50']:>8.1f} {latency['p90']:>8.1f} {latency['p99']:>8.1f} {latency['p100']:>8.1f} "
+                f"{stats['bytes_received'] / 1024:>8.1f} {stats['backoff_s']:>9.2f}"
+            )
+        for name, section in summary["sections"].items():
+            lines.append(f"CPU in {name}: {section['cpu_s']:.3f}s ({section['calls']} calls)")
+        limit = summary.get("rate_limit")
+        if limit:
+            lines.append(
+                f"Rate limit: {limit['waited_s']:.2f}s waited by {limit['requests']} attempts "
+                f"(max {limit['max_wait_s']:.2f}s), up to {limit['max_queued']} queued, {limit['throttled']} throttled"
+            )
+        return "\n".join(lines)
+
+    def report(self) -> None:
+        """Print the summary to stderr."""
+        summary = self.summary()
+        if self.output_format == "json":
+            print(json.dumps(summary, indent=2), file=sys.stderr)
+        else:
+            print(self.format_text(summary), file=sys.stderr)
+
+
+def profile_section(session: Any, name: str) -> ContextManager[None]:
+    """Measure the CPU time of a block if the session is being profiled.
+
+    Args:
+        session: PagerDuty API session
+        name: Section name shown in the summary
+
+    Returns:
+        Context manager measuring the block, or doing nothing without a profiler
+    """
+    profiler = getattr(session, "profiler", None)
+    return profiler.section(name) if profiler is not None else nullcontext()
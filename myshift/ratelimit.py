@@ -0,0 +1,222 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Client-side rate limiting of PagerDuty API requests.
+
+PagerDuty limits REST API requests per token. Rather than letting every
+thread hit the limit and back off blindly, the session holds one token bucket
+(see get_pd_session and the 'rate_limit' section of the configuration):
+- Every HTTP attempt, from any thread or asyncio task, takes a token first
+- Waiting requests are served in priority order: interactive requests before
+  background refreshes, and first come, first served within a priority
+- A 429 response pauses the whole bucket for the Retry-After the server
+  asked for, after which the request is retried
+- Queue depth and waiting times are recorded, and shown by --profile
+
+Requests are interactive unless made inside background().
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Request priorities, served lowest first
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# Defaults for the 'rate_limit' section of the configuration; PagerDuty allows
+# 960 REST API requests per minute for a user token
+DEFAULT_RATE = 15.0
+DEFAULT_BURST = 15
+
+# 429 responses retried by the session itself, honoring Retry-After, before
+# handing the response to the PagerDuty client's own back-off
+MAX_THROTTLED_RETRIES = 8
+
+# Pause after a 429 without a usable Retry-After, doubled for every further one
+DEFAULT_PAUSE = 1.0
+MAX_PAUSE = 30.0
+
+_priority: ContextVar[int] = ContextVar("myshift_request_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def background() -> Iterator[None]:
+    """Make the requests of a block (on the current thread or task) background requests."""
+    token = _priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    """Get the priority of requests made from the current thread or task."""
+    return _priority.get()
+
+
+def retry_after(response: Any) -> Optional[float]:
+    """Get the seconds a response asks to wait before retrying.
+
+    Args:
+        response: HTTP response
+
+    Returns:
+        Seconds from the Retry-After header (in seconds or as an HTTP date),
+        or None if it is missing or invalid
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """Token bucket shared by every thread using a session."""
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        """Initialize a full bucket.
+
+        Args:
+            rate: Requests per second the bucket refills with (0 or less only applies 429 pauses)
+            burst: Requests that can be made at once after a quiet period
+        """
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._queue: List[Tuple[int, int]] = []
+        self._tickets = itertools.count()
+        self._condition = threading.Condition()
+
+        self.requests = 0
+        self.throttled = 0
+        self.waited = 0.0
+        self.max_wait = 0.0
+        self.max_queued = 0
+
+    def _refill(self, now: float) -> None:
+        if self.rate > 0:
+            self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.rate)
+        else:
+            self._tokens = float(self.burst)
+        self._updated = now
+
+    def acquire(self, priority: Optional[int] = None) -> float:
+        """Block until a request may be made.
+
+        Args:
+            priority: Request priority (defaults to current_priority())
+
+        Returns:
+            Seconds spent waiting
+        """
+        ticket = (current_priority() if priority is None else priority, next(self._tickets))
+        started = time.monotonic()
+        with self._condition:
+            heapq.heappush(self._queue, ticket)
+            self.max_queued = max(self.max_queued, len(self._queue))
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._queue[0] != ticket:
+                        # Only the first request in line waits on the clock
+                        self._condition.wait()
+                    elif now < self._paused_until:
+                        self._condition.wait(self._paused_until - now)
+                    elif self._tokens < 1:
+                        self._condition.wait((1 - self._tokens) / self.rate)
+                    else:
+                        self._tokens -= 1
+                        break
+            finally:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._condition.notify_all()
+
+            waited = time.monotonic() - started
+            self.requests += 1
+            self.waited += waited
+            self.max_wait = max(self.max_wait, waited)
+        return waited
+
+    def pause(self, seconds: float) -> None:
+        """Hold every request for a while, e.g. after a 429 response.
+
+        Args:
+            seconds: Seconds from now before the next request may be made
+        """
+        with self._condition:
+            self.throttled += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the current queue depth and the waiting statistics so far."""
+        with self._condition:
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "queued": len(self._queue),
+                "max_queued": self.max_queued,
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "waited_s": round(self.waited, 3),
+                "max_wait_s": round(self.max_wait, 3),
+            }
+
+
+def get_rate_limit_settings(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Get the 'rate_limit' section of the configuration.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        Rate limit settings dictionary (possibly empty)
+    """
+    settings = config.get("rate_limit")
+    return settings if isinstance(settings, dict) else {}
+
+
+def open_rate_limiter(config: Dict[str, Any]) -> Optional[RateLimiter]:
+    """Create the rate limiter described by the 'rate_limit' section of the configuration.
+
+    Rate limiting is enabled by default. Set 'rate_limit: false' to send
+    requests as fast as they are made.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        RateLimiter, or None if rate limiting is disabled
+    """
+    if config.get("rate_limit") is False:
+        return None
+    settings = get_rate_limit_settings(config)
+    return RateLimiter(float(settings.get("rate", DEFAULT_RATE)), int(settings.get("burst", DEFAULT_BURST)))
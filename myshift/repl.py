@@ -1,17 +1,29 @@
-"""Interactive REPL for MyShift commands."""
+"""Interactive REPL for MyShift commands.
+
+The REPL keeps a timeline of the schedule and the users on call for the whole
+session, so repeated queries are answered from memory. Optionally, a
+background thread refreshes the near-term part of the timeline while the
+prompt is idle.
+"""
 
 import cmd
 import sys
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Optional
 
 from dateutil import tz
 from pagerduty import RestApiV2Client
 
-from myshift.next import next_shift
+from myshift.lookup import parse_time, print_on_call_at, print_shifts_between
+from myshift.next import print_next_shift, print_next_shifts
 from myshift.override import create_override
-from myshift.plan import plan_shifts
-from myshift.util import get_user_id_by_email
+from myshift.plan import print_plan
+from myshift.ratelimit import background
+from myshift.timeline import Timeline
+
+# Look-ahead of the 'next' command, as for 'myshift next'
+NEXT_DAYS = 90
 
 
 class MyShiftShell(cmd.Cmd):
@@ -20,28 +32,83 @@ class MyShiftShell(cmd.Cmd):
     intro = "Welcome to MyShift REPL. Type help or ? to list commands.\n"
     prompt = "(myshift) "
 
-    def __init__(self, session: RestApiV2Client, schedule_id: str):
+    def __init__(self, session: RestApiV2Client, schedule_id: str, refresh_interval: int = 0):
         """Initialize the shell.
 
         Args:
             session: PagerDuty API session
             schedule_id: PagerDuty schedule ID
+            refresh_interval: Seconds between background refreshes of the
+                near-term shifts while the prompt is idle (0 disables them)
         """
         super().__init__()
         self.session = session
         self.schedule_id = schedule_id
+        self.timeline = Timeline(session, schedule_id)
+        self.refresh_interval = refresh_interval
+        self._idle = threading.Event()
+        self._stop = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+
+    def _refresh_loop(self) -> None:
+        """Refresh the near-term shifts periodically, skipping rounds while a command runs."""
+        while not self._stop.wait(self.refresh_interval):
+            if not self._idle.is_set():
+                continue
+            try:
+                with background():
+                    self.timeline.refresh_near_term()
+            except (Exception, SystemExit):
+                # Errors surface on the next command that needs the API
+                pass
+
+    def preloop(self) -> None:
+        if self.refresh_interval > 0:
+            self._refresher = threading.Thread(target=self._refresh_loop, name="myshift-refresh", daemon=True)
+            self._refresher.start()
+        self._idle.set()
+
+    def postloop(self) -> None:
+        self._stop.set()
+
+    def precmd(self, line: str) -> str:
+        self._idle.clear()
+        return line
+
+    def onecmd(self, line: str) -> bool:
+        try:
+            return super().onecmd(line)
+        except SystemExit:
+            # Helpers exit after reporting their errors; that shouldn't end the session
+            return False
+
+    def postcmd(self, stop: bool, line: str) -> bool:
+        self._idle.set()
+        return stop
 
     def do_next(self, arg: str) -> None:
-        """Show the next on-call shift.
+        """Show the next on-call shift of one user, or of several (one line each).
 
-        Usage: next [email]
+        Usage: next email[,email...]
         """
-        if not arg:
+        emails = [email for email in arg.replace(",", " ").split() if email]
+        if not emails:
             print("Email address is required", file=sys.stderr)
             return
 
         try:
-            next_shift(self.session, self.schedule_id, arg)
+            now = datetime.now(tz.tzlocal())
+            if len(emails) == 1:
+                user_id = self.timeline.user_id(emails[0])
+                index, _ = self.timeline.get(now, now + timedelta(days=NEXT_DAYS))
+                print_next_shift(index, user_id, now)
+            else:
+                user_ids = self.timeline.user_ids(emails)
+                index, _ = self.timeline.get(now, now + timedelta(days=NEXT_DAYS))
+                print_next_shifts(index, user_ids, emails, now)
+        except SystemExit:
+            # The error has already been reported; keep the REPL running
+            pass
         except Exception as e:
             print(f"Error showing next shift: {e}", file=sys.stderr)
 
@@ -57,10 +124,61 @@ class MyShiftShell(cmd.Cmd):
             return
 
         try:
-            plan_shifts(self.session, self.schedule_id, days)
+            now = datetime.now(tz.tzlocal())
+            until = now + timedelta(days=days)
+            index, user_map = self.timeline.get(now, until)
+            print_plan(index.between(now, until), user_map, days)
+        except SystemExit:
+            pass
         except Exception as e:
             print(f"Error showing planned shifts: {e}", file=sys.stderr)
 
+    def do_at(self, arg: str) -> None:
+        """Show who is on call at a point in time.
+
+        Usage: at <time>
+        Example: at 2024-03-26 03:00
+        """
+        try:
+            when = parse_time(arg)
+        except (ValueError, OverflowError):
+            print("Usage: at <time>", file=sys.stderr)
+            return
+
+        try:
+            index, user_map = self.timeline.get(when, when + timedelta(seconds=1))
+            print_on_call_at(index, user_map, when)
+        except SystemExit:
+            pass
+        except Exception as e:
+            print(f"Error looking up shifts: {e}", file=sys.stderr)
+
+    def do_between(self, arg: str) -> None:
+        """Show the shifts overlapping a time range.
+
+        Usage: between <start> <end>
+        Example: between 2024-03-20 2024-03-27
+        """
+        try:
+            parts = arg.split()
+            if len(parts) != 2:
+                raise ValueError
+            since = parse_time(parts[0])
+            until = parse_time(parts[1])
+            if until <= since:
+                raise ValueError
+        except (ValueError, OverflowError):
+            print("Usage: between <start> <end>", file=sys.stderr)
+            return
+
+        try:
+            index, user_map = self.timeline.get(since, until)
+            print_shifts_between(index, user_map, since, until)
+        except SystemExit:
+            pass
+        except Exception as e:
+            print(f"Error looking up shifts: {e}", file=sys.stderr)
+
     def do_override(self, arg: str) -> None:
         """Create an override for a shift.
 
@@ -90,7 +208,10 @@ class MyShiftShell(cmd.Cmd):
                 target_user_email=target_email,
                 start_str=start,
                 end_str=end,
+                on_change=self.timeline.invalidate,
             )
+        except SystemExit:
+            pass
         except Exception as e:
             print(f"Error creating override: {e}", file=sys.stderr)
 
@@ -105,18 +226,20 @@ class MyShiftShell(cmd.Cmd):
         return self.do_quit(arg)
 
 
-def start_repl(session: RestApiV2Client, schedule_id: str) -> None:
+def start_repl(session: RestApiV2Client, schedule_id: str, refresh_interval: int = 0) -> None:
     """Start the interactive REPL.
 
     Args:
         session: PagerDuty API session
         schedule_id: PagerDuty schedule ID
+        refresh_interval: Seconds between background refreshes of the
+            near-term shifts while the prompt is idle (0 disables them)
 
     Raises:
         SystemExit: If the REPL encounters an unrecoverable error
     """
     try:
-        shell = MyShiftShell(session, schedule_id)
+        shell = MyShiftShell(session, schedule_id, refresh_interval)
         shell.cmdloop()
     except Exception as e:
         print(f"Error starting REPL: {e}", file=sys.stderr)
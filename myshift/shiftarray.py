@@ -0,0 +1,262 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compact columnar storage of on-call shifts.
+
+A ShiftArray keeps shifts as three parallel columns instead of tuples of
+datetime objects:
+- Start and end times as epoch seconds, in array('q')
+- Users as indices into a table of interned user IDs, in array('i')
+
+That is 20 bytes per shift instead of a few hundred, and deduplicating and
+sorting run on integers. Datetimes are only created when shifts are read,
+typically for display, and each distinct time is converted once.
+
+NumPy is used for deduplicating and sorting large arrays when it is installed
+(pip install myshift[numpy]); otherwise the columns are packed into Python
+integers. It is only imported on first use, to keep CLI startup fast.
+"""
+
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from myshift.timestamps import parse_utc
+
+# Below this many shifts, the overhead of converting to NumPy isn't worth it
+NUMPY_THRESHOLD = 10000
+
+Shift = Tuple[datetime, datetime, str]
+EpochShift = Tuple[int, int, str]
+
+_numpy: Any = None
+
+
+def get_numpy() -> Any:
+    """Import NumPy on first use.
+
+    Returns:
+        The numpy module, or None if it is not installed
+    """
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+class ShiftArray:
+    """Columns of (start, end, user) shifts, with times in epoch seconds."""
+
+    def __init__(self) -> None:
+        """Initialize an empty array."""
+        self.starts = array("q")
+        self.ends = array("q")
+        self.users = array("i")
+        self.user_ids: List[str] = []
+        self._user_index: Dict[str, int] = {}
+        self._epochs: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _intern(self, user_id: str) -> int:
+        """Get the index of a user ID, adding it to the table if needed."""
+        index = self._user_index.get(user_id)
+        if index is None:
+            index = self._user_index[user_id] = len(self.user_ids)
+            self.user_ids.append(user_id)
+        return index
+
+    def _epoch(self, value: str) -> int:
+        """Decode a PagerDuty timestamp to epoch seconds, memoized."""
+        epoch = self._epochs.get(value)
+        if epoch is None:
+            epoch = self._epochs[value] = int(parse_utc(value).timestamp())
+        return epoch
+
+    def append(self, start: int, end: int, user_id: str) -> None:
+        """Add a shift.
+
+        Args:
+            start: Start time in epoch seconds
+            end: End time in epoch seconds
+            user_id: PagerDuty user ID
+        """
+        self.starts.append(start)
+        self.ends.append(end)
+        self.users.append(self._intern(user_id))
+
+    def extend_records(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Add the shifts of /oncalls records.
+
+        Args:
+            records: /oncalls records, with 'start', 'end' and 'user'
+        """
+        epochs, user_index = self._epochs, self._user_index
+        starts, ends, users = self.starts, self.ends, self.users
+        # Memo hits are the common case, so look them up inline rather than through method calls
+        for record in records:
+            start, end, user_id = record["start"], record["end"], record["user"]["id"]
+            try:
+                starts.append(epochs[start])
+            except KeyError:
+                starts.append(self._epoch(start))
+            try:
+                ends.append(epochs[end])
+            except KeyError:
+                ends.append(self._epoch(end))
+            try:
+                users.append(user_index[user_id])
+            except KeyError:
+                users.append(self._intern(user_id))
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "ShiftArray":
+        """Create an array from /oncalls records.
+
+        Args:
+            records: /oncalls records, with 'start', 'end' and 'user'
+
+        Returns:
+            New ShiftArray, in record order
+        """
+        shifts = cls()
+        shifts.extend_records(records)
+        return shifts
+
+    @classmethod
+    def concat(cls, arrays: Iterable["ShiftArray"]) -> "ShiftArray":
+        """Create an array holding the shifts of several arrays, one after the other.
+
+        Args:
+            arrays: ShiftArrays, each with its own user table
+
+        Returns:
+            New ShiftArray with one user table for all shifts
+        """
+        shifts = cls()
+        for other in arrays:
+            shifts.starts.extend(other.starts)
+            shifts.ends.extend(other.ends)
+            table = array("i", (shifts._intern(user_id) for user_id in other.user_ids))
+            shifts.users.extend(table[user] for user in other.users)
+        return shifts
+
+    def _ranks(self) -> Tuple[List[int], List[int]]:
+        """Rank the interned users in sorted user ID order.
+
+        Returns:
+            Tuple of (rank of each user index, user index of each rank)
+        """
+        by_rank = sorted(range(len(self.user_ids)), key=self.user_ids.__getitem__)
+        ranks = [0] * len(by_rank)
+        for rank, index in enumerate(by_rank):
+            ranks[index] = rank
+        return ranks, by_rank
+
+    def _take(self, starts: Iterable[int], ends: Iterable[int], users: Iterable[int]) -> "ShiftArray":
+        """Create an array sharing this one's user table, from new columns."""
+        shifts = ShiftArray()
+        shifts.starts.extend(starts)
+        shifts.ends.extend(ends)
+        shifts.users.extend(users)
+        shifts.user_ids = self.user_ids
+        shifts._user_index = self._user_index
+        return shifts
+
+    def unique(self) -> "ShiftArray":
+        """Get the distinct shifts, sorted by start time, end time and user ID.
+
+        Returns:
+            New ShiftArray sharing this one's user table
+        """
+        if not self.starts:
+            return self._take((), (), ())
+        np = get_numpy() if len(self) >= NUMPY_THRESHOLD else None
+        if np is not None:
+            return self._unique_numpy(np)
+
+        ranks, by_rank = self._ranks()
+        if min(self.starts) < 0 or min(self.ends) < 0:
+            keys = sorted(set(zip(self.starts, self.ends, (ranks[user] for user in self.users))))
+            return self._take((k[0] for k in keys), (k[1] for k in keys), (by_rank[k[2]] for k in keys))
+
+        # Pack each shift into one integer that sorts like (start, end, user ID)
+        rank_bits = max(1, len(ranks).bit_length())
+        end_bits = max(1, max(self.ends).bit_length())
+        start_shift = end_bits + rank_bits
+        keys = sorted(
+            {
+                (start << start_shift) | (end << rank_bits) | ranks[user]
+                for start, end, user in zip(self.starts, self.ends, self.users)
+            }
+        )
+        end_mask = (1 << end_bits) - 1
+        rank_mask = (1 << rank_bits) - 1
+        return self._take(
+            (key >> start_shift for key in keys),
+            ((key >> rank_bits) & end_mask for key in keys),
+            (by_rank[key & rank_mask] for key in keys),
+        )
+
+    def _unique_numpy(self, np: Any) -> "ShiftArray":
+        """NumPy implementation of unique()."""
+        ranks, by_rank = self._ranks()
+        starts = np.frombuffer(self.starts, dtype=np.int64)
+        ends = np.frombuffer(self.ends, dtype=np.int64)
+        users = np.asarray(ranks, dtype=np.int32)[np.frombuffer(self.users, dtype=np.int32)]
+        order = np.lexsort((users, ends, starts))
+        starts, ends, users = starts[order], ends[order], users[order]
+        keep = np.ones(len(order), dtype=bool)
+        keep[1:] = (starts[1:] != starts[:-1]) | (ends[1:] != ends[:-1]) | (users[1:] != users[:-1])
+
+        shifts = self._take((), (), ())
+        shifts.starts.frombytes(starts[keep].tobytes())
+        shifts.ends.frombytes(ends[keep].tobytes())
+        shifts.users.frombytes(np.asarray(by_rank, dtype=np.int32)[users[keep]].tobytes())
+        return shifts
+
+    def iter_epochs(self) -> Iterator[EpochShift]:
+        """Iterate over the shifts with times in epoch seconds.
+
+        Yields:
+            (start, end, user_id) tuples
+        """
+        user_ids = self.user_ids
+        for start, end, user in zip(self.starts, self.ends, self.users):
+            yield start, end, user_ids[user]
+
+    def to_shifts(self, target_tz: Optional[datetime.tzinfo] = None) -> List[Shift]:
+        """Materialize the shifts with timezone-aware datetimes.
+
+        Args:
+            target_tz: Timezone to convert times to (defaults to UTC)
+
+        Returns:
+            List of (start_time, end_time, user_id) tuples, in array order
+        """
+        target_tz = target_tz or timezone.utc
+        # Shift boundaries repeat, so convert each distinct time once
+        times = {
+            epoch: datetime.fromtimestamp(epoch, timezone.utc).astimezone(target_tz)
+            for epoch in set(self.starts).union(self.ends)
+        }
+        user_ids = self.user_ids
+        return [
+            (times[start], times[end], user_ids[user]) for start, end, user in zip(self.starts, self.ends, self.users)
+        ]
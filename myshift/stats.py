@@ -0,0 +1,418 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""On-call load statistics for PagerDuty schedules.
+
+This module provides functionality to compare how much on-call time each user
+carries over a period, across one or more schedules:
+- Total on-call hours
+- Night hours (22:00 to 06:00 local time by default)
+- Weekend hours (Saturday and Sunday, local time)
+- Longest uninterrupted stretch on call
+
+A user's shifts are merged before measuring, so time covered by several
+schedules or escalation levels at once is only counted once.
+
+The arithmetic runs on the epoch-second columns of ShiftArray. With NumPy
+installed (pip install myshift[numpy]) every step is a vectorized operation
+over all shifts at once; otherwise the same formulas are applied shift by
+shift.
+"""
+
+import bisect
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypedDict
+
+from dateutil import tz
+from pagerduty import RestApiV2Client
+
+from myshift.defaults import DEFAULT_NIGHT_END, DEFAULT_NIGHT_START, DEFAULT_SCHEDULE_WORKERS
+from myshift.shiftarray import ShiftArray, get_numpy
+from myshift.util import UserObject, build_user_map_for_ids, get_shift_array
+
+DAY = 24 * 60 * 60
+WEEK = 7 * DAY
+
+# The epoch began on a Thursday; shifting by three days puts weeks on Mondays
+_MONDAY_SHIFT = 3 * DAY
+_WEEKEND_START = 5 * DAY
+_WEEKEND_LENGTH = 2 * DAY
+
+
+class UserLoad(TypedDict):
+    """On-call load of one user over a period."""
+
+    hours: float
+    night_hours: float
+    weekend_hours: float
+    longest_hours: float
+    shifts: int
+
+
+def parse_quarter(value: str, target_tz: Optional[datetime.tzinfo] = None) -> Tuple[datetime, datetime]:
+    """Get the time range of a calendar quarter.
+
+    Args:
+        value: Quarter, e.g. "2025Q3" or "2025-q3"
+        target_tz: Timezone of the quarter boundaries (defaults to local time)
+
+    Returns:
+        Tuple of (start, end) datetimes
+
+    Raises:
+        ValueError: If the value is not a quarter
+    """
+    year, _, quarter = value.upper().replace("-", "").partition("Q")
+    if not year.isdigit() or quarter not in ("1", "2", "3", "4"):
+        raise ValueError(f"'{value}' is not a quarter like 2025Q3")
+    target_tz = target_tz or tz.tzlocal()
+    start = datetime(int(year), 3 * int(quarter) - 2, 1, tzinfo=target_tz)
+    end = datetime(int(year) + 1, 1, 1, tzinfo=target_tz) if quarter == "4" else start.replace(month=start.month + 3)
+    return start, end
+
+
+def current_quarter(now: Optional[datetime] = None) -> str:
+    """Get the calendar quarter containing a point in time, e.g. "2025Q3"."""
+    now = now or datetime.now(tz.tzlocal())
+    return f"{now.year}Q{(now.month - 1) // 3 + 1}"
+
+
+def _window_seconds(wall: Any, start: int, length: int, period: int, clip: Callable[[Any, int, int], Any]) -> Any:
+    """Count the seconds of repeating windows before some wall-clock times.
+
+    The windows are [k * period + start, k * period + start + length) for
+    every k; a window may run past the end of its period (e.g. nights from
+    22:00 to 06:00). Only differences between results are meaningful.
+
+    Args:
+        wall: Wall-clock time(s), in seconds since the epoch as if local time were UTC
+        start: Start of the window within each period, in seconds
+        length: Length of the window, in seconds (at most one period)
+        period: Length of the period, in seconds
+        clip: Function clipping a value (or array) between two bounds
+
+    Returns:
+        Seconds of window time before each wall-clock time
+    """
+    index, offset = wall // period, wall % period
+    # Every window before the previous period is complete; the previous and current ones may be partial
+    return (index - 1) * length + clip(offset + period - start, 0, length) + clip(offset - start, 0, length)
+
+
+class _LocalClock:
+    """Local time of a timezone around some instants, for counting local windows.
+
+    Windows are counted on the wall clock, and corrected at the timezone's
+    transitions: the hour skipped when clocks go forward isn't counted, and
+    the hour repeated when they go back is counted twice.
+    """
+
+    # Offsets never change twice within this many hours, so probing this often finds every transition
+    PROBE_HOURS = 28 * 24
+
+    def __init__(self, epochs: Iterable[int], target_tz: datetime.tzinfo):
+        """Find the UTC offsets and transitions of a timezone around some instants.
+
+        Args:
+            epochs: Instants in epoch seconds
+            target_tz: Timezone
+        """
+
+        def offset(hour: int) -> int:
+            return int(datetime.fromtimestamp(hour * 3600, target_tz).utcoffset().total_seconds())
+
+        # Offsets change on the hour, and shift boundaries share few distinct hours
+        hours = sorted({epoch // 3600 for epoch in epochs})
+        if hours:
+            hours = sorted(set(hours).union(range(hours[0], hours[-1], self.PROBE_HOURS)))
+        self.hours = hours
+        self.offsets = [offset(hour) for hour in hours]
+
+        # (epoch, offset before, offset after) of each transition, by bisecting probes that differ
+        self.transitions: List[Tuple[int, int, int]] = []
+        for low, high, before, after in zip(hours, hours[1:], self.offsets, self.offsets[1:]):
+            if before != after:
+                while high - low > 1:
+                    middle = (low + high) // 2
+                    low, high = (middle, high) if offset(middle) == before else (low, middle)
+                self.transitions.append((high * 3600, before, after))
+
+    def window_seconds(self, epochs: Any, start: int, length: int, period: int, shift: int = 0, np: Any = None) -> Any:
+        """Count the seconds of repeating local windows before some instants.
+
+        Only differences between results are meaningful (see _window_seconds).
+
+        Args:
+            epochs: One instant in epoch seconds, or a NumPy array of them (all seen by __init__)
+            start: Start of the window within each period, in seconds
+            length: Length of the window, in seconds
+            period: Length of the period, in seconds
+            shift: Seconds added to local times to align periods (e.g. weeks on Mondays)
+            np: The numpy module, if epochs is an array
+
+        Returns:
+            Seconds of window time before each instant
+        """
+        clip = np.clip if np is not None else _clip
+        corrections = [0]
+        for epoch, before, after in self.transitions:
+            skipped = _window_seconds(epoch + after + shift, start, length, period, _clip) - _window_seconds(
+                epoch + before + shift, start, length, period, _clip
+            )
+            corrections.append(corrections[-1] + skipped)
+
+        if np is None:
+            offset = self.offsets[bisect.bisect_left(self.hours, epochs // 3600)]
+            passed = bisect.bisect_right([transition[0] for transition in self.transitions], epochs)
+            return _window_seconds(epochs + offset + shift, start, length, period, clip) - corrections[passed]
+
+        offsets = np.asarray(self.offsets, dtype=np.int64)[np.searchsorted(self.hours, epochs // 3600)]
+        passed = np.searchsorted([transition[0] for transition in self.transitions], epochs, side="right")
+        wall = epochs + offsets + shift
+        return _window_seconds(wall, start, length, period, clip) - np.asarray(corrections, dtype=np.int64)[passed]
+
+
+def _clip(value: int, low: int, high: int) -> int:
+    return min(max(value, low), high)
+
+
+def _merge_numpy(np: Any, starts: Any, ends: Any, users: Any, since: int, until: int) -> Tuple[Any, Any, Any]:
+    """Merge each user's overlapping or adjacent intervals, with NumPy.
+
+    Returns:
+        Tuple of (starts, ends, users) arrays of the merged intervals
+    """
+    order = np.lexsort((starts, users))
+    starts, ends, users = starts[order], ends[order], users[order]
+    # Lay each user's intervals out on their own stretch of one number line,
+    # so that a single running maximum finds every user's overlaps at once
+    base = users.astype(np.int64) * (until - since + 1) - since
+    keyed_starts, keyed_ends = starts + base, ends + base
+    reach = np.maximum.accumulate(keyed_ends)
+    first = np.ones(len(starts), dtype=bool)
+    first[1:] = keyed_starts[1:] > reach[:-1]
+    bounds = np.flatnonzero(first)
+    return starts[bounds], np.maximum.reduceat(keyed_ends, bounds) - base[bounds], users[bounds]
+
+
+def _load_numpy(np: Any, shifts: ShiftArray, since: int, until: int, night: Tuple[int, int], target_tz: Any) -> Any:
+    """NumPy implementation of compute_load(), returning per-user-index columns."""
+    starts = np.clip(np.frombuffer(shifts.starts, dtype=np.int64), since, until)
+    ends = np.clip(np.frombuffer(shifts.ends, dtype=np.int64), since, until)
+    users = np.frombuffer(shifts.users, dtype=np.int32)
+    keep = ends > starts
+    starts, ends, users = starts[keep], ends[keep], users[keep]
+    count = len(shifts.user_ids)
+
+    counts = np.bincount(users, minlength=count)
+    starts, ends, users = _merge_numpy(np, starts, ends, users, since, until)
+    durations = ends - starts
+    total = np.bincount(users, weights=durations, minlength=count)
+    longest = np.zeros(count, dtype=np.int64)
+    np.maximum.at(longest, users, durations)
+
+    # Night and weekend windows are in local time
+    clock = _LocalClock(np.unique(np.concatenate((starts, ends)) // 3600 * 3600).tolist(), target_tz)
+    night_start, night_length = night
+    nights = clock.window_seconds(ends, night_start, night_length, DAY, np=np) - clock.window_seconds(
+        starts, night_start, night_length, DAY, np=np
+    )
+    weekends = clock.window_seconds(
+        ends, _WEEKEND_START, _WEEKEND_LENGTH, WEEK, _MONDAY_SHIFT, np=np
+    ) - clock.window_seconds(starts, _WEEKEND_START, _WEEKEND_LENGTH, WEEK, _MONDAY_SHIFT, np=np)
+
+    return (
+        total,
+        np.bincount(users, weights=nights, minlength=count),
+        np.bincount(users, weights=weekends, minlength=count),
+        longest,
+        counts,
+    )
+
+
+def _load_python(shifts: ShiftArray, since: int, until: int, night: Tuple[int, int], target_tz: Any) -> Any:
+    """Pure Python implementation of compute_load(), returning per-user-index columns."""
+    count = len(shifts.user_ids)
+    total, nights, weekends, longest, counts = [0] * count, [0] * count, [0] * count, [0] * count, [0] * count
+    intervals = sorted(
+        (user, max(start, since), min(end, until))
+        for start, end, user in zip(shifts.starts, shifts.ends, shifts.users)
+        if min(end, until) > max(start, since)
+    )
+    merged: List[List[int]] = []
+    for user, start, end in intervals:
+        counts[user] += 1
+        if merged and merged[-1][0] == user and start <= merged[-1][2]:
+            merged[-1][2] = max(merged[-1][2], end)
+        else:
+            merged.append([user, start, end])
+
+    clock = _LocalClock((epoch for _, start, end in merged for epoch in (start, end)), target_tz)
+    night_start, night_length = night
+    for user, start, end in merged:
+        total[user] += end - start
+        longest[user] = max(longest[user], end - start)
+        nights[user] += clock.window_seconds(end, night_start, night_length, DAY) - clock.window_seconds(
+            start, night_start, night_length, DAY
+        )
+        weekends[user] += clock.window_seconds(
+            end, _WEEKEND_START, _WEEKEND_LENGTH, WEEK, _MONDAY_SHIFT
+        ) - clock.window_seconds(start, _WEEKEND_START, _WEEKEND_LENGTH, WEEK, _MONDAY_SHIFT)
+    return total, nights, weekends, longest, counts
+
+
+def compute_load(
+    shifts: ShiftArray,
+    since: datetime,
+    until: datetime,
+    target_tz: Optional[datetime.tzinfo] = None,
+    night_start: int = DEFAULT_NIGHT_START,
+    night_end: int = DEFAULT_NIGHT_END,
+    use_numpy: Optional[bool] = None,
+) -> Dict[str, UserLoad]:
+    """Compute each user's on-call load over a period.
+
+    Shifts are clipped to the period, and each user's overlapping or adjacent
+    shifts are merged into stretches before measuring.
+
+    Args:
+        shifts: Shifts of one or more schedules
+        since: Start of the period
+        until: End of the period
+        target_tz: Timezone defining nights and weekends (defaults to local time)
+        night_start: Local hour at which night time starts
+        night_end: Local hour at which night time ends
+        use_numpy: Whether to use NumPy (defaults to using it if installed)
+
+    Returns:
+        Dictionary mapping user IDs to their load, for users with on-call time in the period
+    """
+    np = get_numpy() if use_numpy is not False else None
+    if use_numpy and np is None:
+        raise ImportError("NumPy is not installed")
+
+    start, end = int(since.timestamp()), int(until.timestamp())
+    night = (night_start % 24 * 3600, (night_end - night_start) % 24 * 3600)
+    target_tz = target_tz or tz.tzlocal()
+    if not len(shifts) or end <= start:
+        return {}
+    if np is not None:
+        columns = _load_numpy(np, shifts, start, end, night, target_tz)
+    else:
+        columns = _load_python(shifts, start, end, night, target_tz)
+
+    loads: Dict[str, UserLoad] = {}
+    for index, (total, nights, weekends, longest, count) in enumerate(zip(*columns)):
+        if count:
+            loads[shifts.user_ids[index]] = {
+                "hours": float(total) / 3600,
+                "night_hours": float(nights) / 3600,
+                "weekend_hours": float(weekends) / 3600,
+                "longest_hours": float(longest) / 3600,
+                "shifts": int(count),
+            }
+    return loads
+
+
+def print_stats(loads: Dict[str, UserLoad], user_map: Dict[str, UserObject]) -> None:
+    """Print on-call loads as a table, heaviest first.
+
+    Args:
+        loads: Dictionary mapping user IDs to their load
+        user_map: Dictionary mapping user IDs to user information
+    """
+    if not loads:
+        print("No shifts found")
+        return
+
+    names = {user_id: user_map.get(user_id, {"name": "Unknown"})["name"] for user_id in loads}
+    width = max(len("User"), *(len(name) for name in names.values()))
+    print(f"{'User':<{width}}  {'Hours':>8}  {'Night':>8}  {'Weekend':>8}  {'Longest':>8}  {'Shifts':>6}")
+    for user_id, load in sorted(loads.items(), key=lambda item: (-item[1]["hours"], names[item[0]])):
+        print(
+            f"{names[user_id]:<{width}}  {load['hours']:>8.1f}  {load['night_hours']:>8.1f}"
+            f"  {load['weekend_hours']:>8.1f}  {load['longest_hours']:>8.1f}  {load['shifts']:>6}"
+        )
+
+
+def load_stats(
+    session: RestApiV2Client,
+    schedules: Dict[str, str],
+    since: datetime,
+    until: datetime,
+    workers: int = DEFAULT_SCHEDULE_WORKERS,
+    night_start: int = DEFAULT_NIGHT_START,
+    night_end: int = DEFAULT_NIGHT_END,
+) -> None:
+    """Show each user's on-call load over a period, across several schedules.
+
+    Args:
+        session: PagerDuty API session
+        schedules: Dictionary mapping schedule IDs to display labels
+        since: Start of the period
+        until: End of the period
+        workers: Maximum number of schedules fetched at the same time
+        night_start: Local hour at which night time starts
+        night_end: Local hour at which night time ends
+
+    Raises:
+        SystemExit: If API calls fail
+    """
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(schedules)))) as executor:
+            results = list(
+                executor.map(
+                    lambda schedule_id: get_shift_array(session, schedule_id, until, since=since, quiet=True),
+                    schedules,
+                )
+            )
+
+        shifts = ShiftArray.concat(results)
+        loads = compute_load(shifts, since, until, night_start=night_start, night_end=night_end)
+        user_map = build_user_map_for_ids(session, loads)
+
+        label = "1 schedule" if len(schedules) == 1 else f"{len(schedules)} schedules"
+        print(f"On-call load from {since.strftime('%Y-%m-%d')} to {until.strftime('%Y-%m-%d')} across {label}:")
+        print_stats(loads, user_map)
+    except Exception as e:
+        print(f"Error computing on-call load: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def stats_period(quarter: Optional[str], since: Optional[str], until: Optional[str]) -> Tuple[datetime, datetime]:
+    """Resolve the period of the stats command from its arguments.
+
+    Args:
+        quarter: Optional quarter, e.g. "2025Q3"
+        since: Optional start date/time, overriding the quarter's start
+        until: Optional end date/time, overriding the quarter's end
+
+    Returns:
+        Tuple of (start, end) datetimes; the current quarter unless given
+
+    Raises:
+        ValueError: If an argument cannot be parsed
+    """
+    from myshift.lookup import parse_time
+
+    start, end = parse_quarter(quarter or current_quarter())
+    if since:
+        start = parse_time(since)
+    if until:
+        end = parse_time(until)
+    elif since and not quarter:
+        end = start + timedelta(days=91)
+    return start, end
@@ -0,0 +1,186 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Streaming retrieval of on-call shifts.
+
+Instead of loading every /oncalls record, deduplicating and sorting them all
+before anything is shown, this module yields unique shifts while the pages are
+still arriving:
+- Pages are parsed as they are received from the API
+- Records pass through a bounded reorder buffer, which yields them in
+  chronological order and drops duplicates
+- At the end of every page, the shifts starting before the page's latest
+  start are yielded, so output starts after a single page round trip
+- Memory use depends on the buffer size, not on the length of the time window
+
+/oncalls records arrive roughly in time order. As long as no record arrives
+behind the shifts already yielded, the output is identical to
+get_all_unique_shifts. A record arriving later than that is dropped, so the
+output stays in order and can be merged with other streams: /oncalls repeats a
+schedule's shifts once per escalation level and policy, so such records are
+repeats of shifts already yielded.
+"""
+
+import heapq
+import sys
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from dateutil import tz
+from pagerduty import HttpError, RestApiV2Client
+
+from myshift.aio import ITERATION_LIMIT
+from myshift.timestamps import TimestampDecoder
+
+# Maximum number of unique records held back to restore chronological order
+DEFAULT_WINDOW = 1000
+
+ShiftKey = Tuple[datetime, datetime, str]
+
+
+def dedupe_window(pages: Iterable[Iterable[ShiftKey]], window: int = DEFAULT_WINDOW) -> Iterator[ShiftKey]:
+    """Deduplicate and sort a roughly time-ordered stream of shifts with bounded memory.
+
+    Shifts starting before the latest start of the page they arrive in are
+    yielded at the end of that page, as later pages continue from there. More
+    than the window of buffered shifts are yielded earliest first straight
+    away. Shifts arriving after a later shift was yielded are dropped.
+
+    Args:
+        pages: Pages of (start_time, end_time, user_id) tuples in roughly chronological order
+        window: Maximum number of unique shifts held back to restore chronological order
+
+    Yields:
+        Unique (start_time, end_time, user_id) tuples in chronological order
+    """
+    buffer: List[ShiftKey] = []
+    seen: Set[ShiftKey] = set()
+    emitted: Deque[ShiftKey] = deque()
+    watermark: Optional[datetime] = None
+
+    def release() -> ShiftKey:
+        nonlocal watermark
+        earliest = heapq.heappop(buffer)
+        watermark = earliest[0]
+        emitted.append(earliest)
+
+        # Shifts starting before the watermark are dropped on arrival,
+        # so they don't need to be remembered for deduplication either
+        while emitted and emitted[0][0] < watermark:
+            seen.discard(emitted.popleft())
+        return earliest
+
+    for page in pages:
+        latest: Optional[datetime] = None
+        for shift in page:
+            if latest is None or shift[0] > latest:
+                latest = shift[0]
+            if shift in seen or (watermark is not None and shift[0] < watermark):
+                # Already buffered or yielded, or too late to be put in order
+                continue
+
+            seen.add(shift)
+            heapq.heappush(buffer, shift)
+            if len(buffer) > window:
+                yield release()
+
+        while buffer and latest is not None and buffer[0][0] < latest:
+            yield release()
+
+    while buffer:
+        yield heapq.heappop(buffer)
+
+
+def iter_pages(session: RestApiV2Client, url: str, params: Dict[str, Any]) -> Iterator[List[Dict[str, Any]]]:
+    """Page through an index endpoint, yielding each page's records before requesting the next.
+
+    Args:
+        session: PagerDuty API session
+        url: Index endpoint URL
+        params: Query parameters, without limit and offset
+
+    Yields:
+        Lists of records, one per page
+    """
+    _, wrapper = session.entity_wrappers("GET", session.canonical_path(url))
+    limit = session.default_page_size
+    offset = 0
+    while True:
+        if offset + limit > ITERATION_LIMIT:
+            print(f"Warning: only the first {offset} results of {url} can be paged through", file=sys.stderr)
+            return
+
+        query = dict(params)
+        query.update({"limit": limit, "offset": offset, "total": "false"})
+        page = session.jget(url, params=query)
+        records = page[wrapper]
+        yield records
+        if not page.get("more") or not records:
+            return
+
+        # The server may cap the page size; step by what it actually returned
+        limit = len(records)
+        offset += limit
+
+
+def iter_unique_shifts(
+    session: RestApiV2Client,
+    schedule_id: str,
+    until: datetime,
+    target_tz: Optional[datetime.tzinfo] = None,
+    window: int = DEFAULT_WINDOW,
+) -> Iterator[ShiftKey]:
+    """Stream unique on-call shifts in a schedule with user information.
+
+    Pages are read one at a time straight from the API, so the first shifts
+    are yielded after a single page round trip.
+
+    Args:
+        session: PagerDuty API session
+        schedule_id: PagerDuty schedule ID
+        until: End datetime for the search range
+        target_tz: Optional timezone to convert times to
+        window: Maximum number of unique shifts held back to restore chronological order
+
+    Yields:
+        Tuples containing (start_time, end_time, user_id) in target timezone,
+        in chronological order
+
+    Raises:
+        SystemExit: If API calls fail
+    """
+    try:
+        now = datetime.now(timezone.utc)
+        target_tz = target_tz or tz.tzlocal()
+        params: Dict[str, Any] = {
+            "since": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "until": until.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "schedule_ids": [schedule_id],
+            "overflow": "true",
+        }
+        decode = TimestampDecoder(target_tz)
+
+        pages = (
+            [(decode(shift["start"]), decode(shift["end"]), shift["user"]["id"]) for shift in oncalls]
+            for oncalls in iter_pages(session, "/oncalls", params)
+        )
+        yield from dedupe_window(pages, window)
+
+    except HttpError as e:
+        print(f"PagerDuty API error fetching shifts: {e.response.status_code} - {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Unexpected error fetching shifts: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,212 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Session-scoped timeline of on-call shifts.
+
+A timeline keeps the shifts of one schedule over a time window in memory,
+together with the names of the users on call, so that an interactive session
+answers repeated queries without going back to the API:
+- The window grows to cover whatever is asked for, but is never shrunk
+- Invalidating a range (e.g. after creating overrides) re-fetches only that
+  range, the next time it is needed
+- The near-term part of the window, or all of it, can be refreshed from a
+  background thread
+"""
+
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from dateutil import tz
+from pagerduty import RestApiV2Client
+
+from myshift.intervals import Shift, ShiftIndex
+from myshift.util import (
+    UserObject,
+    build_user_map,
+    get_all_unique_shifts,
+    get_user_id_by_email,
+    get_user_ids_by_email,
+)
+
+# Minimum look-ahead loaded into the timeline, so nearby lookups reuse it
+DEFAULT_HORIZON_DAYS = 28
+
+# Extra time fetched whenever the window grows, so that queries relative to a
+# moving "now" don't trigger a fetch every time
+GROWTH = timedelta(days=1)
+
+# How far ahead a near-term refresh reaches
+NEAR_TERM = timedelta(days=1)
+
+Window = Tuple[datetime, datetime]
+
+
+class Timeline:
+    """In-memory shifts and user map of one schedule, kept for a session."""
+
+    def __init__(self, session: RestApiV2Client, schedule_id: str, horizon_days: int = DEFAULT_HORIZON_DAYS):
+        """Initialize an empty timeline.
+
+        Args:
+            session: PagerDuty API session
+            schedule_id: PagerDuty schedule ID
+            horizon_days: Minimum number of days ahead of now loaded on first use
+        """
+        self.session = session
+        self.schedule_id = schedule_id
+        self.horizon = timedelta(days=horizon_days)
+        self._index: Optional[ShiftIndex] = None
+        self._window: Optional[Window] = None
+        self._user_map: Dict[str, UserObject] = {}
+        self._user_ids: Dict[str, str] = {}
+        self._stale: List[Window] = []
+        self._generation = 0
+        self._lock = threading.RLock()
+
+    def _fetch(self, since: datetime, until: datetime) -> Tuple[List[Shift], Dict[str, UserObject]]:
+        """Fetch the shifts overlapping a range, and the users on call not known yet."""
+        shifts = get_all_unique_shifts(self.session, self.schedule_id, until, since=since, quiet=True)
+        unknown = [shift for shift in shifts if shift[2] not in self._user_map]
+        return shifts, build_user_map(self.session, unknown) if unknown else {}
+
+    def _splice(self, since: datetime, until: datetime, shifts: List[Shift], users: Dict[str, UserObject]) -> None:
+        """Replace the shifts overlapping a range with freshly fetched ones. Caller holds the lock."""
+        kept = [shift for shift in self._index if shift[1] <= since or shift[0] >= until]
+        self._index = ShiftIndex(set(kept) | set(shifts))
+        self._user_map.update(users)
+
+    def get(self, since: datetime, until: datetime) -> Tuple[ShiftIndex, Dict[str, UserObject]]:
+        """Get a shift index covering a time range, fetching only what is missing or stale.
+
+        Args:
+            since: Range start (timezone-aware)
+            until: Range end (timezone-aware)
+
+        Returns:
+            Tuple of (shift index, dictionary mapping user IDs to user information)
+
+        Raises:
+            SystemExit: If API calls fail
+        """
+        with self._lock:
+            if self._index is None or self._window is None:
+                now = datetime.now(tz.tzlocal())
+                window = (min(since, now), max(until + GROWTH, now + self.horizon))
+                shifts, users = self._fetch(*window)
+                self._index = ShiftIndex(shifts)
+                self._user_map.update(users)
+                self._window = window
+            elif since < self._window[0] or until > self._window[1]:
+                # Only fetch the edges the window grows by
+                window = (
+                    since - GROWTH if since < self._window[0] else self._window[0],
+                    until + GROWTH if until > self._window[1] else self._window[1],
+                )
+                for edge_since, edge_until in ((window[0], self._window[0]), (self._window[1], window[1])):
+                    if edge_since < edge_until:
+                        self._splice(edge_since, edge_until, *self._fetch(edge_since, edge_until))
+                self._window = window
+
+            for stale_since, stale_until in [(s, u) for s, u in self._stale if s < until and u > since]:
+                self._splice(stale_since, stale_until, *self._fetch(stale_since, stale_until))
+                self._stale.remove((stale_since, stale_until))
+
+            return self._index, self._user_map
+
+    def invalidate(self, since: datetime, until: datetime) -> None:
+        """Mark a range as stale, so it is fetched again the next time it is needed.
+
+        Args:
+            since: Range start (timezone-aware)
+            until: Range end (timezone-aware)
+        """
+        with self._lock:
+            self._generation += 1
+            if self._window is not None and since < self._window[1] and until > self._window[0]:
+                self._stale.append((max(since, self._window[0]), min(until, self._window[1])))
+
+    def refresh(self, since: Optional[datetime] = None, until: Optional[datetime] = None) -> bool:
+        """Re-fetch part of the timeline, if it has been loaded.
+
+        The fetch happens without holding the lock, so queries are answered
+        from the previous data meanwhile. The result is discarded if the
+        timeline was invalidated during the fetch.
+
+        Args:
+            since: Range start (defaults to the start of the loaded window)
+            until: Range end (defaults to the end of the loaded window)
+
+        Returns:
+            True if the timeline was updated
+        """
+        with self._lock:
+            if self._window is None:
+                return False
+            since = max(since or self._window[0], self._window[0])
+            until = min(until or self._window[1], self._window[1])
+            generation = self._generation
+        if since >= until:
+            return False
+
+        shifts, users = self._fetch(since, until)
+        with self._lock:
+            if generation != self._generation:
+                return False
+            self._splice(since, until, shifts, users)
+        return True
+
+    def refresh_near_term(self) -> bool:
+        """Re-fetch the near-term part of the timeline, if it has been loaded.
+
+        Returns:
+            True if the timeline was updated
+        """
+        now = datetime.now(tz.tzlocal())
+        return self.refresh(now, now + NEAR_TERM)
+
+    def user_id(self, email: str) -> str:
+        """Get a user's PagerDuty ID from their email address, remembering it for the session.
+
+        Args:
+            email: User's email address
+
+        Returns:
+            User ID string
+
+        Raises:
+            SystemExit: If the user is not found or API calls fail
+        """
+        key = email.lower()
+        if key not in self._user_ids:
+            self._user_ids[key] = get_user_id_by_email(self.session, email)
+        return self._user_ids[key]
+
+    def user_ids(self, emails: List[str]) -> List[Optional[str]]:
+        """Get the PagerDuty IDs of several users at once, remembering them for the session.
+
+        Args:
+            emails: Users' email addresses
+
+        Returns:
+            User ID of every address, in order, or None for addresses with no such user
+
+        Raises:
+            SystemExit: If API calls fail
+        """
+        unknown = [email for email in emails if email.lower() not in self._user_ids]
+        if unknown:
+            found = get_user_ids_by_email(self.session, unknown)
+            self._user_ids.update((email.lower(), user_id) for email, user_id in found.items() if user_id)
+        return [self._user_ids.get(email.lower()) for email in emails]
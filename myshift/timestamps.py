@@ -0,0 +1,100 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Fast decoding of PagerDuty timestamps.
+
+/oncalls records carry their start and end as UTC strings in a fixed format
+(YYYY-MM-DDTHH:MM:SSZ). Decoding them with strptime and converting them with
+dateutil dominates the cost of processing large windows, so this module:
+- Parses the fixed format by slicing, without going through strptime
+- Memoizes decoded values, since shift boundaries repeat heavily across
+  escalation levels and consecutive shifts
+- Falls back to a general parser for any other format
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from dateutil import parser as date_parser
+from dateutil import tz
+
+
+def parse_utc(value: str) -> datetime:
+    """Parse a PagerDuty UTC timestamp into a timezone-aware datetime.
+
+    Args:
+        value: Timestamp, normally in the form YYYY-MM-DDTHH:MM:SSZ
+
+    Returns:
+        Datetime in UTC
+
+    Raises:
+        ValueError: If the value cannot be parsed
+    """
+    if len(value) == 20 and value[19] == "Z" and value[10] == "T":
+        return datetime(
+            int(value[0:4]),
+            int(value[5:7]),
+            int(value[8:10]),
+            int(value[11:13]),
+            int(value[14:16]),
+            int(value[17:19]),
+            tzinfo=timezone.utc,
+        )
+
+    # Anything else (fractional seconds, numeric offsets) goes the slow way
+    parsed = date_parser.isoparse(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def format_utc(value: datetime) -> str:
+    """Format a timezone-aware datetime as a PagerDuty UTC timestamp.
+
+    Args:
+        value: Datetime to format
+
+    Returns:
+        Timestamp in the form YYYY-MM-DDTHH:MM:SSZ
+    """
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class TimestampDecoder:
+    """Memoizing decoder of PagerDuty timestamps into a target timezone."""
+
+    def __init__(self, target_tz: Optional[datetime.tzinfo] = None):
+        """Initialize the decoder.
+
+        Args:
+            target_tz: Timezone to convert times to (defaults to the local timezone)
+        """
+        self.target_tz = target_tz or tz.tzlocal()
+        self._memo: Dict[str, datetime] = {}
+
+    def __call__(self, value: str) -> datetime:
+        """Decode a timestamp.
+
+        Args:
+            value: PagerDuty UTC timestamp
+
+        Returns:
+            Datetime in the target timezone
+        """
+        try:
+            return self._memo[value]
+        except KeyError:
+            decoded = self._memo[value] = parse_utc(value).astimezone(self.target_tz)
+            return decoded
@@ -0,0 +1,119 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""HTTP transport settings of the PagerDuty session.
+
+Short commands spend most of their time opening the connection (TCP and TLS
+handshakes) and waiting for the first response, so the session is tuned from
+the 'http' section of the configuration:
+- The connection pool is as large as httpx's default, well above the number
+  of requests myshift issues at once (page fetches, time windows and
+  schedules fetched in parallel, override chunks), so none of them queue for
+  a connection
+- Idle connections are kept alive long enough to be reused across REPL
+  commands
+- Responses are requested gzip-compressed
+- Connect and read timeouts are explicit
+- The REPL opens its connection while the prompt is shown
+"""
+
+import threading
+from typing import Any, Dict
+
+import httpx2
+from pagerduty import RestApiV2Client
+
+from myshift.ratelimit import background
+
+# Defaults for the 'http' section of the configuration; the pool size is httpx's default
+DEFAULT_POOL_SIZE = 100
+DEFAULT_KEEPALIVE = 60.0
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+
+# Cheap endpoint answered for any REST API token, used to open the connection
+WARM_UP_PATH = "/abilities"
+
+
+def get_http_settings(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Get the 'http' section of the configuration.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        HTTP settings dictionary (possibly empty)
+    """
+    settings = config.get("http")
+    return settings if isinstance(settings, dict) else {}
+
+
+def client_options(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Get the HTTP client keyword arguments for some settings.
+
+    Args:
+        settings: HTTP settings dictionary
+
+    Returns:
+        Keyword arguments for the session constructor
+    """
+    pool_size = int(settings.get("pool_size") or DEFAULT_POOL_SIZE)
+    return {
+        "limits": httpx2.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=float(settings.get("keepalive", DEFAULT_KEEPALIVE)),
+        ),
+    }
+
+
+def configure_session(session: RestApiV2Client, settings: Dict[str, Any]) -> None:
+    """Apply the per-request HTTP settings to a session.
+
+    Args:
+        session: PagerDuty API session
+        settings: HTTP settings dictionary
+    """
+    # The PagerDuty client passes its 'timeout' attribute with every request
+    session.timeout = httpx2.Timeout(
+        float(settings.get("read_timeout", DEFAULT_READ_TIMEOUT)),
+        connect=float(settings.get("connect_timeout", DEFAULT_CONNECT_TIMEOUT)),
+    )
+    session.headers["Accept-Encoding"] = "gzip" if settings.get("compression", True) else "identity"
+
+
+def warm_up(session: RestApiV2Client) -> threading.Thread:
+    """Open the session's connection in the background.
+
+    The handshakes are done while nothing else is waiting on the network, so
+    the first real request goes out on an established connection. Errors are
+    ignored; the first real request reports them.
+
+    Args:
+        session: PagerDuty API session
+
+    Returns:
+        The daemon thread doing the warm-up
+    """
+
+    def run() -> None:
+        try:
+            with background():
+                session.get(WARM_UP_PATH)
+        except Exception:  # nosec B110 # a failed warm-up only loses the head start; the next request reports it
+            pass
+
+    thread = threading.Thread(target=run, name="myshift-warm-up", daemon=True)
+    thread.start()
+    return thread
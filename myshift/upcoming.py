@@ -23,7 +23,7 @@ including:
 
 import sys
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
 from dateutil import tz
 from pagerduty import RestApiV2Client
@@ -31,11 +31,28 @@ from pagerduty import RestApiV2Client
 from myshift.util import get_unique_shifts, get_user_id_by_email
 
 
+def print_upcoming(shifts: List[Tuple[datetime, datetime]], days: int) -> None:
+    """Print a user's upcoming shifts.
+
+    Args:
+        shifts: (start_time, end_time) tuples, sorted chronologically
+        days: Number of days the shifts cover
+    """
+    if not shifts:
+        print("No upcoming shifts found")
+        return
+
+    print(f"Upcoming shifts for the next {days} days:")
+    for start, end in shifts:
+        print(f"{start.strftime('%Y-%m-%d %H:%M %Z')} to {end.strftime('%Y-%m-%d %H:%M %Z')}")
+
+
 def upcoming_shifts(
     session: RestApiV2Client,
     schedule_id: str,
     email: Optional[str] = None,
     days: int = 7 * 4,  # 4 weeks
+    user_id: Optional[str] = None,
 ) -> None:
     """Show upcoming on-call shifts for a user.
 
@@ -44,19 +61,14 @@ def upcoming_shifts(
         schedule_id: PagerDuty schedule ID
         email: Optional email address to look up user ID
         days: Number of days to look ahead (default: 28 days / 4 weeks)
+        user_id: Optional user ID, skipping the email lookup (e.g. from a compiled config)
     """
-    if not email:
+    if not email and not user_id:
         print("Email address is required", file=sys.stderr)
         sys.exit(1)
 
-    user_id = get_user_id_by_email(session, email)
+    user_id = user_id or get_user_id_by_email(session, email)
     until = datetime.now(tz.tzlocal()) + timedelta(days=days)
 
     shifts = get_unique_shifts(session, user_id, schedule_id, until)
-    if not shifts:
-        print("No upcoming shifts found")
-        return
-
-    print(f"Upcoming shifts for the next {days} days:")
-    for start, end in shifts:
-        print(f"{start.strftime('%Y-%m-%d %H:%M %Z')} to {end.strftime('%Y-%m-%d %H:%M %Z')}")
+    print_upcoming(shifts, days)
@@ -0,0 +1,276 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cached directory of PagerDuty users.
+
+This module provides a persistent ID/email/name directory that replaces
+per-call user lookups:
+- The directory warms itself from one bulk /users listing
+- Entries expire after a TTL and the least recently used ones are evicted
+- The API is only queried for a single user on a directory miss
+
+Entries are kept in memory for the lifetime of the process and in a SQLite
+database in the cache directory, shared by all myshift processes.
+"""
+
+import sqlite3
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, TypedDict
+
+from pagerduty import RestApiV2Client
+
+from myshift.cache import connect, get_cache_path, get_cache_settings, init_db, transaction
+
+USER_DB_NAME = "users.sqlite"
+
+# Defaults for the 'cache' section of the configuration file
+DEFAULT_USER_TTL = 24 * 60 * 60
+DEFAULT_USER_CAPACITY = 10000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    email TEXT NOT NULL,
+    name TEXT NOT NULL,
+    fetched_at INTEGER NOT NULL,
+    last_used INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS users_by_email ON users (email COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS users_by_last_used ON users (last_used);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+_LOOKUP_QUERIES = {
+    "id": "SELECT id, email, name, fetched_at FROM users WHERE id = ?",
+    "email": "SELECT id, email, name, fetched_at FROM users WHERE email = ? COLLATE NOCASE",
+}
+
+
+class UserObject(TypedDict):
+    """Type definition for PagerDuty user objects."""
+
+    id: str
+    name: str
+    email: str
+
+
+def to_user_object(user: Dict[str, Any]) -> UserObject:
+    """Reduce a PagerDuty API user record to the fields myshift uses."""
+    return {"id": user["id"], "name": user["name"], "email": user["email"]}
+
+
+class UserDirectory:
+    """Persistent ID/email/name directory with LRU eviction and TTL."""
+
+    def __init__(self, path: Path, ttl: int = DEFAULT_USER_TTL, capacity: int = DEFAULT_USER_CAPACITY):
+        """Initialize the directory, creating the database if needed.
+
+        Args:
+            path: Path of the SQLite database file
+            ttl: Seconds before a user entry (and the bulk warm-up) goes stale
+            capacity: Maximum number of users kept, in memory and on disk
+        """
+        self.path = path
+        self.ttl = ttl
+        self.capacity = capacity
+        self._by_id: "OrderedDict[str, Tuple[UserObject, int]]" = OrderedDict()
+        self._by_email: Dict[str, str] = {}
+        self._warm_checked = False
+
+        init_db(self.path, _SCHEMA)
+
+    def _remember(self, user: UserObject, fetched_at: int) -> None:
+        """Add a user to the in-memory LRU, evicting the least recently used entry if full."""
+        self._by_id[user["id"]] = (user, fetched_at)
+        self._by_id.move_to_end(user["id"])
+        self._by_email[user["email"].lower()] = user["id"]
+        while len(self._by_id) > self.capacity:
+            evicted, _ = self._by_id.popitem(last=False)[1]
+            self._by_email.pop(evicted["email"].lower(), None)
+
+    def _fresh(self, fetched_at: int) -> bool:
+        return int(time.time()) - fetched_at <= self.ttl
+
+    def _lookup(self, column: str, value: str) -> Optional[UserObject]:
+        """Find a fresh user in memory or on disk by 'id' or 'email'."""
+        user_id = value if column == "id" else self._by_email.get(value.lower())
+        if user_id in self._by_id:
+            user, fetched_at = self._by_id[user_id]
+            if self._fresh(fetched_at):
+                self._by_id.move_to_end(user_id)
+                return user
+
+        now = int(time.time())
+        with connect(self.path) as conn:
+            row = conn.execute(_LOOKUP_QUERIES[column], (value,)).fetchone()
+            if row is None or not self._fresh(row[3]):
+                return None
+            conn.execute("UPDATE users SET last_used = ? WHERE id = ?", (now, row[0]))
+
+        user: UserObject = {"id": row[0], "email": row[1], "name": row[2]}
+        self._remember(user, row[3])
+        return user
+
+    def add(self, users: Iterable[UserObject]) -> None:
+        """Store users in the directory, evicting the least recently used entries over capacity.
+
+        Args:
+            users: User objects to store
+        """
+        now = int(time.time())
+        rows = [(user["id"], user["email"], user["name"], now, now) for user in users]
+        with transaction(self.path) as conn:
+            conn.executemany("INSERT OR REPLACE INTO users VALUES (?, ?, ?, ?, ?)", rows)
+            conn.execute(
+                "DELETE FROM users WHERE id NOT IN (SELECT id FROM users ORDER BY last_used DESC LIMIT ?)",
+                (self.capacity,),
+            )
+
+        for user_id, email, name, fetched_at, _ in rows:
+            self._remember({"id": user_id, "email": email, "name": name}, fetched_at)
+
+    def warm(self, session: RestApiV2Client) -> bool:
+        """Load every user with one bulk /users listing, unless that was done within the TTL.
+
+        Only one warm-up check happens per process, so repeated misses for
+        unknown users don't re-list the whole account.
+
+        Args:
+            session: PagerDuty API session
+
+        Returns:
+            True if the bulk listing was performed
+        """
+        if self._warm_checked:
+            return False
+        self._warm_checked = True
+
+        with connect(self.path) as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'warmed_at'").fetchone()
+        if row is not None and self._fresh(row[0]):
+            return False
+
+        self.add(to_user_object(user) for user in session.iter_all("users"))
+        with transaction(self.path) as conn:
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('warmed_at', ?)", (int(time.time()),))
+        return True
+
+    def get_by_email(self, session: RestApiV2Client, email: str) -> Optional[UserObject]:
+        """Find a user by email, falling back to the API on a miss.
+
+        Args:
+            session: PagerDuty API session
+            email: User's email address
+
+        Returns:
+            User object, or None if no such user exists
+        """
+        user = self._lookup("email", email)
+        if user is None and self.warm(session):
+            user = self._lookup("email", email)
+        if user is None:
+            found = session.find("users", email, attribute="email")
+            if found:
+                user = to_user_object(found)
+                self.add([user])
+        return user
+
+    def get_by_id(self, session: RestApiV2Client, user_id: str) -> Optional[UserObject]:
+        """Find a user by ID, falling back to the API on a miss.
+
+        Args:
+            session: PagerDuty API session
+            user_id: User's PagerDuty ID
+
+        Returns:
+            User object, or None if no such user exists
+        """
+        user = self._lookup("id", user_id)
+        if user is None and self.warm(session):
+            user = self._lookup("id", user_id)
+        if user is None:
+            found = session.rget(f"/users/{user_id}")
+            if found:
+                user = to_user_object(found)
+                self.add([user])
+        return user
+
+    def get_many(self, user_ids: Iterable[str]) -> Tuple[Dict[str, UserObject], List[str]]:
+        """Look up several users without calling the API.
+
+        Args:
+            user_ids: PagerDuty user IDs
+
+        Returns:
+            Tuple of (mapping of the user IDs found to user objects, IDs not found)
+        """
+        found: Dict[str, UserObject] = {}
+        missing: List[str] = []
+        for user_id in user_ids:
+            user = self._lookup("id", user_id)
+            if user is None:
+                missing.append(user_id)
+            else:
+                found[user_id] = user
+        return found, missing
+
+    def get_many_by_email(self, emails: Iterable[str]) -> Tuple[Dict[str, UserObject], List[str]]:
+        """Look up several users by email without calling the API.
+
+        Args:
+            emails: Users' email addresses
+
+        Returns:
+            Tuple of (mapping of the addresses found to user objects, addresses not found)
+        """
+        found: Dict[str, UserObject] = {}
+        missing: List[str] = []
+        for email in emails:
+            user = self._lookup("email", email)
+            if user is None:
+                missing.append(email)
+            else:
+                found[email] = user
+        return found, missing
+
+
+def open_user_directory(config: Dict[str, Any]) -> Optional[UserDirectory]:
+    """Create the user directory described by the 'cache' section of the configuration.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        UserDirectory instance, or None if caching is disabled or unavailable
+    """
+    settings = get_cache_settings(config)
+    if settings is None:
+        return None
+
+    path = get_cache_path(settings, USER_DB_NAME)
+    try:
+        return UserDirectory(
+            path,
+            ttl=int(settings.get("user_ttl", DEFAULT_USER_TTL)),
+            capacity=int(settings.get("user_capacity", DEFAULT_USER_CAPACITY)),
+        )
+    except (OSError, sqlite3.Error) as e:
+        print(f"Warning: user directory disabled, cannot open {path}: {e}", file=sys.stderr)
+        return None
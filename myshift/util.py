@@ -25,50 +25,180 @@ All datetime operations handle timezone conversion between UTC and local time.
 """
 
 import argparse
+import atexit
+import contextvars
 import sys
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Set, Tuple, TypedDict
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
+import httpx2
 from dateutil import tz
-from pagerduty import RestApiV2Client, HttpError, UrlError
-
-
-class UserObject(TypedDict):
-    """Type definition for PagerDuty user objects."""
-
-    id: str
-    name: str
-    email: str
-
+from pagerduty import Error, HttpError, RestApiV2Client, UrlError
+
+from myshift.aio import DEFAULT_CONCURRENCY, list_all_concurrent
+from myshift.bulk import OverrideJournal, open_override_journal
+from myshift.cache import ShiftStore, open_shift_store
+from myshift.defaults import DEFAULT_FETCH_ENGINE, FETCH_ENGINES
+from myshift.profiling import Profiler, profile_section
+from myshift.ratelimit import (
+    DEFAULT_PAUSE,
+    MAX_PAUSE,
+    MAX_THROTTLED_RETRIES,
+    RateLimiter,
+    open_rate_limiter,
+    retry_after,
+)
+from myshift.shiftarray import ShiftArray
+from myshift.timestamps import parse_utc
+from myshift.transport import client_options, configure_session, get_http_settings, warm_up
+from myshift.users import UserDirectory, UserObject, open_user_directory, to_user_object
+
+# Length of the time windows fetched in parallel with 'fetch_mode: sharded'
+DEFAULT_SHARD_DAYS = 7
+
+
+class MyShiftClient(RestApiV2Client):
+    """PagerDuty API client carrying the per-session helpers configured for myshift.
+
+    Attributes:
+        shift_store: Optional on-disk shift cache consulted before calling /oncalls
+        user_directory: Optional cached user directory consulted before calling /users
+        page_concurrency: Number of /oncalls pages fetched concurrently; 0 pages serially
+        profiler: Optional profiler recording every request (see --profile)
+        override_journal: Optional journal of submitted overrides, so re-runs don't duplicate them
+        rate_limiter: Optional token bucket every HTTP attempt waits on, shared by all threads
+        fetch_engine: Source of schedule shifts, one of FETCH_ENGINES (see fetch_oncalls)
+        shard_days: Length in days of the time windows a long range is split into and fetched in
+            parallel; 0 fetches the whole range at once (see fetch_sharded)
+        shard_workers: Number of time windows fetched at the same time
+    """
 
-def get_pd_session(config: Dict[str, Any]) -> RestApiV2Client:
+    shift_store: Optional[ShiftStore] = None
+    user_directory: Optional[UserDirectory] = None
+    page_concurrency: int = 0
+    profiler: Optional[Profiler] = None
+    override_journal: Optional[OverrideJournal] = None
+    rate_limiter: Optional[RateLimiter] = None
+    fetch_engine: str = "oncalls"
+    shard_days: float = 0
+    shard_workers: int = DEFAULT_CONCURRENCY
+
+    def _endpoint(self, method: str, url: str) -> str:
+        """Label a request by method and canonical path, e.g. "GET /users/{id}"."""
+        try:
+            return f"{method.upper()} {self.canonical_path(self.normalize_url(url))}"
+        except UrlError:
+            return f"{method.upper()} {url}"
+
+    def request(self, method: str, url: str, **kwargs: Any) -> Any:
+        if self.profiler is None:
+            return super().request(method, url, **kwargs)
+
+        self.profiler.begin_request()
+        started = time.perf_counter()
+        try:
+            return super().request(method, url, **kwargs)
+        finally:
+            self.profiler.end_request(self._endpoint(method, url), time.perf_counter() - started)
+
+    def send(self, request: Any, **kwargs: Any) -> Any:
+        try:
+            return self._send_limited(request, **kwargs)
+        except httpx2.TransportError as e:
+            if request.method != "POST" or isinstance(e, (httpx2.ConnectError, httpx2.ConnectTimeout)):
+                raise
+            # The POST may have been carried out: leave it to the caller to check before resending
+            # (see myshift.bulk), instead of letting the client retry it blindly as a network error
+            raise Error(f"{request.method} {request.url}: connection lost during request: {e!r}") from e
+
+    def _send_limited(self, request: Any, **kwargs: Any) -> Any:
+        # Every HTTP attempt, retries included, waits for the shared rate limiter
+        limiter = self.rate_limiter
+        if limiter is None:
+            return super().send(request, **kwargs)
+
+        for attempt in range(MAX_THROTTLED_RETRIES + 1):
+            limiter.acquire()
+            response = super().send(request, **kwargs)
+            if response.status_code != 429 or attempt == MAX_THROTTLED_RETRIES:
+                return response
+            # Hold every thread for as long as PagerDuty asked, instead of each backing off on its own
+            delay = retry_after(response)
+            limiter.pause(min(MAX_PAUSE, DEFAULT_PAUSE * 2**attempt) if delay is None else delay)
+            if self.profiler is not None:
+                self.profiler.record_attempt(self._endpoint(request.method, str(request.url)), response)
+            response.close()
+        return response
+
+    def postprocess(self, response: Any, suffix: Optional[str] = None) -> None:
+        super().postprocess(response, suffix)
+        if self.profiler is not None:
+            self.profiler.record_attempt(self._endpoint(response.request.method, str(response.request.url)), response)
+
+
+def get_pd_session(config: Dict[str, Any], warm: bool = False) -> RestApiV2Client:
     """Create an authenticated PagerDuty API session.
 
     Args:
-        config: Configuration dictionary containing pagerduty_token
+        config: Configuration dictionary containing token
+        warm: Open the connection in the background right away (for long-lived sessions)
 
     Returns:
         Authenticated PagerDuty API client
 
     Raises:
-        SystemExit: If pagerduty_token is missing from config
+        SystemExit: If token is missing from config
     """
-    api_token = config.get("pagerduty_token")
+    # 'pagerduty_token' is the key older versions read; 'token' is the documented one
+    api_token = config.get("token") or config.get("pagerduty_token")
     if not api_token:
-        print("pagerduty_token missing in myshift.yaml", file=sys.stderr)
+        print("token missing in myshift.yaml", file=sys.stderr)
         sys.exit(1)
 
+    page_concurrency = 0
+    shard_days = 0.0
+    if config.get("fetch_mode") == "async":
+        page_concurrency = int(config.get("page_concurrency", DEFAULT_CONCURRENCY))
+    elif config.get("fetch_mode") == "sharded":
+        shard_days = float(config.get("shard_days", DEFAULT_SHARD_DAYS))
+    shard_workers = int(config.get("page_concurrency", DEFAULT_CONCURRENCY))
+
     # Configure client with modern settings
-    client = RestApiV2Client(api_token)
-    
+    http_settings = get_http_settings(config)
+    client = MyShiftClient(api_token, **client_options(http_settings))
+    configure_session(client, http_settings)
+    client.shift_store = open_shift_store(config)
+    client.user_directory = open_user_directory(config)
+    client.override_journal = open_override_journal(config)
+    client.rate_limiter = open_rate_limiter(config)
+    if config.get("profile"):
+        client.profiler = Profiler(config["profile"])
+        client.profiler.rate_limiter = client.rate_limiter
+        atexit.register(client.profiler.report)
+    client.page_concurrency = page_concurrency
+    client.shard_days = shard_days
+    client.shard_workers = shard_workers
+    client.fetch_engine = config.get("fetch_engine", DEFAULT_FETCH_ENGINE)
+    if client.fetch_engine not in FETCH_ENGINES:
+        print(
+            f"Invalid fetch_engine '{client.fetch_engine}' in myshift.yaml "
+            f"(expected one of: {', '.join(FETCH_ENGINES)})",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
     # Set reasonable retry limits for better reliability
     client.max_http_attempts = 3
     client.sleep_timer = 2.0
     client.sleep_timer_base = 2
-    
+
     # Enable debug mode if needed (disabled by default)
     # client.print_debug = True
-    
+
+    if warm:
+        warm_up(client)
     return client
 
 
@@ -96,6 +226,110 @@ def resolve_schedule_id(parsed_args: argparse.Namespace, config: Dict[str, Any])
     return schedule_id
 
 
+def resolve_schedule_ids(
+    parsed_args: argparse.Namespace,
+    config: Dict[str, Any],
+    session: RestApiV2Client,
+) -> Dict[str, str]:
+    """Resolve one or more schedule IDs from command line arguments or configuration.
+
+    Schedules are taken from, in order of precedence:
+    1. Every schedule on the team given by --team (requires a session)
+    2. The --schedule-id arguments (repeatable, or comma-separated)
+    3. schedule_id in the configuration
+
+    Args:
+        parsed_args: Command line arguments object
+        config: Configuration dictionary
+        session: PagerDuty API session, used for team lookups
+
+    Returns:
+        Dictionary mapping schedule IDs to display labels (the schedule name if
+        known, otherwise the ID), in the order given
+
+    Raises:
+        SystemExit: If no schedule can be resolved
+    """
+    team_id = getattr(parsed_args, "team", None)
+    if team_id:
+        schedules = get_team_schedules(session, team_id)
+        if not schedules:
+            print(f"No schedules found for team {team_id}.", file=sys.stderr)
+            sys.exit(2)
+        return schedules
+
+    schedule_ids: List[str] = []
+    for value in getattr(parsed_args, "schedule_ids", None) or []:
+        schedule_ids.extend(part.strip() for part in value.split(",") if part.strip())
+    if schedule_ids:
+        return {schedule_id: schedule_id for schedule_id in schedule_ids}
+
+    schedule_id = resolve_schedule_id(parsed_args, config)
+    return {schedule_id: schedule_id}
+
+
+def get_team_schedules(session: RestApiV2Client, team_id: str) -> Dict[str, str]:
+    """Get every schedule belonging to a team.
+
+    Args:
+        session: PagerDuty API session
+        team_id: PagerDuty team ID
+
+    Returns:
+        Dictionary mapping schedule IDs to schedule names
+
+    Raises:
+        SystemExit: If API calls fail
+    """
+    try:
+        return {
+            schedule["id"]: schedule.get("name") or schedule["id"]
+            for schedule in session.iter_all("schedules")
+            if any(team.get("id") == team_id for team in schedule.get("teams", []))
+        }
+    except HttpError as e:
+        print(f"PagerDuty API error listing schedules: {e.response.status_code} - {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Unexpected error listing schedules: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def find_schedule_id(session: RestApiV2Client, name: str) -> str:
+    """Get the ID of a schedule from its name.
+
+    Args:
+        session: PagerDuty API session
+        name: Schedule name (case-insensitive)
+
+    Returns:
+        Schedule ID string
+
+    Raises:
+        SystemExit: If no schedule or several schedules have that name, or API calls fail
+    """
+    try:
+        matches = [
+            schedule["id"]
+            for schedule in session.iter_all("schedules", params={"query": name})
+            if (schedule.get("name") or "").lower() == name.lower()
+        ]
+    except HttpError as e:
+        print(f"PagerDuty API error listing schedules: {e.response.status_code} - {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Unexpected error listing schedules: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if not matches:
+        print(f"Schedule named '{name}' not found in PagerDuty.", file=sys.stderr)
+        sys.exit(1)
+    if len(matches) > 1:
+        print(f"Several schedules are named '{name}': {', '.join(matches)}", file=sys.stderr)
+        sys.exit(1)
+    return matches[0]
+
+
 def get_user_id_by_email(session: RestApiV2Client, email: str) -> str:
     """Get PagerDuty user ID from email address.
 
@@ -110,12 +344,16 @@ def get_user_id_by_email(session: RestApiV2Client, email: str) -> str:
         SystemExit: If user is not found or API error occurs
     """
     try:
-        user = session.find("users", email, attribute="email")
+        directory = getattr(session, "user_directory", None)
+        if directory is not None:
+            user = directory.get_by_email(session, email)
+        else:
+            user = session.find("users", email, attribute="email")
         if not user:
             print(f"User with email {email} not found in PagerDuty.", file=sys.stderr)
             sys.exit(1)
         return user["id"]
-        
+
     except HttpError as e:
         if e.response.status_code == 404:
             print(f"User with email {email} not found in PagerDuty.", file=sys.stderr)
@@ -130,6 +368,64 @@ def get_user_id_by_email(session: RestApiV2Client, email: str) -> str:
         sys.exit(1)
 
 
+def get_user_ids_by_email(session: RestApiV2Client, emails: List[str]) -> Dict[str, Optional[str]]:
+    """Get the PagerDuty user IDs of several email addresses at once.
+
+    Addresses are answered from the session's user directory first, which
+    warms itself with one bulk /users listing. Without a directory, or for
+    addresses it doesn't know, /users is listed once, stopping as soon as
+    every address has been found.
+
+    Args:
+        session: PagerDuty API session
+        emails: Users' email addresses
+
+    Returns:
+        Dictionary mapping every email address to its user ID, or to None if
+        no such user exists
+
+    Raises:
+        SystemExit: If API calls fail
+    """
+    try:
+        wanted = list(dict.fromkeys(email.lower() for email in emails))
+        found: Dict[str, str] = {}
+        missing = wanted
+
+        directory = getattr(session, "user_directory", None)
+        if directory is not None:
+            users, missing = directory.get_many_by_email(missing)
+            found.update((email, user["id"]) for email, user in users.items())
+            if missing and directory.warm(session):
+                users, missing = directory.get_many_by_email(missing)
+                found.update((email, user["id"]) for email, user in users.items())
+                # The directory now holds every user, so the rest don't exist
+                missing = []
+
+        if missing:
+            remaining = set(missing)
+            listed: List[UserObject] = []
+            for user in session.iter_all("users"):
+                listed.append(to_user_object(user))
+                email = user["email"].lower()
+                if email in remaining:
+                    found[email] = user["id"]
+                    remaining.discard(email)
+                    if not remaining:
+                        break
+            if directory is not None:
+                directory.add(listed)
+
+        return {email: found.get(email.lower()) for email in emails}
+
+    except HttpError as e:
+        print(f"PagerDuty API error: {e.response.status_code} - {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Unexpected error looking up users: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
 def get_user_name_by_id(session: RestApiV2Client, user_id: str) -> str:
     """Get PagerDuty user's full name from their ID.
 
@@ -144,12 +440,16 @@ def get_user_name_by_id(session: RestApiV2Client, user_id: str) -> str:
         SystemExit: If user is not found or API error occurs
     """
     try:
-        user = session.rget(f"/users/{user_id}")
+        directory = getattr(session, "user_directory", None)
+        if directory is not None:
+            user = directory.get_by_id(session, user_id)
+        else:
+            user = session.rget(f"/users/{user_id}")
         if not user:
             print(f"User with ID {user_id} not found in PagerDuty.", file=sys.stderr)
             sys.exit(1)
         return user["name"]
-        
+
     except HttpError as e:
         if e.response.status_code == 404:
             print(f"User with ID {user_id} not found in PagerDuty.", file=sys.stderr)
@@ -161,6 +461,211 @@ def get_user_name_by_id(session: RestApiV2Client, user_id: str) -> str:
         sys.exit(1)
 
 
+def list_oncalls(session: RestApiV2Client, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """List /oncalls records, fetching pages concurrently if the session is in async mode.
+
+    Args:
+        session: PagerDuty API session
+        params: /oncalls query parameters
+
+    Returns:
+        List of /oncalls records in API order
+    """
+    concurrency = getattr(session, "page_concurrency", 0)
+    if concurrency > 1:
+        return list_all_concurrent(session, "/oncalls", params, concurrency)
+
+    # Use modern iter_all for automatic pagination
+    return list(session.iter_all("/oncalls", params=params))
+
+
+def split_range(since: datetime, until: datetime, days: float) -> List[Tuple[datetime, datetime]]:
+    """Split a time range into consecutive shards.
+
+    Shards are measured in elapsed time, so daylight saving changes don't
+    move their boundaries.
+
+    Args:
+        since: Start of the range
+        until: End of the range
+        days: Length of every shard but the last, in days
+
+    Returns:
+        List of (since, until) shards covering the range in order
+    """
+    step = timedelta(days=days)
+    shards = []
+    start = since
+    while until - start > step:
+        shards.append((start, start + step))
+        start += step
+    shards.append((start, until))
+    return shards
+
+
+def fetch_sharded(
+    fetch: Callable[[datetime, datetime], List[Dict[str, Any]]],
+    since: datetime,
+    until: datetime,
+    days: float,
+    workers: int,
+) -> List[Dict[str, Any]]:
+    """Fetch the records of a long range as shards fetched in parallel.
+
+    Records are fetched with overflow, so a shift crossing a shard boundary
+    comes back whole from every shard it overlaps. Each shard keeps only the
+    records starting inside it (the first shard also keeps those starting
+    before the range, and the last those starting after it), so every record
+    is kept exactly once and the result holds the same records as fetching
+    the whole range at once.
+
+    Args:
+        fetch: Callable fetching the records of a (since, until) range
+        since: Start of the range
+        until: End of the range
+        days: Length of the shards in days
+        workers: Maximum number of shards fetched at the same time
+
+    Returns:
+        List of records, shard by shard
+    """
+    shards = split_range(since, until, days)
+    if len(shards) == 1:
+        return fetch(since, until)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(shards)))) as executor:
+        # Each shard runs in a copy of this context, keeping the request priority (see ratelimit.background)
+        futures = [
+            executor.submit(contextvars.copy_context().run, fetch, shard_since, shard_until)
+            for shard_since, shard_until in shards
+        ]
+        results = [future.result() for future in futures]
+
+    epochs: Dict[str, int] = {}
+    records: List[Dict[str, Any]] = []
+    last = len(shards) - 1
+    for index, ((shard_since, shard_until), shard_records) in enumerate(zip(shards, results)):
+        low = int(shard_since.timestamp()) if index > 0 else None
+        high = int(shard_until.timestamp()) if index < last else None
+        for record in shard_records:
+            start = epochs.get(record["start"])
+            if start is None:
+                start = epochs[record["start"]] = int(parse_utc(record["start"]).timestamp())
+            if (low is None or start >= low) and (high is None or start < high):
+                records.append(record)
+    return records
+
+
+def get_rendered_entries(
+    session: RestApiV2Client,
+    schedule_id: str,
+    since: datetime,
+    until: datetime,
+) -> List[Dict[str, Any]]:
+    """Get the final rendered entries of a schedule.
+
+    The final schedule already merges layers and overrides into one entry per
+    shift, so it holds the same shifts as /oncalls for the schedule without
+    repeating them for every escalation policy and level using it, in one
+    unpaginated response.
+
+    Args:
+        session: PagerDuty API session
+        schedule_id: PagerDuty schedule ID
+        since: Start datetime for the search range
+        until: End datetime for the search range
+
+    Returns:
+        List of rendered schedule entries, each with start, end and user
+    """
+    params = {
+        "since": since.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "until": until.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "overflow": "true",
+        "time_zone": "UTC",
+    }
+    schedule = session.rget(f"/schedules/{schedule_id}", params=params)
+    # Entries of deactivated users have no user reference; /oncalls doesn't report them either
+    return [
+        entry
+        for entry in (schedule.get("final_schedule") or {}).get("rendered_schedule_entries") or []
+        if entry.get("user")
+    ]
+
+
+def fetch_oncalls(
+    session: RestApiV2Client,
+    schedule_id: str,
+    since: datetime,
+    until: datetime,
+    user_id: Optional[str] = None,
+    quiet: bool = False,
+    user_ids: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """Fetch on-call records for a schedule, using the session's shift cache if available.
+
+    The session's fetch_engine decides where the records come from:
+    - "oncalls": /oncalls, one record per shift for every escalation policy and level using the schedule
+    - "rendered": the schedule's final rendered entries (see get_rendered_entries), filtered by user here
+    - "auto": the rendered entries for every user's shifts, and /oncalls for some users', which it
+      filters on the server
+
+    Both sources give the same distinct shifts, so they share the shift cache. With a session
+    shard_days, long ranges are split into time windows fetched in parallel (see fetch_sharded).
+
+    Args:
+        session: PagerDuty API session
+        schedule_id: PagerDuty schedule ID
+        since: Start datetime for the search range
+        until: End datetime for the search range
+        user_id: Optional PagerDuty user ID to filter on
+        quiet: Don't print progress messages
+        user_ids: Optional PagerDuty user IDs to filter on, all in one query (instead of user_id)
+
+    Returns:
+        List of /oncalls records, each with at least start, end and user ID
+    """
+    wanted = [user_id] if user_id else sorted(set(user_ids or []))
+    engine = getattr(session, "fetch_engine", "oncalls")
+    rendered = engine == "rendered" or (engine == "auto" and not wanted)
+
+    def fetch_range(fetch_since: datetime, fetch_until: datetime) -> List[Dict[str, Any]]:
+        if rendered:
+            entries = get_rendered_entries(session, schedule_id, fetch_since, fetch_until)
+            return [entry for entry in entries if entry["user"]["id"] in wanted] if wanted else entries
+
+        params: Dict[str, Any] = {
+            "since": fetch_since.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "until": fetch_until.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "schedule_ids": [schedule_id],
+            "overflow": "true",
+        }
+        if wanted:
+            params["user_ids"] = wanted
+
+        return list_oncalls(session, params)
+
+    def fetch(fetch_since: datetime, fetch_until: datetime) -> List[Dict[str, Any]]:
+        shard_days = getattr(session, "shard_days", 0)
+        if shard_days > 0:
+            workers = getattr(session, "shard_workers", DEFAULT_CONCURRENCY)
+            return fetch_sharded(fetch_range, fetch_since, fetch_until, shard_days, workers)
+        return fetch_range(fetch_since, fetch_until)
+
+    store = getattr(session, "shift_store", None)
+    if store is None:
+        oncalls = fetch(since, until)
+        if not quiet:
+            print(f"Got {len(oncalls)} shifts from API")
+        return oncalls
+
+    # Filtered queries are cached apart from each other, keyed by the users they ask for
+    oncalls, fetched = store.fetch(schedule_id, since, until, fetch, ",".join(wanted) or None)
+    if not quiet:
+        print(f"Got {len(oncalls)} shifts ({fetched} from API)")
+    return oncalls
+
+
 def get_unique_shifts(
     session: RestApiV2Client,
     user_id: str,
@@ -185,39 +690,17 @@ def get_unique_shifts(
     try:
         now = datetime.now(timezone.utc)
 
-        params = {
-            "since": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "until": until.strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "user_ids": [user_id],
-            "schedule_ids": [schedule_id],
-            "overflow": "true",
-        }
-
-        print(f"Fetching shifts from {params['since']} to {params['until']}")
-
-        # Use modern iter_all for automatic pagination
-        all_shifts = list(session.iter_all("/oncalls", params=params))
-        print(f"Got {len(all_shifts)} shifts from API")
+        print(f"Fetching shifts from {now.strftime('%Y-%m-%dT%H:%M:%SZ')} to {until.strftime('%Y-%m-%dT%H:%M:%SZ')}")
+        all_shifts = fetch_oncalls(session, schedule_id, now, until, user_id)
 
-        # Use a set to track unique shifts by start and end time
-        unique_shifts: Set[Tuple[datetime, datetime]] = set()
-        utc = tz.tzutc()
-        local_tz = tz.tzlocal()
+        with profile_section(session, "decode/dedupe"):
+            unique_shifts = ShiftArray.from_records(all_shifts).unique()
+            # Unique by start and end time; the order of (start, end, user) is kept
+            shifts = list(dict.fromkeys((start, end) for start, end, _ in unique_shifts.to_shifts(tz.tzlocal())))
 
-        for shift in all_shifts:
-            # Convert UTC times to local timezone
-            start_utc = datetime.strptime(shift["start"], "%Y-%m-%dT%H:%M:%SZ")
-            end_utc = datetime.strptime(shift["end"], "%Y-%m-%dT%H:%M:%SZ")
+        print(f"Found {len(shifts)} unique shifts")
+        return shifts
 
-            start_local = start_utc.replace(tzinfo=utc).astimezone(local_tz)
-            end_local = end_utc.replace(tzinfo=utc).astimezone(local_tz)
-
-            # Add to set of unique shifts
-            unique_shifts.add((start_local, end_local))
-
-        print(f"Found {len(unique_shifts)} unique shifts")
-        return sorted(unique_shifts)
-        
     except HttpError as e:
         print(f"PagerDuty API error fetching shifts: {e.response.status_code} - {e}", file=sys.stderr)
         sys.exit(1)
@@ -226,62 +709,86 @@ def get_unique_shifts(
         sys.exit(1)
 
 
-def get_all_unique_shifts(
+def get_unique_shifts_by_user(
     session: RestApiV2Client,
+    user_ids: List[str],
     schedule_id: str,
     until: datetime,
-    target_tz: Optional[datetime.tzinfo] = None,
-) -> List[Tuple[datetime, datetime, str]]:
-    """Get all unique on-call shifts in a schedule with user information.
+) -> Dict[str, List[Tuple[datetime, datetime]]]:
+    """Get unique on-call shifts for several users in a schedule, with one query.
 
     Args:
         session: PagerDuty API session
+        user_ids: PagerDuty user IDs
         schedule_id: PagerDuty schedule ID
         until: End datetime for the search range
-        target_tz: Optional timezone to convert times to
 
     Returns:
-        List of tuples containing (start_time, end_time, user_id) in target timezone.
-        Times are sorted chronologically.
+        Dictionary mapping every user ID to a list of (start_time, end_time)
+        tuples in local timezone, sorted chronologically
 
     Raises:
         SystemExit: If API calls fail
     """
     try:
         now = datetime.now(timezone.utc)
-        target_tz = target_tz or tz.tzlocal()
+        all_shifts = fetch_oncalls(session, schedule_id, now, until, quiet=True, user_ids=user_ids)
+
+        # Split per user in one pass over the sorted, distinct shifts
+        with profile_section(session, "decode/dedupe"):
+            shifts: Dict[str, List[Tuple[datetime, datetime]]] = {user_id: [] for user_id in user_ids}
+            for start, end, user_id in ShiftArray.from_records(all_shifts).unique().to_shifts(tz.tzlocal()):
+                if user_id in shifts:
+                    shifts[user_id].append((start, end))
+        return shifts
+
+    except HttpError as e:
+        print(f"PagerDuty API error fetching shifts: {e.response.status_code} - {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Unexpected error fetching shifts: {e}", file=sys.stderr)
+        sys.exit(1)
 
-        params = {
-            "since": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "until": until.strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "schedule_ids": [schedule_id],
-            "overflow": "true",
-        }
 
-        print(f"Fetching shifts from {params['since']} to {params['until']}")
+def get_shift_array(
+    session: RestApiV2Client,
+    schedule_id: str,
+    until: datetime,
+    since: Optional[datetime] = None,
+    quiet: bool = False,
+) -> ShiftArray:
+    """Get all unique on-call shifts in a schedule, in compact form.
+
+    Args:
+        session: PagerDuty API session
+        schedule_id: PagerDuty schedule ID
+        until: End datetime for the search range
+        since: Optional start datetime for the search range (defaults to now)
+        quiet: Don't print progress messages
 
-        # Use modern iter_all for automatic pagination - much cleaner!
-        all_shifts = list(session.iter_all("/oncalls", params=params))
-        print(f"Got {len(all_shifts)} shifts from API")
+    Returns:
+        ShiftArray of the distinct shifts, sorted chronologically
 
-        # Use a set to track unique shifts by start, end time, and user
-        unique_shifts: Set[Tuple[datetime, datetime, str]] = set()
-        utc = tz.tzutc()
+    Raises:
+        SystemExit: If API calls fail
+    """
+    try:
+        now = since.astimezone(timezone.utc) if since else datetime.now(timezone.utc)
 
-        for shift in all_shifts:
-            # Convert UTC times to target timezone
-            start_utc = datetime.strptime(shift["start"], "%Y-%m-%dT%H:%M:%SZ")
-            end_utc = datetime.strptime(shift["end"], "%Y-%m-%dT%H:%M:%SZ")
+        if not quiet:
+            print(
+                f"Fetching shifts from {now.strftime('%Y-%m-%dT%H:%M:%SZ')} to {until.strftime('%Y-%m-%dT%H:%M:%SZ')}"
+            )
+        all_shifts = fetch_oncalls(session, schedule_id, now, until, quiet=quiet)
 
-            start_local = start_utc.replace(tzinfo=utc).astimezone(target_tz)
-            end_local = end_utc.replace(tzinfo=utc).astimezone(target_tz)
+        # Deduplicate and sort on integers; datetimes are only created when the shifts are read
+        with profile_section(session, "decode/dedupe"):
+            shifts = ShiftArray.from_records(all_shifts).unique()
 
-            # Add to set of unique shifts
-            unique_shifts.add((start_local, end_local, shift["user"]["id"]))
+        if not quiet:
+            print(f"Found {len(shifts)} unique shifts")
+        return shifts
 
-        print(f"Found {len(unique_shifts)} unique shifts")
-        return sorted(unique_shifts)
-        
     except HttpError as e:
         print(f"PagerDuty API error fetching shifts: {e.response.status_code} - {e}", file=sys.stderr)
         sys.exit(1)
@@ -290,6 +797,35 @@ def get_all_unique_shifts(
         sys.exit(1)
 
 
+def get_all_unique_shifts(
+    session: RestApiV2Client,
+    schedule_id: str,
+    until: datetime,
+    target_tz: Optional[datetime.tzinfo] = None,
+    since: Optional[datetime] = None,
+    quiet: bool = False,
+) -> List[Tuple[datetime, datetime, str]]:
+    """Get all unique on-call shifts in a schedule with user information.
+
+    Args:
+        session: PagerDuty API session
+        schedule_id: PagerDuty schedule ID
+        until: End datetime for the search range
+        target_tz: Optional timezone to convert times to
+        since: Optional start datetime for the search range (defaults to now)
+        quiet: Don't print progress messages
+
+    Returns:
+        List of tuples containing (start_time, end_time, user_id) in target timezone.
+        Times are sorted chronologically.
+
+    Raises:
+        SystemExit: If API calls fail
+    """
+    shifts = get_shift_array(session, schedule_id, until, since=since, quiet=quiet)
+    return shifts.to_shifts(target_tz or tz.tzlocal())
+
+
 def build_user_map(
     session: RestApiV2Client,
     schedule_entries: List[Tuple[datetime, datetime, str]],
@@ -303,28 +839,49 @@ def build_user_map(
     Returns:
         Dictionary mapping user IDs to user information
 
+    Raises:
+        SystemExit: If API calls fail
+    """
+    return build_user_map_for_ids(session, {entry[2] for entry in schedule_entries})
+
+
+def build_user_map_for_ids(session: RestApiV2Client, user_ids: Iterable[str]) -> Dict[str, UserObject]:
+    """Build a mapping of user IDs to user information.
+
+    Args:
+        session: PagerDuty API session
+        user_ids: User IDs to look up
+
+    Returns:
+        Dictionary mapping user IDs to user information
+
     Raises:
         SystemExit: If API calls fail
     """
     try:
         user_map: Dict[str, UserObject] = {}
-        user_ids = {entry[2] for entry in schedule_entries}
+        user_ids = set(user_ids)
+
+        # Answer from the cached directory first; it warms itself with one bulk
+        # listing, so only unknown users are left for the API
+        directory = getattr(session, "user_directory", None)
+        if directory is not None and user_ids:
+            user_map, _ = directory.get_many(user_ids)
+            if len(user_map) < len(user_ids) and directory.warm(session):
+                user_map, _ = directory.get_many(user_ids)
+            user_ids = user_ids - set(user_map.keys())
 
         # More efficient: fetch all users with include parameter
         # This is better than individual API calls for each user
         if user_ids:
             # Convert to list for API call
             user_id_list = list(user_ids)
-            
+
             # Use list_all for better performance with large user sets
             all_users = session.list_all(
-                "users", 
-                params={
-                    "ids": user_id_list,
-                    "include": ["contact_methods", "notification_rules"]
-                }
+                "users", params={"ids": user_id_list, "include": ["contact_methods", "notification_rules"]}
             )
-            
+
             for user in all_users:
                 if user["id"] in user_ids:
                     user_map[user["id"]] = {
@@ -350,8 +907,11 @@ def build_user_map(
                 else:
                     raise
 
+        if directory is not None:
+            directory.add(user_map[user_id] for user_id in user_ids if user_id in user_map)
+
         return user_map
-        
+
     except HttpError as e:
         print(f"PagerDuty API error building user map: {e.response.status_code} - {e}", file=sys.stderr)
         sys.exit(1)
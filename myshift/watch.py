@@ -0,0 +1,426 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Change detection for PagerDuty schedules.
+
+This module provides functionality to watch schedules for changes, including:
+- Polling one or more schedules on an interval, with jitter, backing off after errors
+- Reporting only the shifts that were added, removed or reassigned since the last poll
+- Narrowing the report to the changes involving some users
+- Text output for people, or JSON lines for scripts
+
+Every poll is compared with the previous one through per-day hashes: the
+shifts starting on each day of the watched period are hashed, and only the
+days whose hash changed are compared shift by shift. The last snapshot of
+every schedule is kept on disk (watch-SCHEDULE_ID.json in the cache
+directory), so a restarted watch reports what changed while it was stopped.
+User names are resolved only for users appearing in a change, and kept in
+the snapshot.
+"""
+
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, TypedDict
+
+from dateutil import tz
+from pagerduty import RestApiV2Client
+
+from myshift.cache import get_cache_dir, get_cache_settings
+from myshift.defaults import DEFAULT_SCHEDULE_WORKERS, DEFAULT_WATCH_DAYS, DEFAULT_WATCH_INTERVAL
+from myshift.shiftarray import EpochShift
+from myshift.util import build_user_map_for_ids, get_shift_array, get_user_id_by_email
+
+# Polls are spread by up to this fraction of the interval, so watchers started together don't poll together
+JITTER = 0.1
+
+# Longest wait after failed polls, which double the interval every time
+MAX_BACKOFF = 60 * 60
+
+# Shifts are hashed by the day (UTC) they start on
+BUCKET_SECONDS = 24 * 60 * 60
+
+SNAPSHOT_VERSION = 1
+
+# (kind, start, end, users before, users after) of a change; kind is "added", "removed" or "reassigned"
+Change = Tuple[str, int, int, Tuple[str, ...], Tuple[str, ...]]
+
+
+class Snapshot(TypedDict):
+    """Shifts of a schedule seen by one poll, with times in epoch seconds."""
+
+    since: int
+    until: int
+    shifts: List[EpochShift]
+    buckets: Dict[int, str]
+    names: Dict[str, str]
+
+
+def bucket_hashes(shifts: Iterable[EpochShift]) -> Dict[int, str]:
+    """Hash shifts by the day they start on.
+
+    Args:
+        shifts: (start, end, user_id) shifts with times in epoch seconds, in any order
+
+    Returns:
+        Dictionary mapping day numbers (epoch seconds // BUCKET_SECONDS) to
+        a hash of the shifts starting on that day
+    """
+    buckets: Dict[int, List[EpochShift]] = {}
+    for shift in shifts:
+        buckets.setdefault(shift[0] // BUCKET_SECONDS, []).append(shift)
+    return {
+        bucket: hashlib.sha256(
+            "\n".join(f"{start} {end} {user_id}" for start, end, user_id in sorted(bucket_shifts)).encode()
+        ).hexdigest()
+        for bucket, bucket_shifts in buckets.items()
+    }
+
+
+def diff_snapshots(old: Snapshot, new: Snapshot) -> List[Change]:
+    """Find the shifts that changed between two polls.
+
+    Only the period both polls cover is compared, so shifts ending before the
+    new poll or starting after the old one's horizon aren't reported. Days
+    lying entirely in that period are compared by hash; the shifts of days
+    with different hashes, and of the days at either end of the period, are
+    compared one by one.
+
+    Args:
+        old: Snapshot of the previous poll
+        new: Snapshot of this poll
+
+    Returns:
+        (kind, start, end, users_before, users_after) changes in time order,
+        where kind is "added", "removed" or "reassigned" (same times, other users)
+    """
+    since, until = max(old["since"], new["since"]), min(old["until"], new["until"])
+    if since >= until:
+        return []
+
+    def interior(bucket: int) -> bool:
+        # Every shift starting on such a day overlaps the period, whichever poll it comes from
+        return bucket * BUCKET_SECONDS >= since and (bucket + 1) * BUCKET_SECONDS <= until
+
+    changed = {
+        bucket
+        for bucket in old["buckets"].keys() | new["buckets"].keys()
+        if interior(bucket) and old["buckets"].get(bucket) != new["buckets"].get(bucket)
+    }
+
+    def compared(shifts: List[EpochShift]) -> Set[EpochShift]:
+        return {
+            shift
+            for shift in shifts
+            if shift[1] > since
+            and shift[0] < until
+            and (shift[0] // BUCKET_SECONDS in changed or not interior(shift[0] // BUCKET_SECONDS))
+        }
+
+    before, after = compared(old["shifts"]), compared(new["shifts"])
+    removed: Dict[Tuple[int, int], List[str]] = {}
+    added: Dict[Tuple[int, int], List[str]] = {}
+    for start, end, user_id in before - after:
+        removed.setdefault((start, end), []).append(user_id)
+    for start, end, user_id in after - before:
+        added.setdefault((start, end), []).append(user_id)
+
+    changes: List[Change] = []
+    for start, end in removed.keys() | added.keys():
+        old_users = tuple(sorted(removed.get((start, end), ())))
+        new_users = tuple(sorted(added.get((start, end), ())))
+        kind = "reassigned" if old_users and new_users else "removed" if old_users else "added"
+        changes.append((kind, start, end, old_users, new_users))
+    return sorted(changes, key=lambda change: (change[1], change[2], change[0]))
+
+
+def load_snapshot(path: Path) -> Optional[Snapshot]:
+    """Load the snapshot a previous watch left for a schedule.
+
+    Args:
+        path: Path of the snapshot file
+
+    Returns:
+        Snapshot, or None if there is none or it cannot be read
+    """
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("version") != SNAPSHOT_VERSION:
+            return None
+        return {
+            "since": int(data["since"]),
+            "until": int(data["until"]),
+            "shifts": [(int(start), int(end), str(user_id)) for start, end, user_id in data["shifts"]],
+            "buckets": {int(bucket): str(digest) for bucket, digest in data["buckets"].items()},
+            "names": {str(user_id): str(name) for user_id, name in data.get("names", {}).items()},
+        }
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def save_snapshot(path: Path, snapshot: Snapshot) -> None:
+    """Record the snapshot of a schedule, replacing the previous one atomically.
+
+    Args:
+        path: Path of the snapshot file
+        snapshot: Snapshot to record
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump({"version": SNAPSHOT_VERSION, **snapshot}, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def get_watch_state_dir(config: Dict[str, Any]) -> Path:
+    """Get the directory holding the watch snapshots, honoring the 'path' cache setting.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        Path of the directory (not necessarily existing yet)
+    """
+    # Snapshots are kept even when the shift cache is disabled; a watch without them would start blind
+    settings = get_cache_settings(config) or {}
+    return Path(settings["path"]).expanduser() if settings.get("path") else get_cache_dir()
+
+
+def format_change(change: Change, label: str, names: Dict[str, str]) -> str:
+    """Format a change for people.
+
+    Args:
+        change: Change to format (see diff_snapshots)
+        label: Display label of the schedule
+        names: Dictionary mapping user IDs to display names
+
+    Returns:
+        One line describing the change
+    """
+    kind, start, end, old_users, new_users = change
+    local_tz = tz.tzlocal()
+
+    def who(users: Tuple[str, ...]) -> str:
+        return ", ".join(names.get(user_id, user_id) for user_id in users)
+
+    detail = f"{who(old_users)} -> {who(new_users)}" if kind == "reassigned" else who(old_users or new_users)
+    return (
+        f"{label}: {kind.upper():<10} {datetime.fromtimestamp(start, local_tz).strftime('%Y-%m-%d %H:%M')} to "
+        f"{datetime.fromtimestamp(end, local_tz).strftime('%Y-%m-%d %H:%M %Z')}: {detail}"
+    )
+
+
+def change_to_dict(change: Change, schedule_id: str, label: str, names: Dict[str, str]) -> Dict[str, Any]:
+    """Describe a change as a JSON object.
+
+    Args:
+        change: Change to describe (see diff_snapshots)
+        schedule_id: PagerDuty schedule ID
+        label: Display label of the schedule
+        names: Dictionary mapping user IDs to display names
+
+    Returns:
+        Dictionary with the schedule, kind, ISO 8601 UTC times and users before and after
+    """
+    kind, start, end, old_users, new_users = change
+    return {
+        "schedule_id": schedule_id,
+        "schedule": label,
+        "change": kind,
+        "start": datetime.fromtimestamp(start, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "end": datetime.fromtimestamp(end, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "before": [{"id": user_id, "name": names.get(user_id, "Unknown")} for user_id in old_users],
+        "after": [{"id": user_id, "name": names.get(user_id, "Unknown")} for user_id in new_users],
+    }
+
+
+class Watcher:
+    """Polls schedules and reports what changed since the previous poll."""
+
+    def __init__(
+        self,
+        session: RestApiV2Client,
+        schedules: Dict[str, str],
+        state_dir: Path,
+        days: int = DEFAULT_WATCH_DAYS,
+        user_ids: Optional[Set[str]] = None,
+        output_format: str = "text",
+        workers: int = DEFAULT_SCHEDULE_WORKERS,
+    ):
+        """Initialize the watcher, loading the snapshots of previous watches.
+
+        Args:
+            session: PagerDuty API session
+            schedules: Dictionary mapping schedule IDs to display labels
+            state_dir: Directory holding the snapshot of every schedule
+            days: Number of days of shifts watched from now
+            user_ids: Only report changes involving these users (all changes if None)
+            output_format: "text" or "json" (one JSON object per line)
+            workers: Maximum number of schedules fetched at the same time
+        """
+        self.session = session
+        self.schedules = schedules
+        self.days = days
+        self.user_ids = user_ids
+        self.output_format = output_format
+        self.workers = max(1, min(workers, len(schedules)))
+        self.paths = {schedule_id: state_dir / f"watch-{schedule_id}.json" for schedule_id in schedules}
+        self.snapshots = {schedule_id: load_snapshot(path) for schedule_id, path in self.paths.items()}
+
+    def fetch(self, schedule_id: str, since: datetime, until: datetime) -> Snapshot:
+        """Fetch the current shifts of a schedule."""
+        # Polls must see PagerDuty's answer, not the cache's; refetching also keeps the cache fresh for other commands
+        store = getattr(self.session, "shift_store", None)
+        if store is not None:
+            store.invalidate(schedule_id, since, until)
+        shifts = list(get_shift_array(self.session, schedule_id, until, since=since, quiet=True).iter_epochs())
+        previous = self.snapshots[schedule_id]
+        return {
+            "since": int(since.timestamp()),
+            "until": int(until.timestamp()),
+            "shifts": shifts,
+            "buckets": bucket_hashes(shifts),
+            "names": previous["names"] if previous else {},
+        }
+
+    def report(self, schedule_id: str, snapshot: Snapshot, changes: List[Change]) -> None:
+        """Print changes, resolving the names of users not seen in a change before."""
+        names = snapshot["names"]
+        unknown = {user_id for change in changes for user_id in change[3] + change[4] if user_id not in names}
+        if unknown:
+            user_map = build_user_map_for_ids(self.session, unknown)
+            names.update({user_id: user_map[user_id]["name"] for user_id in unknown if user_id in user_map})
+
+        label = self.schedules[schedule_id]
+        for change in changes:
+            if self.output_format == "json":
+                print(json.dumps(change_to_dict(change, schedule_id, label, names)))
+            else:
+                print(format_change(change, label, names))
+        sys.stdout.flush()
+
+    def poll(self) -> bool:
+        """Fetch every schedule once and report its changes.
+
+        Returns:
+            True if every schedule was fetched, False if any failed (and is
+            compared again on the next poll)
+        """
+        since = datetime.now(timezone.utc).replace(microsecond=0)
+        until = since + timedelta(days=self.days)
+
+        def fetch(schedule_id: str) -> Optional[Snapshot]:
+            try:
+                return self.fetch(schedule_id, since, until)
+            except (Exception, SystemExit) as e:
+                # get_shift_array exits after printing the error; keep watching the other schedules
+                if not isinstance(e, SystemExit):
+                    print(f"Error fetching schedule {schedule_id}: {e}", file=sys.stderr)
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(fetch, self.schedules))
+
+        ok = True
+        for schedule_id, snapshot in zip(self.schedules, results):
+            if snapshot is None:
+                ok = False
+                continue
+            previous = self.snapshots[schedule_id]
+            if previous is None:
+                print(
+                    f"Watching {self.schedules[schedule_id]}: {len(snapshot['shifts'])} shifts "
+                    f"in the next {self.days} days",
+                    file=sys.stderr,
+                )
+            else:
+                changes = diff_snapshots(previous, snapshot)
+                if self.user_ids is not None:
+                    changes = [change for change in changes if self.user_ids.intersection(change[3] + change[4])]
+                try:
+                    self.report(schedule_id, snapshot, changes)
+                except SystemExit:
+                    # build_user_map_for_ids printed the error; report these changes again on the next poll
+                    ok = False
+                    continue
+
+            self.snapshots[schedule_id] = snapshot
+            try:
+                save_snapshot(self.paths[schedule_id], snapshot)
+            except OSError as e:
+                print(f"Warning: cannot save watch snapshot {self.paths[schedule_id]}: {e}", file=sys.stderr)
+        return ok
+
+    def run(self, interval: int = DEFAULT_WATCH_INTERVAL, once: bool = False) -> None:
+        """Poll until interrupted.
+
+        Args:
+            interval: Seconds between polls, spread by JITTER; failed polls
+                double it every time, up to MAX_BACKOFF
+            once: Poll once and return
+        """
+        failures = 0
+        while True:
+            failures = 0 if self.poll() else failures + 1
+            if once:
+                return
+            if failures:
+                # Full jitter keeps watchers that failed together from retrying together
+                ceiling = min(MAX_BACKOFF, interval * 2**failures)
+                delay = random.uniform(interval, ceiling)  # nosec B311 # poll jitter, not security
+            else:
+                delay = interval * random.uniform(1 - JITTER, 1 + JITTER)  # nosec B311 # poll jitter, not security
+            time.sleep(delay)
+
+
+def watch_schedules(
+    session: RestApiV2Client,
+    schedules: Dict[str, str],
+    state_dir: Path,
+    days: int = DEFAULT_WATCH_DAYS,
+    emails: Optional[List[str]] = None,
+    interval: int = DEFAULT_WATCH_INTERVAL,
+    output_format: str = "text",
+    once: bool = False,
+    workers: int = DEFAULT_SCHEDULE_WORKERS,
+) -> None:
+    """Watch schedules and print the shifts added, removed or reassigned.
+
+    Args:
+        session: PagerDuty API session
+        schedules: Dictionary mapping schedule IDs to display labels
+        state_dir: Directory holding the snapshot of every schedule
+        days: Number of days of shifts watched from now
+        emails: Only report changes involving these users (email addresses)
+        interval: Seconds between polls
+        output_format: "text" or "json" (one JSON object per line)
+        once: Poll once, reporting the changes since the previous watch, and exit
+        workers: Maximum number of schedules fetched at the same time
+
+    Raises:
+        SystemExit: If a user cannot be found
+    """
+    user_ids = {get_user_id_by_email(session, email) for email in emails} if emails else None
+    watcher = Watcher(session, schedules, state_dir, days, user_ids, output_format, workers)
+    try:
+        watcher.run(interval, once)
+    except KeyboardInterrupt:
+        pass
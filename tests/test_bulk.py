@@ -0,0 +1,175 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Override submissions must create every override exactly once, whatever fails along the way."""
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+import httpx2
+import pytest
+from standin import RedirectTransport, StandIn, SyntheticAccount
+
+from myshift import bulk
+from myshift.bulk import OverrideJournal, submit_overrides
+from myshift.util import MyShiftClient
+
+SCHEDULE_ID = "PS00000"
+USER_ID = "PU00001"
+
+
+class DroppingTransport(RedirectTransport):
+    """Transport losing the responses of the first POSTs, after the stand-in has carried them out.
+
+    With fail_listing, listing a schedule's overrides fails as well.
+    """
+
+    def __init__(self, host: str, port: int, drops: int, fail_listing: bool = False):
+        super().__init__(host, port)
+        self.drops = drops
+        self.fail_listing = fail_listing
+
+    def handle_request(self, request: httpx2.Request) -> httpx2.Response:
+        if request.method == "GET" and self.fail_listing and request.url.path.endswith("/overrides"):
+            raise httpx2.ConnectError("connection refused", request=request)
+        response = super().handle_request(request)
+        if request.method == "POST" and self.drops:
+            self.drops -= 1
+            response.read()
+            raise httpx2.ReadError("connection reset", request=request)
+        return response
+
+
+def make_shifts(count: int) -> List[Dict[str, str]]:
+    start = datetime(2026, 11, 2, tzinfo=timezone.utc)
+    return [
+        {
+            "start": (start + timedelta(hours=12 * i)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "end": (start + timedelta(hours=12 * (i + 1))).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        }
+        for i in range(count)
+    ]
+
+
+def client(standin: StandIn, drops: int = 0, fail_listing: bool = False) -> Any:
+    transport = DroppingTransport("127.0.0.1", standin.port, drops, fail_listing)
+    session = MyShiftClient("standin-token", transport=transport)
+    session.sleep_timer = 0.01
+    return session
+
+
+def created(standin: StandIn) -> List[Any]:
+    return sorted((o["start"], o["end"], o["user"]["id"]) for o in standin.account.overrides.get(SCHEDULE_ID, []))
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(bulk.time, "sleep", lambda seconds: None)
+
+
+@pytest.fixture
+def standin():
+    with StandIn(SyntheticAccount(users=9, shift_hours=12, levels=1)) as server:
+        yield server
+
+
+def expected(shifts: List[Dict[str, str]]) -> List[Any]:
+    return sorted((s["start"], s["end"], USER_ID) for s in shifts)
+
+
+@pytest.mark.parametrize("drops", [1, 3])
+def test_lost_responses_are_reconciled_without_duplicates(standin: StandIn, drops: int) -> None:
+    shifts = make_shifts(12)
+    results = submit_overrides(client(standin, drops), SCHEDULE_ID, USER_ID, shifts, chunk_size=5, workers=1)
+
+    assert [r["status"] for r in results] == ["created"] * len(shifts)
+    assert all(r["override_id"] for r in results)
+    assert created(standin) == expected(shifts)
+
+
+def test_overrides_created_by_every_lost_attempt_are_found(standin: StandIn) -> None:
+    shifts = make_shifts(3)
+    results = submit_overrides(client(standin, drops=100), SCHEDULE_ID, USER_ID, shifts, retries=1)
+
+    assert [r["status"] for r in results] == ["created"] * len(shifts)
+    assert created(standin) == expected(shifts)
+
+
+def test_unsettled_overrides_are_unknown_and_stay_pending(standin: StandIn, tmp_path: Path) -> None:
+    shifts = make_shifts(3)
+    session = client(standin, drops=100, fail_listing=True)
+    session.override_journal = OverrideJournal(tmp_path / "overrides.sqlite")
+    results = submit_overrides(session, SCHEDULE_ID, USER_ID, shifts, retries=1)
+    assert [r["status"] for r in results] == ["unknown"] * len(shifts)
+
+    # The next run finds the overrides the lost attempt created
+    session = client(standin)
+    session.override_journal = OverrideJournal(tmp_path / "overrides.sqlite")
+    standin.reset_counts()
+    results = submit_overrides(session, SCHEDULE_ID, USER_ID, shifts)
+    assert [r["status"] for r in results] == ["exists"] * len(shifts)
+    assert standin.counts["POST /schedules/{id}/overrides"] == 0
+    assert created(standin) == expected(shifts)
+
+
+def test_throttled_requests_are_retried_without_duplicates() -> None:
+    shifts = make_shifts(12)
+    with StandIn(SyntheticAccount(users=9, shift_hours=12, levels=1), rate_limit_every=2) as standin:
+        results = submit_overrides(client(standin), SCHEDULE_ID, USER_ID, shifts, chunk_size=3, workers=2)
+        assert [r["status"] for r in results] == ["created"] * len(shifts)
+        assert created(standin) == expected(shifts)
+
+
+def test_journal_skips_overrides_created_by_an_earlier_run(standin: StandIn, tmp_path: Path) -> None:
+    shifts = make_shifts(6)
+    session = client(standin)
+    session.override_journal = OverrideJournal(tmp_path / "overrides.sqlite")
+    submit_overrides(session, SCHEDULE_ID, USER_ID, shifts)
+
+    standin.reset_counts()
+    results = submit_overrides(session, SCHEDULE_ID, USER_ID, shifts)
+    assert [r["status"] for r in results] == ["exists"] * len(shifts)
+    assert standin.counts["POST /schedules/{id}/overrides"] == 0
+    assert created(standin) == expected(shifts)
+
+
+def test_journal_recreates_overrides_deleted_since(standin: StandIn, tmp_path: Path) -> None:
+    shifts = make_shifts(6)
+    session = client(standin)
+    session.override_journal = OverrideJournal(tmp_path / "overrides.sqlite")
+    submit_overrides(session, SCHEDULE_ID, USER_ID, shifts)
+    del standin.account.overrides[SCHEDULE_ID][:2]
+
+    results = submit_overrides(session, SCHEDULE_ID, USER_ID, shifts)
+    assert [r["status"] for r in results] == ["created"] * 2 + ["exists"] * 4
+    assert created(standin) == expected(shifts)
+
+
+def test_interrupted_run_is_resumed_without_duplicates(standin: StandIn, tmp_path: Path) -> None:
+    shifts = make_shifts(6)
+    journal = OverrideJournal(tmp_path / "overrides.sqlite")
+    overrides = [
+        {"key": bulk.idempotency_key(SCHEDULE_ID, USER_ID, s["start"], s["end"]), **s, "user_id": USER_ID}
+        for s in shifts
+    ]
+    # The run was interrupted after the first three overrides were created, before it heard back
+    journal.mark_pending(SCHEDULE_ID, USER_ID, overrides)
+    standin.account.add_overrides(SCHEDULE_ID, [{**s, "user": {"id": USER_ID}} for s in shifts[:3]])
+
+    session = client(standin)
+    session.override_journal = journal
+    results = submit_overrides(session, SCHEDULE_ID, USER_ID, shifts)
+    assert [r["status"] for r in results] == ["exists"] * 3 + ["created"] * 3
+    assert created(standin) == expected(shifts)
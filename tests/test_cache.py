@@ -0,0 +1,71 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Fetches through the shift cache must give the same shifts as fetches without it."""
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, List, Optional
+
+import pytest
+from standin import StandIn, SyntheticAccount
+
+from myshift.cache import ShiftStore
+from myshift.util import get_shift_array
+
+SCHEDULE_ID = "PS00000"
+
+
+def shifts(standin: StandIn, store: Optional[ShiftStore], since: datetime, until: datetime) -> List[Any]:
+    """Fetch a range's distinct shifts as epoch tuples."""
+    session = standin.client()
+    session.shift_store = store
+    return list(get_shift_array(session, SCHEDULE_ID, until, since=since, quiet=True).iter_epochs())
+
+
+@pytest.fixture
+def standin():
+    with StandIn(SyntheticAccount(users=9, shift_hours=12, levels=2, policies=2), page_limit=25) as server:
+        yield server
+
+
+@pytest.mark.parametrize(
+    "start_days,days",
+    [(-30, 10), (-5, 7), (1, 10)],
+    ids=["past", "around-now", "future"],
+)
+def test_cached_fetch_matches_api(standin: StandIn, tmp_path: Path, start_days: int, days: int) -> None:
+    since = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=start_days)
+    until = since + timedelta(days=days)
+    expected = shifts(standin, None, since, until)
+    assert expected
+
+    store = ShiftStore(tmp_path / "shifts.sqlite")
+    assert shifts(standin, store, since, until) == expected
+
+    # A second read is answered from the cache
+    standin.reset_counts()
+    assert shifts(standin, store, since, until) == expected
+    assert standin.counts["GET /oncalls"] == 0
+
+
+def test_storing_another_window_keeps_past_shifts(standin: StandIn, tmp_path: Path) -> None:
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    past = (now - timedelta(days=40), now - timedelta(days=30))
+    expected = shifts(standin, None, *past)
+
+    store = ShiftStore(tmp_path / "shifts.sqlite")
+    shifts(standin, store, *past)
+    shifts(standin, store, now, now + timedelta(days=7))
+    assert shifts(standin, store, *past) == expected
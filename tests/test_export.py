@@ -0,0 +1,90 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Calendar exports must hold one event per shift and only be rewritten when shifts change."""
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from standin import StandIn, SyntheticAccount
+
+from myshift.export import MAX_LINE_OCTETS, export_ics, fold_line
+from myshift.util import get_shift_array
+
+SCHEDULE_ID = "PS00000"
+SINCE = datetime(2026, 1, 5, tzinfo=timezone.utc)
+
+
+def events(path: Path) -> int:
+    return path.read_text(encoding="utf-8").count("BEGIN:VEVENT")
+
+
+def test_fold_line_keeps_lines_within_the_limit() -> None:
+    line = "DESCRIPTION:" + "é" * 100
+    folded = fold_line(line)
+    parts = folded.split("\r\n")[:-1]
+    assert all(len(part.encode()) <= MAX_LINE_OCTETS for part in parts)
+    assert "".join(part[1:] if i else part for i, part in enumerate(parts)) == line
+
+
+def test_reexports_only_rewrite_changed_calendars(tmp_path: Path, capsys) -> None:
+    output = tmp_path / "oncall.ics"
+    with StandIn(SyntheticAccount(users=9, shift_hours=12, levels=1)) as standin:
+        shifts = list(
+            get_shift_array(
+                standin.client(), SCHEDULE_ID, SINCE + timedelta(days=7), since=SINCE, quiet=True
+            ).iter_epochs()
+        )
+        export_ics(standin.client(), {SCHEDULE_ID: "Primary"}, days=7, since=SINCE, output=str(output))
+        assert events(output) == len(shifts) == 14
+        written = output.read_bytes()
+        assert all(line.endswith(b"\r") for line in written.split(b"\n")[:-1])
+
+        export_ics(standin.client(), {SCHEDULE_ID: "Primary"}, days=7, since=SINCE, output=str(output))
+        assert "is up to date (14 events)" in capsys.readouterr().err
+        assert output.read_bytes() == written
+
+        start, end, user_id = shifts[2]
+        other = next(user["id"] for user in standin.account.users if user["id"] != user_id)
+        standin.account.add_overrides(
+            SCHEDULE_ID,
+            [
+                {
+                    "start": datetime.fromtimestamp(start, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "end": datetime.fromtimestamp(end, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "user": {"id": other},
+                }
+            ],
+        )
+        export_ics(standin.client(), {SCHEDULE_ID: "Primary"}, days=7, since=SINCE, output=str(output))
+
+    assert "(1 new or changed, 1 removed)" in capsys.readouterr().err
+    assert events(output) == 14
+
+
+def test_export_for_one_user(tmp_path: Path) -> None:
+    output = tmp_path / "user1.ics"
+    with StandIn(SyntheticAccount(users=3, shift_hours=12, levels=1)) as standin:
+        export_ics(
+            standin.client(),
+            {SCHEDULE_ID: "Primary"},
+            days=6,
+            since=SINCE,
+            email="user1@example.com",
+            output=str(output),
+        )
+
+    text = output.read_text(encoding="utf-8")
+    assert events(output) == 4
+    assert "On call: User 1 (Primary)" in text
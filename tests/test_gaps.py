@@ -0,0 +1,81 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Coverage checks must find the gaps and overlaps of schedules, and nothing else."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from standin import StandIn, SyntheticAccount
+
+from myshift.gaps import check_coverage, find_issues, sweep_coverage
+from myshift.util import get_shift_array
+
+SCHEDULE_ID = "PS00000"
+
+
+def test_sweep_finds_gaps_and_overlaps() -> None:
+    shifts = [(0, 10, "A"), (10, 20, "B"), (15, 30, "C"), (15, 25, "C"), (40, 50, "A")]
+    windows = list(sweep_coverage(shifts, 0, 60))
+    assert windows == [
+        (0, 10, ("A",)),
+        (10, 15, ("B",)),
+        (15, 20, ("B", "C")),
+        (20, 30, ("C",)),
+        (30, 40, ()),
+        (40, 50, ("A",)),
+        (50, 60, ()),
+    ]
+    assert find_issues(windows) == [("over", 15, 20, ("B", "C")), ("gap", 30, 40, ()), ("gap", 50, 60, ())]
+    assert find_issues(windows, expected=2) == [
+        ("under", 0, 10, ("A",)),
+        ("under", 10, 15, ("B",)),
+        ("under", 20, 30, ("C",)),
+        ("gap", 30, 40, ()),
+        ("under", 40, 50, ("A",)),
+        ("gap", 50, 60, ()),
+    ]
+
+
+def stand_in_issues(levels: int, expected: int):
+    since = datetime(2026, 1, 5, 7, 30, tzinfo=timezone.utc)
+    until = since + timedelta(days=14)
+    with StandIn(SyntheticAccount(users=9, shift_hours=12, levels=levels, policies=2)) as standin:
+        shifts = get_shift_array(standin.client(), SCHEDULE_ID, until, since=since, quiet=True)
+
+    start, end = int(since.timestamp()), int(until.timestamp())
+    return find_issues(sweep_coverage(shifts.iter_epochs(), start, end), expected), start, end
+
+
+@pytest.mark.parametrize("levels", [1, 2])
+def test_levels_on_call_all_the_time_cover_the_period(levels: int) -> None:
+    issues, _, _ = stand_in_issues(levels, expected=levels)
+    assert issues == []
+
+
+def test_extra_levels_overlap_everywhere() -> None:
+    issues, start, end = stand_in_issues(2, expected=1)
+    assert issues and all(kind == "over" for kind, *_ in issues)
+    assert issues[0][1] == start and issues[-1][2] == end
+    assert all(previous[2] == following[1] for previous, following in zip(issues, issues[1:]))
+
+
+def test_check_coverage_reports_the_period(capsys) -> None:
+    since = datetime(2026, 1, 5, tzinfo=timezone.utc)
+    with StandIn(SyntheticAccount(users=9, shift_hours=12, levels=1)) as standin:
+        check_coverage(standin.client(), {SCHEDULE_ID: "Primary"}, days=7, since=since)
+
+    out = capsys.readouterr().out
+    assert out.startswith("Coverage from 2026-01-05 00:00")
+    assert "Primary: fully covered, no overlaps" in out
@@ -0,0 +1,100 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Sharded fetches must give the same answer as single queries.
+
+The cases cover shifts crossing shard boundaries, shifts longer than a shard,
+shard boundaries falling exactly on handoffs and between them, and ranges
+crossing daylight saving changes, with shifts handed off at local midnight
+(so they last 23 or 25 hours) as well as fixed-length ones.
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Tuple
+
+import pytest
+from dateutil import tz
+from standin import StandIn, SyntheticAccount
+
+from myshift.util import fetch_oncalls, get_shift_array
+
+SCHEDULE_ID = "PS00000"
+LOCAL_TZ = tz.gettz("America/New_York")
+ENGINES = ("oncalls", "rendered")
+
+ALIGNED = datetime(2026, 1, 5, tzinfo=timezone.utc)
+RAGGED = datetime(2026, 1, 5, 7, 13, 29, 250000, tzinfo=timezone.utc)
+US_SPRING = datetime(2026, 3, 1, 15, tzinfo=timezone.utc)
+US_FALL = datetime(2026, 10, 25, 3, 30, tzinfo=timezone.utc)
+
+
+class LocalDayAccount(SyntheticAccount):
+    """Account whose shifts are handed off at local midnight, lasting 23 or 25 hours across DST changes."""
+
+    def rotation(self, schedule_id: str, level: int, since: datetime, until: datetime) -> List[Tuple]:
+        day = since.astimezone(LOCAL_TZ).date() - timedelta(days=1)
+        shifts = []
+        while True:
+            start = datetime(day.year, day.month, day.day, tzinfo=LOCAL_TZ)
+            following = day + timedelta(days=1)
+            end = datetime(following.year, following.month, following.day, tzinfo=LOCAL_TZ)
+            if start >= until:
+                break
+            if end > since:
+                user = self.users[(day.toordinal() + level * 3) % len(self.users)]
+                shifts.append((start.astimezone(timezone.utc), end.astimezone(timezone.utc), user))
+            day = following
+        return shifts
+
+
+def answers(standin: StandIn, engine: str, shard_days: float, since: datetime, until: datetime) -> Tuple[Any, ...]:
+    """Fetch a range, returning the records (as a multiset), distinct shifts and local shifts."""
+    session = standin.client()
+    session.fetch_engine = engine
+    session.shard_days = shard_days
+    records = fetch_oncalls(session, SCHEDULE_ID, since, until, quiet=True)
+    shifts = get_shift_array(session, SCHEDULE_ID, until, since=since, quiet=True)
+    return (
+        sorted(json.dumps(record, sort_keys=True) for record in records),
+        list(shifts.iter_epochs()),
+        shifts.to_shifts(LOCAL_TZ),
+    )
+
+
+def check(account: SyntheticAccount, since: datetime, days: float, shard_days: List[float]) -> None:
+    """Assert that sharded fetches match single queries with both engines."""
+    until = since + timedelta(days=days)
+    with StandIn(account, page_limit=25) as standin:
+        for engine in ENGINES:
+            expected = answers(standin, engine, 0, since, until)
+            assert expected[1], "the range should hold shifts"
+            for size in shard_days:
+                assert answers(standin, engine, size, since, until) == expected, f"{engine}, shards of {size:g} days"
+
+
+@pytest.mark.parametrize("since", [ALIGNED, RAGGED], ids=["aligned", "ragged"])
+@pytest.mark.parametrize("hours", [7, 12, 25, 200])
+def test_fixed_shifts(hours: int, since: datetime) -> None:
+    check(SyntheticAccount(users=9, shift_hours=hours, levels=2, policies=2), since, 30, [1, 2.5, 7])
+
+
+@pytest.mark.parametrize("since", [US_SPRING, US_FALL], ids=["spring", "fall"])
+def test_day_shifts_across_dst(since: datetime) -> None:
+    check(SyntheticAccount(users=9, shift_hours=24, levels=1), since, 14, [1, 3.5])
+
+
+@pytest.mark.parametrize("since", [US_SPRING, US_FALL], ids=["spring", "fall"])
+def test_local_day_shifts_across_dst(since: datetime) -> None:
+    check(LocalDayAccount(users=9, levels=1, policies=2), since, 14, [1, 3.5])
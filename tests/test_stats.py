@@ -0,0 +1,73 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""On-call load must add up, and NumPy and pure Python must agree."""
+
+from datetime import datetime, timezone
+
+import pytest
+from dateutil import tz
+from standin import StandIn, SyntheticAccount
+
+from myshift.shiftarray import ShiftArray, get_numpy
+from myshift.stats import compute_load, parse_quarter
+from myshift.util import get_shift_array
+
+SCHEDULE_ID = "PS00000"
+ENGINES = [False, pytest.param(True, marks=pytest.mark.skipif(get_numpy() is None, reason="NumPy is not installed"))]
+
+
+def epoch(*args: int) -> int:
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp())
+
+
+@pytest.mark.parametrize("use_numpy", ENGINES)
+def test_saturday_night_shift(use_numpy: bool) -> None:
+    shifts = ShiftArray()
+    shifts.append(epoch(2026, 1, 10, 20), epoch(2026, 1, 11, 8), "PU1")
+    since, until = datetime(2026, 1, 5, tzinfo=timezone.utc), datetime(2026, 1, 19, tzinfo=timezone.utc)
+    loads = compute_load(shifts, since, until, timezone.utc, use_numpy=use_numpy)
+    assert loads == {
+        "PU1": {"hours": 12.0, "night_hours": 8.0, "weekend_hours": 12.0, "longest_hours": 12.0, "shifts": 1}
+    }
+
+
+@pytest.mark.parametrize("use_numpy", ENGINES)
+def test_adjacent_shifts_are_merged_and_clipped(use_numpy: bool) -> None:
+    shifts = ShiftArray()
+    shifts.append(epoch(2026, 1, 4, 12), epoch(2026, 1, 5, 12), "PU1")
+    shifts.append(epoch(2026, 1, 5, 12), epoch(2026, 1, 6, 0), "PU1")
+    shifts.append(epoch(2026, 1, 6, 0), epoch(2026, 1, 6, 12), "PU2")
+    since, until = datetime(2026, 1, 5, tzinfo=timezone.utc), datetime(2026, 1, 6, 6, tzinfo=timezone.utc)
+    loads = compute_load(shifts, since, until, timezone.utc, use_numpy=use_numpy)
+    assert loads["PU1"]["hours"] == 24.0 and loads["PU1"]["longest_hours"] == 24.0
+    assert loads["PU2"]["hours"] == 6.0
+
+
+def test_quarter_load_adds_up_across_dst() -> None:
+    local_tz = tz.gettz("America/New_York")
+    since, until = parse_quarter("2026Q1", local_tz)
+    with StandIn(SyntheticAccount(users=9, shift_hours=12, levels=1)) as standin:
+        shifts = get_shift_array(standin.client(), SCHEDULE_ID, until, since=since, quiet=True)
+
+    python = compute_load(shifts, since, until, local_tz, use_numpy=False)
+    # 2159 hours: the quarter loses one to daylight saving time
+    hours = (until.timestamp() - since.timestamp()) / 3600
+    assert hours == 2159
+    assert sum(load["hours"] for load in python.values()) == pytest.approx(hours)
+    if get_numpy() is not None:
+        numpy = compute_load(shifts, since, until, local_tz, use_numpy=True)
+        assert numpy.keys() == python.keys()
+        for user_id, load in python.items():
+            assert numpy[user_id] == pytest.approx(load)
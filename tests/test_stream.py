@@ -0,0 +1,80 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Streamed shifts must match the buffered fetch, in order, and start after one page."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from standin import StandIn, SyntheticAccount
+
+from myshift.stream import dedupe_window, iter_unique_shifts
+from myshift.util import get_all_unique_shifts
+
+SCHEDULE_ID = "PS00000"
+
+
+def at(hour: int) -> datetime:
+    return datetime(2026, 1, 5, tzinfo=timezone.utc) + timedelta(hours=hour)
+
+
+@pytest.mark.parametrize("hours,policies", [(12, 1), (24, 3), (7, 2)])
+def test_stream_matches_buffered_fetch(hours: int, policies: int) -> None:
+    account = SyntheticAccount(users=9, shift_hours=hours, levels=1, policies=policies)
+    until = datetime.now(timezone.utc) + timedelta(days=60)
+    with StandIn(account, page_limit=25) as standin:
+        expected = get_all_unique_shifts(standin.client(), SCHEDULE_ID, until, timezone.utc, quiet=True)
+        streamed = list(iter_unique_shifts(standin.client(), SCHEDULE_ID, until, timezone.utc))
+
+    assert streamed == expected
+    assert streamed == sorted(streamed)
+
+
+def test_first_shifts_are_yielded_before_the_second_page_is_requested() -> None:
+    account = SyntheticAccount(users=9, shift_hours=24, levels=1)
+    until = datetime.now(timezone.utc) + timedelta(days=365)
+    with StandIn(account, page_limit=100) as standin:
+        shifts = iter_unique_shifts(standin.client(), SCHEDULE_ID, until, timezone.utc)
+        next(shifts)
+        assert standin.counts["GET /oncalls"] == 1
+        assert len(list(shifts)) >= 364
+        assert standin.counts["GET /oncalls"] == 4
+
+
+def test_dedupe_window_orders_pages_and_drops_late_repeats() -> None:
+    first = at(0), at(12), "PU1"
+    second = at(12), at(24), "PU2"
+    third = at(24), at(36), "PU3"
+    pages = [[second, first, second, first], [second, third], [first, third]]
+    assert list(dedupe_window(pages)) == [first, second, third]
+
+
+def test_dedupe_window_yields_at_page_ends() -> None:
+    first = at(0), at(12), "PU1"
+    second = at(12), at(24), "PU2"
+    third = at(24), at(36), "PU3"
+    released = []
+    read_after = []
+
+    def pages():
+        yield [first, second]
+        read_after.append(len(released))
+        yield [second, third]
+        read_after.append(len(released))
+
+    for shift in dedupe_window(pages()):
+        released.append(shift)
+    # Each page's shifts before its latest start are out before the next page is read
+    assert released == [first, second, third]
+    assert read_after == [1, 2]
@@ -0,0 +1,60 @@
+# Copyright 2025 John Casey
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Watching a schedule must report exactly the shifts changed between polls."""
+
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from standin import StandIn, SyntheticAccount
+
+from myshift.util import get_shift_array
+from myshift.watch import Watcher
+
+SCHEDULE_ID = "PS00000"
+
+
+def test_polls_report_reassigned_shifts(tmp_path: Path, capsys) -> None:
+    with StandIn(SyntheticAccount(users=9, shift_hours=12, levels=1)) as standin:
+        watcher = Watcher(standin.client(), {SCHEDULE_ID: "Primary"}, tmp_path, days=7, output_format="json")
+        assert watcher.poll()
+        assert watcher.poll()
+        assert capsys.readouterr().out == ""
+
+        now = datetime.now(timezone.utc)
+        shifts = get_shift_array(standin.client(), SCHEDULE_ID, now + timedelta(days=3), since=now, quiet=True)
+        start, end, user_id = list(shifts.iter_epochs())[3]
+        other = next(user["id"] for user in standin.account.users if user["id"] != user_id)
+        standin.account.add_overrides(
+            SCHEDULE_ID,
+            [
+                {
+                    "start": datetime.fromtimestamp(start, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "end": datetime.fromtimestamp(end, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "user": {"id": other},
+                }
+            ],
+        )
+
+        # A new watcher picks up the snapshot saved by the previous one
+        watcher = Watcher(standin.client(), {SCHEDULE_ID: "Primary"}, tmp_path, days=7, output_format="json")
+        assert watcher.poll()
+
+    changes = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert len(changes) == 1
+    assert changes[0]["change"] == "reassigned"
+    assert [user["id"] for user in changes[0]["before"]] == [user_id]
+    assert [user["id"] for user in changes[0]["after"]] == [other]
+    assert changes[0]["start"] == datetime.fromtimestamp(start, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")